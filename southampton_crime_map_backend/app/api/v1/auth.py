@@ -4,6 +4,7 @@ from fastapi import APIRouter, Depends, HTTPException, Request, status
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import SafeRouteException
+from app.core.rate_limit import limiter, rate_limit_auth_login, rate_limit_auth_register
 from app.db.base import get_db
 from app.dependencies import get_current_user_dependency
 from app.schemas.auth import (
@@ -19,14 +20,16 @@ router = APIRouter()
 
 
 @router.post("/register", response_model=UserResponse, status_code=status.HTTP_201_CREATED)
+@limiter.limit(rate_limit_auth_register)
 async def register(
-    request: RegisterRequest,
+    request_data: RegisterRequest,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """Register a new user."""
     try:
         auth_service = AuthService(db)
-        user = auth_service.register(email=request.email, password=request.password)
+        user = await auth_service.register(email=request_data.email, password=request_data.password)
         return UserResponse(
             id=str(user.id),
             email=user.email,
@@ -39,19 +42,20 @@ async def register(
 
 
 @router.post("/login", response_model=TokenResponse)
+@limiter.limit(rate_limit_auth_login)
 async def login(
     request_data: LoginRequest,
-    http_request: Request,
+    request: Request,
     db: Session = Depends(get_db),
 ):
     """Login user and return tokens."""
     try:
         # Get IP and user agent from request
-        ip_address = http_request.client.host if http_request.client else None
-        user_agent = http_request.headers.get("user-agent")
+        ip_address = request.client.host if request.client else None
+        user_agent = request.headers.get("user-agent")
 
         auth_service = AuthService(db)
-        access_token, refresh_token, expires_in = auth_service.login(
+        access_token, refresh_token, expires_in = await auth_service.login(
             email=request_data.email,
             password=request_data.password,
             ip_address=ip_address,
@@ -115,18 +115,17 @@ async def get_safe_routes(
 
         lookback_months = request.preferences.lookback_months if request.preferences else 12
 
-        # Score each route
-        routes = []
-        for idx, feature in enumerate(features):
-            route_info = routing_service.extract_route_info(feature)
-
-            route_score = safety_service.score_route(
-                route_geometry=route_info["geometry"],
-                lookback_months=lookback_months,
-                time_of_day=time_of_day,
-                buffer_meters=50,
-            )
+        # Score every route together: they share one cell fetch
+        route_infos = [routing_service.extract_route_info(feature) for feature in features]
+        route_scores = await safety_service.score_routes_cached(
+            route_geometries=[route_info["geometry"] for route_info in route_infos],
+            lookback_months=lookback_months,
+            time_of_day=time_of_day,
+            buffer_meters=50,
+        )
 
+        routes = []
+        for idx, (route_info, route_score) in enumerate(zip(route_infos, route_scores)):
             route_id = str(uuid.uuid4())
 
             segments = [RouteSegment(**seg) for seg in route_score.get("segments", [])]
@@ -173,13 +172,12 @@ async def get_safe_routes(
                     history_service = HistoryService(db)
                     best_route = routes[0]
 
-                    # Simplify geometry for storage
-                    route_geom_wkt = None
+                    # Simplify geometry for storage (saved as WKB, not WKT)
+                    route_geom = None
                     if best_route.geometry:
                         try:
                             geom = geojson_to_shapely(best_route.geometry)
-                            simplified = simplify_geometry(geom, max_points=100)
-                            route_geom_wkt = simplified.wkt
+                            route_geom = simplify_geometry(geom, max_points=100)
                         except Exception:
                             pass
 
@@ -201,10 +199,13 @@ async def get_safe_routes(
                                 str(request.departure_time) if request.departure_time else None
                             ),
                         },
-                        route_geom=route_geom_wkt,
+                        route_geom=route_geom,
                     )
                 except Exception as e:
+                    # History is best-effort; don't let a failed flush abort the request
+                    db.rollback()
                     import logging
+
                     logger = logging.getLogger(__name__)
                     logger.error(f"Failed to save route history: {str(e)}")
 
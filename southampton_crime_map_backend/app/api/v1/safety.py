@@ -2,9 +2,14 @@
 
 import json
 import logging
-from datetime import date, timedelta
-
-from fastapi import APIRouter, Depends, HTTPException, Query, status
+from collections import defaultdict
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, Iterator
+
+import h3
+import orjson
+from fastapi import APIRouter, Depends, HTTPException, Query, Response, status
+from fastapi.responses import ORJSONResponse, StreamingResponse
 from geoalchemy2.shape import to_shape
 from sqlalchemy import text
 from sqlalchemy.orm import Session
@@ -12,8 +17,8 @@ from sqlalchemy.orm import Session
 from app.config import CRIME_TIME_WEIGHTS, get_settings
 from app.db.base import get_db
 from app.repositories.crime_repository import CrimeRepository
-from app.schemas.safety import SafetyCell, SafetyMeta, SafetySnapshotResponse, SafetySummary
-from app.services.cache_service import CacheService
+from app.schemas.safety import SafetyMeta, SafetySnapshotResponse, SafetySummary
+from app.services.cache_service import CELL_RECORD, CacheService, pack_cells
 from app.utils.scoring import calculate_months_ago, get_recency_weight
 
 logger = logging.getLogger(__name__)
@@ -21,6 +26,11 @@ router = APIRouter()
 settings = get_settings()
 
 
+def _h3_index(cell_id: int) -> str:
+    """Hex H3 index for a stored cell ID (cells are stored as 64-bit integers)."""
+    return h3.int_to_str(cell_id)
+
+
 @router.get(
     "/snapshot",
     response_model=SafetySnapshotResponse,
@@ -155,10 +165,21 @@ async def get_safety_snapshot(
     - day: 09:00-17:00
     - evening: 17:00-22:00
     """
+    # The snapshot is built from (or cached from) validated models, so hand it to
+    # orjson directly instead of re-validating it against the response model
+    return ORJSONResponse(await _load_snapshot(bbox, lookback_months, time_of_day, db))
+
+
+async def _load_snapshot(
+    bbox: str, lookback_months: int, time_of_day: str | None, db: Session
+) -> Dict[str, Any]:
+    """Build (or fetch from cache) the safety snapshot as a plain dict."""
+    filling = False
     try:
         # Try to get from cache first
         cache_service = CacheService()
-        cached_result = await cache_service.get_snapshot(bbox, lookback_months, time_of_day)
+        cache_key = cache_service.snapshot_key(bbox, lookback_months, time_of_day)
+        cached_result = await cache_service.get_snapshot(cache_key)
 
         if cached_result:
             return cached_result
@@ -184,6 +205,16 @@ async def get_safety_snapshot(
                 detail=f"Invalid bbox: {str(e)}. Expected format: min_lng,min_lat,max_lng,max_lat",
             )
 
+        # Only one request builds a given missing snapshot; the rest wait for it
+        filling = await cache_service.claim_snapshot_fill(cache_key)
+        if not filling:
+            cached_result = await cache_service.wait_for_snapshot(cache_key)
+            if cached_result:
+                return cached_result
+            # The builder gave up or is slow: take the marker over if it is free,
+            # otherwise build without owning (so never releasing) another's marker
+            filling = await cache_service.claim_snapshot_fill(cache_key)
+
         # Get cells for the last N months
         crime_repo = CrimeRepository(db)
         current_month = date.today().replace(day=1)
@@ -194,22 +225,12 @@ async def get_safety_snapshot(
         for i in range(lookback_months):
             month_offset = current_month - timedelta(days=30 * i)
             month = month_offset.replace(day=1)
-            cells = crime_repo.get_cells_by_month(month)
+            cells = crime_repo.get_cells_by_month(month, with_geometry=False)
             all_cells.extend(cells)
 
-        # Extract unique H3 indices from cell IDs
-        # Format: {h3_index}_{YYYYMM} or {h3_index} in tests
+        # Map stored cell IDs (64-bit H3 indices) to their hex form
         unique_cell_ids = list(set([cell.cell_id for cell in all_cells]))
-
-        # Extract H3 indices without month suffixes
-        h3_indices = {}
-        for cell_id in unique_cell_ids:
-            parts = cell_id.rsplit("_", 1)
-            if len(parts) == 2 and len(parts[1]) == 6 and parts[1].isdigit():
-                h3_index = parts[0]
-                h3_indices[h3_index] = cell_id
-            else:
-                h3_indices[cell_id] = cell_id
+        h3_indices = {_h3_index(cell_id): cell_id for cell_id in unique_cell_ids}
 
         # Fetch geometries (stored as WGS84/EPSG:4326)
         cell_geometries = {}
@@ -218,29 +239,24 @@ async def get_safety_snapshot(
 
             try:
                 if dialect_name == "postgresql":
-                    # Use PostGIS to convert geometries to GeoJSON
+                    # Use PostGIS to convert geometries to GeoJSON. A cell has one row
+                    # per month with the same geometry, so take one row per cell.
                     geom_query = text(
                         """
-                        SELECT
+                        SELECT DISTINCT ON (cell_id)
                             cell_id,
                             ST_AsGeoJSON(geom) as geojson
                         FROM safety_cells
                         WHERE cell_id = ANY(:cell_ids)
+                        ORDER BY cell_id, month DESC
                     """
                     )
                     result = db.execute(geom_query, {"cell_ids": list(unique_cell_ids)})
                     for row in result:
                         geom_dict = json.loads(row.geojson)
-                        parts = row.cell_id.rsplit("_", 1)
-                        if len(parts) == 2 and len(parts[1]) == 6 and parts[1].isdigit():
-                            h3_index = parts[0]
-                        else:
-                            h3_index = row.cell_id
-                        cell_geometries[h3_index] = geom_dict
+                        cell_geometries[_h3_index(row.cell_id)] = geom_dict
                 else:
                     # SQLite testing: regenerate geometry from H3
-                    import h3
-
                     for h3_index in h3_indices.keys():
                         try:
                             boundary = h3.cell_to_boundary(h3_index)
@@ -254,9 +270,6 @@ async def get_safety_snapshot(
                 # Continue without geometries - we'll handle this below
 
         # Aggregate cells by H3 index across months
-        from collections import defaultdict
-        from typing import Any, Dict
-
         cell_aggregates: Dict[str, Dict[str, Any]] = defaultdict(
             lambda: {
                 "total_crimes": 0,
@@ -268,12 +281,7 @@ async def get_safety_snapshot(
         )
 
         for cell in all_cells:
-            # Extract H3 index from cell_id
-            parts = cell.cell_id.rsplit("_", 1)
-            if len(parts) == 2 and len(parts[1]) == 6 and parts[1].isdigit():
-                h3_index = parts[0]
-            else:
-                h3_index = cell.cell_id
+            h3_index = _h3_index(cell.cell_id)
 
             cell_aggregates[h3_index]["total_crimes"] += cell.crime_count_total
 
@@ -381,38 +389,124 @@ async def get_safety_snapshot(
 
         if cell_data:
             cell_data.sort(key=lambda x: x["risk_score"], reverse=True)
-        result = SafetySnapshotResponse(
-            cells=[SafetyCell(**cell) for cell in cell_data],
-            summary=SafetySummary(
-                total_cells=len(cell_data),
-                total_crimes=sum(c["crime_count"] for c in cell_data),
-                avg_safety_score=(
-                    round(sum(c["safety_score"] for c in cell_data) / len(cell_data), 1)
-                    if cell_data
-                    else 100.0
-                ),
-                highest_risk_cell=cell_data[0]["id"] if cell_data else None,
-                lowest_risk_cell=cell_data[-1]["id"] if cell_data else None,
-            ),
-            meta=SafetyMeta(
-                bbox=[min_lng, min_lat, max_lng, max_lat],
-                cell_size_m=settings.GRID_CELL_SIZE_M,
-                grid_type=settings.GRID_TYPE,
-                lookback_months=lookback_months,
-                time_filter=time_of_day,
-                months_included=lookback_months,
+        summary = SafetySummary(
+            total_cells=len(cell_data),
+            total_crimes=sum(c["crime_count"] for c in cell_data),
+            avg_safety_score=(
+                round(sum(c["safety_score"] for c in cell_data) / len(cell_data), 1)
+                if cell_data
+                else 100.0
             ),
+            highest_risk_cell=cell_data[0]["id"] if cell_data else None,
+            lowest_risk_cell=cell_data[-1]["id"] if cell_data else None,
+        )
+        meta = SafetyMeta(
+            bbox=[min_lng, min_lat, max_lng, max_lat],
+            cell_size_m=settings.GRID_CELL_SIZE_M,
+            grid_type=settings.GRID_TYPE,
+            lookback_months=lookback_months,
+            time_filter=time_of_day,
+            months_included=lookback_months,
         )
 
+        # Cell dicts are already in SafetyCell's wire shape (scores are clamped and
+        # rounded above), so they go out as-is rather than through a per-cell
+        # model build and model_dump() copy of every geometry
+        snapshot = {"cells": cell_data, "summary": summary.model_dump(), "meta": meta.model_dump()}
+
         # Cache the result
-        await cache_service.set_snapshot(bbox, lookback_months, time_of_day, result.model_dump())
+        await cache_service.set_snapshot(cache_key, snapshot)
 
-        return result
+        return snapshot
 
     except HTTPException:
         raise
     except Exception as e:
+        if filling:
+            await cache_service.release_snapshot_fill(cache_key)
         raise HTTPException(
             status_code=status.HTTP_500_INTERNAL_SERVER_ERROR,
             detail=f"Error fetching safety snapshot: {str(e)}",
         )
+
+
+def _ndjson_lines(snapshot: Dict[str, Any]) -> Iterator[bytes]:
+    """Yield one JSON line per cell, then a final line with summary and meta."""
+    for cell in snapshot["cells"]:
+        yield orjson.dumps(cell) + b"\n"
+    yield orjson.dumps({"summary": snapshot["summary"], "meta": snapshot["meta"]}) + b"\n"
+
+
+@router.get(
+    "/snapshot/stream",
+    summary="Stream safety heatmap snapshot as NDJSON",
+    description="""
+    Same data as `/snapshot`, streamed as newline-delimited JSON so clients can render
+    cells as they arrive. Each line is one cell object; the last line holds `summary`
+    and `meta`.
+    """,
+    response_class=StreamingResponse,
+    responses={200: {"content": {"application/x-ndjson": {}}}},
+)
+async def stream_safety_snapshot(
+    bbox: str = Query(
+        ...,
+        description="Bounding box: min_lng,min_lat,max_lng,max_lat (WGS84)",
+        example="-1.4044,50.9008,-1.3726,50.9197",
+    ),
+    lookback_months: int = Query(
+        default=12,
+        ge=1,
+        le=24,
+        description="Months of historical crime data (1-24)",
+    ),
+    time_of_day: str | None = Query(
+        default=None,
+        description="Time period: 'night', 'morning', 'day', or 'evening'",
+        example="night",
+    ),
+    db: Session = Depends(get_db),
+) -> StreamingResponse:
+    """Stream safety heatmap cells for a bounding box as NDJSON."""
+    snapshot = await _load_snapshot(bbox, lookback_months, time_of_day, db)
+    return StreamingResponse(_ndjson_lines(snapshot), media_type="application/x-ndjson")
+
+
+@router.get(
+    "/cells/{month}",
+    summary="Get packed safety cells for a month",
+    description="""
+    Returns every safety cell for a month as a packed binary array, for clients that
+    render the heatmap themselves.
+
+    Each cell is a 16-byte little-endian record: H3 cell index (uint64), crime count
+    (uint32), weighted crime count (float32). Parse with a DataView; the H3 index is the
+    64-bit form of the hex ID returned by `/snapshot`. Cached for 24 hours.
+    """,
+    response_class=Response,
+    responses={
+        200: {"content": {"application/octet-stream": {}}},
+        400: {"description": "Invalid month"},
+    },
+)
+async def get_month_cells(month: str, db: Session = Depends(get_db)) -> Response:
+    """Get a month's cells as packed ``CELL_RECORD`` structs (month is ``YYYY-MM``)."""
+    try:
+        month_date = datetime.strptime(month, "%Y-%m").date()
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid month. Expected format: YYYY-MM",
+        )
+
+    cache_service = CacheService()
+    blob = await cache_service.get_month_cells(month_date)
+    if blob is None:
+        blob = pack_cells(CrimeRepository(db).get_cell_counts_by_month(month_date))
+        await cache_service.set_month_cells(month_date, blob)
+
+    return Response(
+        content=blob,
+        media_type="application/octet-stream",
+        headers={"X-Record-Size": str(CELL_RECORD.size)},
+    )
@@ -1,8 +1,8 @@
 """User endpoints."""
 
 import uuid
-from datetime import date
-from typing import Optional
+from datetime import date, datetime
+from typing import Optional, Tuple
 
 from fastapi import APIRouter, Depends, HTTPException, Query, status
 from sqlalchemy.orm import Session
@@ -19,17 +19,47 @@ from app.services.user_service import UserService
 router = APIRouter()
 
 
+def _encode_history_cursor(created_at: datetime, history_id: uuid.UUID) -> str:
+    """Build the ``next_cursor`` for a history page ending at this row."""
+    return f"{created_at.isoformat()}_{history_id}"
+
+
+def _decode_history_cursor(cursor: str) -> Tuple[datetime, uuid.UUID]:
+    """Parse a ``next_cursor`` back into its ``(created_at, id)`` key."""
+    try:
+        created_at, _, history_id = cursor.rpartition("_")
+        return datetime.fromisoformat(created_at), uuid.UUID(history_id)
+    except ValueError:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Invalid history cursor",
+        )
+
+
 @router.get("/me/history", response_model=HistoryListResponse)
 async def get_user_history(
     limit: int = Query(default=20, ge=1, le=100),
-    offset: int = Query(default=0, ge=0),
+    offset: Optional[int] = Query(default=None, ge=0),
     mode: Optional[str] = None,
     from_date: Optional[date] = None,
     to_date: Optional[date] = None,
+    before: Optional[str] = None,
     current_user: User = Depends(get_current_active_user),
     db: Session = Depends(get_db),
 ):
-    """Get user's route history with pagination and filters."""
+    """Get user's route history with pagination and filters.
+
+    For deep pages pass the previous response's ``next_cursor`` as ``before``
+    rather than growing ``offset``; the two cannot be combined.
+    """
+    if before is not None and offset is not None:
+        raise HTTPException(
+            status_code=status.HTTP_400_BAD_REQUEST,
+            detail="Pass either before or offset, not both",
+        )
+    cursor = _decode_history_cursor(before) if before is not None else None
+    offset = offset or 0
+
     try:
         history_service = HistoryService(db)
         history_list, total = history_service.get_user_history(
@@ -39,6 +69,7 @@ async def get_user_history(
             mode=mode,
             from_date=from_date,
             to_date=to_date,
+            before=cursor,
         )
 
         items = [
@@ -60,6 +91,11 @@ async def get_user_history(
             total=total,
             limit=limit,
             offset=offset,
+            next_cursor=(
+                _encode_history_cursor(history_list[-1].created_at, history_list[-1].id)
+                if len(history_list) == limit
+                else None
+            ),
         )
     except Exception as e:
         raise HTTPException(
@@ -170,7 +206,7 @@ async def delete_user_account(
     """Delete user account (requires password confirmation)."""
     try:
         user_service = UserService(db)
-        user_service.delete_user_account(current_user.id, request.password)
+        await user_service.delete_user_account(current_user.id, request.password)
 
         return {"message": "Account deleted successfully"}
     except SafeRouteException as e:
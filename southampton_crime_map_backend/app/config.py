@@ -52,12 +52,26 @@ class Settings(BaseSettings):
     POSTGRES_DB: str = "saferoute"
     POSTGRES_USER: str = "saferoute"
     POSTGRES_PASSWORD: str = "changeme"
+    # Connection pool, per process: size it to the worker's expected concurrency
+    DB_POOL_SIZE: int = 20
+    DB_MAX_OVERFLOW: int = 10
+    DB_POOL_TIMEOUT: int = 30
+    DB_POOL_RECYCLE: int = 1800  # Seconds; recycle before PgBouncer/LB idle timeouts
 
     # JWT
     JWT_SECRET_KEY: str = Field(default="changeme-in-production")
     JWT_ALGORITHM: str = "HS256"
     JWT_ACCESS_TOKEN_EXPIRE_MINUTES: int = 15
     JWT_REFRESH_TOKEN_EXPIRE_DAYS: int = 30
+    # Argon2id password hashing (OWASP baseline: 46 MiB, t=2, p=1)
+    ARGON2_TIME_COST: int = 2
+    ARGON2_MEMORY_COST: int = 46 * 1024  # KiB
+    ARGON2_PARALLELISM: int = 1
+    # At startup, raise the time cost until one hash takes about this long on this
+    # host (0 disables; ARGON2_TIME_COST stays the floor)
+    ARGON2_TARGET_MS: int = 300
+    # HMAC key for stored refresh-token hashes; falls back to JWT_SECRET_KEY if unset
+    REFRESH_TOKEN_PEPPER: str = Field(default="")
 
     # External APIs
     ORS_API_KEY: str = Field(default="")
@@ -67,6 +81,7 @@ class Settings(BaseSettings):
     # Redis
     REDIS_URL: str = "redis://localhost:6379/0"
     CELERY_BROKER_URL: str = "redis://localhost:6379/1"
+    REDIS_MAX_CONNECTIONS: int = 50  # Per process and client (str / bytes)
 
     # App
     APP_ENV: str = "development"
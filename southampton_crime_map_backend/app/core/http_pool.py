@@ -0,0 +1,46 @@
+"""Process-wide HTTP client for outbound API calls.
+
+RoutingService used to open a new ``httpx.AsyncClient`` for every ORS attempt,
+paying DNS, TCP and TLS setup each time. One pooled client per event loop keeps
+connections alive between requests. As with the Redis clients, keying by loop
+keeps code running in a fresh loop from reusing connections bound to a closed one.
+"""
+
+import asyncio
+import logging
+from typing import Optional, Tuple
+
+import httpx
+
+logger = logging.getLogger(__name__)
+
+# (owning event loop, client)
+_client: Optional[Tuple[asyncio.AbstractEventLoop, httpx.AsyncClient]] = None
+
+
+def get_http_client() -> httpx.AsyncClient:
+    """Get the shared HTTP client for the running event loop.
+
+    Callers pass their own per-request ``timeout``.
+    """
+    global _client
+    loop = asyncio.get_running_loop()
+    if _client is not None and _client[0] is loop and not _client[1].is_closed:
+        return _client[1]
+
+    client = httpx.AsyncClient(limits=httpx.Limits(max_keepalive_connections=20))
+    _client = (loop, client)
+    logger.debug("HTTP connection pool established")
+    return client
+
+
+async def close_http_client() -> None:
+    """Close the shared client (on application shutdown)."""
+    global _client
+    if _client is None:
+        return
+    try:
+        await _client[1].aclose()
+    except Exception as e:
+        logger.warning(f"HTTP client close error: {str(e)}")
+    _client = None
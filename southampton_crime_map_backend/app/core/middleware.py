@@ -1,94 +1,104 @@
-"""Middleware for request logging, correlation IDs, and metrics."""
+"""Middleware for request logging, correlation IDs, and metrics.
+
+Both middlewares are plain ASGI callables rather than ``BaseHTTPMiddleware``
+subclasses, which would run every request in an extra task and route the response
+through an internal stream.
+"""
 
 import time
-from typing import Callable
 
-from fastapi import Request, Response
-from starlette.middleware.base import BaseHTTPMiddleware
-from starlette.types import ASGIApp
+from starlette.datastructures import Headers, MutableHeaders, QueryParams
+from starlette.types import ASGIApp, Message, Receive, Scope, Send
 
 from app.core.logging_config import clear_request_id, get_logger, set_request_id
 
 logger = get_logger(__name__)
 
 
-class RequestLoggingMiddleware(BaseHTTPMiddleware):
+class RequestLoggingMiddleware:
     """Middleware for logging HTTP requests with correlation IDs."""
 
     def __init__(self, app: ASGIApp):
-        super().__init__(app)
+        self.app = app
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Log request and response with timing and correlation ID.
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Log request and response with timing and correlation ID."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
 
-        Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
+        headers = Headers(scope=scope)
+        method = scope["method"]
+        path = scope["path"]
 
-        Returns:
-            HTTP response
-        """
         # Generate or extract correlation ID
-        correlation_id = request.headers.get("X-Request-ID")
+        correlation_id = headers.get("X-Request-ID")
         if not correlation_id:
             correlation_id = set_request_id()
         else:
             set_request_id(correlation_id)
 
         # Start timer
-        start_time = time.time()
+        start_time = time.perf_counter()
 
         # Log incoming request
+        client = scope.get("client")
         logger.info(
             "Request started",
             extra={
                 "extra_fields": {
-                    "method": request.method,
-                    "path": request.url.path,
-                    "query_params": dict(request.query_params),
-                    "client_ip": request.client.host if request.client else None,
-                    "user_agent": request.headers.get("user-agent"),
+                    "method": method,
+                    "path": path,
+                    "query_params": dict(QueryParams(scope.get("query_string", b""))),
+                    "client_ip": client[0] if client else None,
+                    "user_agent": headers.get("user-agent"),
                 }
             },
         )
 
+        status_code = None
+
+        async def send_with_headers(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+                duration_ms = (time.perf_counter() - start_time) * 1000
+
+                # Add correlation ID to response headers
+                response_headers = MutableHeaders(scope=message)
+                response_headers["X-Request-ID"] = correlation_id
+                response_headers["X-Response-Time"] = f"{round(duration_ms, 2)}ms"
+            await send(message)
+
         # Process request
         try:
-            response = await call_next(request)
-
-            # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
+            await self.app(scope, receive, send_with_headers)
 
             # Log response
+            duration_ms = (time.perf_counter() - start_time) * 1000
             logger.info(
                 "Request completed",
                 extra={
                     "extra_fields": {
-                        "method": request.method,
-                        "path": request.url.path,
-                        "status_code": response.status_code,
+                        "method": method,
+                        "path": path,
+                        "status_code": status_code,
                         "duration_ms": round(duration_ms, 2),
                     }
                 },
             )
 
-            # Add correlation ID to response headers
-            response.headers["X-Request-ID"] = correlation_id
-            response.headers["X-Response-Time"] = f"{round(duration_ms, 2)}ms"
-
-            return response
-
         except Exception as e:
             # Calculate duration
-            duration_ms = (time.time() - start_time) * 1000
+            duration_ms = (time.perf_counter() - start_time) * 1000
 
             # Log error
             logger.error(
                 "Request failed",
                 extra={
                     "extra_fields": {
-                        "method": request.method,
-                        "path": request.url.path,
+                        "method": method,
+                        "path": path,
                         "duration_ms": round(duration_ms, 2),
                         "error": str(e),
                         "error_type": type(e).__name__,
@@ -104,8 +114,8 @@ class RequestLoggingMiddleware(BaseHTTPMiddleware):
             clear_request_id()
 
 
-class MetricsMiddleware(BaseHTTPMiddleware):
-    """Middleware for collecting request metrics.
+class RequestMetrics:
+    """In-process request counters shared by MetricsMiddleware and ``/metrics``.
 
     Tracks:
     - Request count by endpoint and method
@@ -114,8 +124,7 @@ class MetricsMiddleware(BaseHTTPMiddleware):
     - Active requests
     """
 
-    def __init__(self, app: ASGIApp):
-        super().__init__(app)
+    def __init__(self):
         self._metrics = {
             "requests_total": 0,
             "requests_in_progress": 0,
@@ -124,52 +133,38 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             "total_duration_seconds": 0.0,
         }
 
-    async def dispatch(self, request: Request, call_next: Callable) -> Response:
-        """Track request metrics.
-
-        Args:
-            request: Incoming HTTP request
-            call_next: Next middleware or route handler
-
-        Returns:
-            HTTP response
-        """
-        # Increment active requests
+    def request_started(self) -> None:
+        """Mark a request as in progress."""
         self._metrics["requests_in_progress"] += 1
 
-        # Start timer
-        start_time = time.time()
-
-        try:
-            response = await call_next(request)
-
-            # Track metrics
-            duration = time.time() - start_time
-            endpoint = f"{request.method} {request.url.path}"
-
-            self._metrics["requests_total"] += 1
-            self._metrics["total_duration_seconds"] += duration
+    def request_finished(self) -> None:
+        """Mark an in-progress request as finished (successfully or not)."""
+        self._metrics["requests_in_progress"] -= 1
 
-            # Track by endpoint
-            if endpoint not in self._metrics["requests_by_endpoint"]:
-                self._metrics["requests_by_endpoint"][endpoint] = {
-                    "count": 0,
-                    "total_duration": 0.0,
-                }
-            self._metrics["requests_by_endpoint"][endpoint]["count"] += 1
-            self._metrics["requests_by_endpoint"][endpoint]["total_duration"] += duration
-
-            # Track by status code
-            status_code = response.status_code
-            if status_code not in self._metrics["requests_by_status"]:
-                self._metrics["requests_by_status"][status_code] = 0
-            self._metrics["requests_by_status"][status_code] += 1
+    def record(self, endpoint: str, status_code: int, duration: float) -> None:
+        """Record a completed request.
 
-            return response
+        Args:
+            endpoint: "METHOD /path"
+            status_code: Response status code
+            duration: Request duration in seconds
+        """
+        self._metrics["requests_total"] += 1
+        self._metrics["total_duration_seconds"] += duration
+
+        # Track by endpoint
+        if endpoint not in self._metrics["requests_by_endpoint"]:
+            self._metrics["requests_by_endpoint"][endpoint] = {
+                "count": 0,
+                "total_duration": 0.0,
+            }
+        self._metrics["requests_by_endpoint"][endpoint]["count"] += 1
+        self._metrics["requests_by_endpoint"][endpoint]["total_duration"] += duration
 
-        finally:
-            # Decrement active requests
-            self._metrics["requests_in_progress"] -= 1
+        # Track by status code
+        if status_code not in self._metrics["requests_by_status"]:
+            self._metrics["requests_by_status"][status_code] = 0
+        self._metrics["requests_by_status"][status_code] += 1
 
     def get_metrics(self) -> dict:
         """Get current metrics.
@@ -201,3 +196,43 @@ class MetricsMiddleware(BaseHTTPMiddleware):
             "requests_by_endpoint": endpoints,
             "requests_by_status": self._metrics["requests_by_status"],
         }
+
+
+class MetricsMiddleware:
+    """Middleware for collecting request metrics into a ``RequestMetrics``."""
+
+    def __init__(self, app: ASGIApp, metrics: RequestMetrics):
+        self.app = app
+        self.metrics = metrics
+
+    async def __call__(self, scope: Scope, receive: Receive, send: Send) -> None:
+        """Track request metrics."""
+        if scope["type"] != "http":
+            await self.app(scope, receive, send)
+            return
+
+        status_code = 500
+
+        async def send_with_status(message: Message) -> None:
+            nonlocal status_code
+            if message["type"] == "http.response.start":
+                status_code = message["status"]
+            await send(message)
+
+        # Increment active requests
+        self.metrics.request_started()
+
+        # Start timer
+        start_time = time.perf_counter()
+
+        try:
+            await self.app(scope, receive, send_with_status)
+            self.metrics.record(
+                f"{scope['method']} {scope['path']}",
+                status_code,
+                time.perf_counter() - start_time,
+            )
+
+        finally:
+            # Decrement active requests
+            self.metrics.request_finished()
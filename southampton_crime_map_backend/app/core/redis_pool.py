@@ -0,0 +1,61 @@
+"""Process-wide Redis clients.
+
+Services used to open (and ping) their own Redis client per instance, which meant
+a new connection pool and an extra round trip for every request. Clients are now
+created once per event loop and shared. Keying by loop keeps Celery tasks, which
+each run in a fresh loop, from reusing connections bound to a closed one.
+"""
+
+import asyncio
+import logging
+from typing import Dict, Optional, Tuple
+
+import redis.asyncio as redis
+
+from app.config import get_settings
+
+logger = logging.getLogger(__name__)
+settings = get_settings()
+
+# decode_responses -> (owning event loop, client)
+_clients: Dict[bool, Tuple[asyncio.AbstractEventLoop, redis.Redis]] = {}
+
+
+async def get_redis(decode_responses: bool = True) -> Optional[redis.Redis]:
+    """Get the shared Redis client for the running event loop.
+
+    Args:
+        decode_responses: Return str values (True) or raw bytes (False)
+
+    Returns:
+        Redis client, or None if Redis is unreachable (callers skip caching)
+    """
+    loop = asyncio.get_running_loop()
+    entry = _clients.get(decode_responses)
+    if entry is not None and entry[0] is loop:
+        return entry[1]
+
+    try:
+        client = redis.from_url(
+            settings.REDIS_URL,
+            decode_responses=decode_responses,
+            max_connections=settings.REDIS_MAX_CONNECTIONS,
+        )
+        await client.ping()
+    except Exception as e:
+        logger.warning(f"Redis connection failed: {str(e)}. Caching disabled.")
+        return None
+
+    logger.debug("Redis connection pool established")
+    _clients[decode_responses] = (loop, client)
+    return client
+
+
+async def close_redis() -> None:
+    """Close the shared clients (on application shutdown)."""
+    for _, client in list(_clients.values()):
+        try:
+            await client.aclose()
+        except Exception as e:
+            logger.warning(f"Redis close error: {str(e)}")
+    _clients.clear()
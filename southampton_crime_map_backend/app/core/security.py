@@ -1,45 +1,148 @@
 """Security utilities for password hashing and JWT tokens."""
 
+import asyncio
 import hashlib
+import hmac
+import logging
+import math
+import os
 import secrets
-from datetime import datetime, timedelta
+import time
+from concurrent.futures import ThreadPoolExecutor
+from datetime import datetime, timedelta, timezone
 from typing import Any, Optional, Tuple
 
-from jose import JWTError, jwt
-from passlib.context import CryptContext
+from argon2 import PasswordHasher, extract_parameters
+from argon2.exceptions import InvalidHashError, VerificationError
+from jose import JWTError, jwk, jwt
 
 from app.config import get_settings
 
+logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# Password hashing context (Argon2id)
-pwd_context = CryptContext(schemes=["argon2"], deprecated="auto")
+# Argon2 releases the GIL, so hashing on these threads runs in parallel with the
+# event loop; one thread per core, since each hash keeps a core busy
+_hashing_executor = ThreadPoolExecutor(
+    max_workers=os.cpu_count() or 1, thread_name_prefix="password-hash"
+)
+
+# Upper bound for calibration, so a slow or contended host can't push it to extremes
+_MAX_ARGON2_TIME_COST = 16
+
+# Token lifetimes, fixed by settings at import
+ACCESS_TOKEN_TTL = timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
+REFRESH_TOKEN_TTL = timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+
+# Password hashing (Argon2id). Hashes record their own parameters, so changing the
+# settings only affects new hashes; weaker ones are upgraded on the next login.
+# calibrate_password_hasher() may replace this at startup.
+password_hasher = PasswordHasher(
+    time_cost=settings.ARGON2_TIME_COST,
+    memory_cost=settings.ARGON2_MEMORY_COST,
+    parallelism=settings.ARGON2_PARALLELISM,
+)
+
+# Built once: given the secret as a str, jose tries to parse it as a JWK (JSON)
+# and constructs a new key object on every encode/decode
+_jwt_key = jwk.construct(settings.JWT_SECRET_KEY, settings.JWT_ALGORITHM)
+
+# Refresh tokens are stored only as keyed hashes, so a leaked table can't be
+# matched against tokens without this key as well
+_refresh_token_key = (settings.REFRESH_TOKEN_PEPPER or settings.JWT_SECRET_KEY).encode()
 
 
 def hash_password(password: str) -> str:
     """Hash a password using Argon2id."""
-    return pwd_context.hash(password)
+    return password_hasher.hash(password)
 
 
 def verify_password(plain_password: str, hashed_password: str) -> bool:
     """Verify a password against a hash."""
-    return pwd_context.verify(plain_password, hashed_password)
+    try:
+        return password_hasher.verify(hashed_password, plain_password)
+    except (VerificationError, InvalidHashError):
+        return False
+
+
+async def hash_password_async(password: str) -> str:
+    """hash_password on the hashing pool, keeping the event loop free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(_hashing_executor, hash_password, password)
+
+
+async def verify_password_async(plain_password: str, hashed_password: str) -> bool:
+    """verify_password on the hashing pool, keeping the event loop free."""
+    loop = asyncio.get_running_loop()
+    return await loop.run_in_executor(
+        _hashing_executor, verify_password, plain_password, hashed_password
+    )
+
+
+def password_needs_rehash(hashed_password: str) -> bool:
+    """Whether a hash was made with weaker parameters than the current ones.
+
+    Only weaker hashes count: workers calibrated to slightly different time costs
+    would otherwise keep rehashing each other's passwords.
+    """
+    try:
+        params = extract_parameters(hashed_password)
+    except InvalidHashError:
+        return True
+    current = password_hasher
+    return (
+        params.type != current.type
+        or params.time_cost < current.time_cost
+        or params.memory_cost < current.memory_cost
+        or params.parallelism < current.parallelism
+    )
+
+
+def calibrate_password_hasher(target_ms: int = settings.ARGON2_TARGET_MS) -> int:
+    """Pick the Argon2 time cost that makes one hash take about ``target_ms`` here.
+
+    One pass is timed at time_cost=1 and scaled, since cost grows about linearly
+    with the time cost. The configured ARGON2_TIME_COST is used as a floor.
+
+    Returns:
+        The time cost now in use
+    """
+    global password_hasher
+
+    if target_ms <= 0:
+        return password_hasher.time_cost
+
+    probe = PasswordHasher(
+        time_cost=1,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+    start = time.perf_counter()
+    probe.hash("calibration")
+    pass_ms = (time.perf_counter() - start) * 1000
+
+    time_cost = min(
+        max(settings.ARGON2_TIME_COST, math.ceil(target_ms / pass_ms)), _MAX_ARGON2_TIME_COST
+    )
+    password_hasher = PasswordHasher(
+        time_cost=time_cost,
+        memory_cost=settings.ARGON2_MEMORY_COST,
+        parallelism=settings.ARGON2_PARALLELISM,
+    )
+    logger.info(f"Argon2 calibrated: time_cost={time_cost} ({pass_ms:.0f}ms per pass)")
+    return time_cost
 
 
 def create_access_token(subject: str, expires_delta: timedelta | None = None) -> str:
     """Create a JWT access token."""
-    if expires_delta:
-        expire = datetime.utcnow() + expires_delta
-    else:
-        expire = datetime.utcnow() + timedelta(minutes=settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES)
-
+    now = datetime.now(timezone.utc)
     to_encode = {
-        "exp": expire,
-        "iat": datetime.utcnow(),
+        "exp": now + (expires_delta or ACCESS_TOKEN_TTL),
+        "iat": now,
         "sub": str(subject),
         "type": "access",
     }
-    encoded_jwt = jwt.encode(to_encode, settings.JWT_SECRET_KEY, algorithm=settings.JWT_ALGORITHM)
+    encoded_jwt = jwt.encode(to_encode, _jwt_key, algorithm=settings.JWT_ALGORITHM)
     return encoded_jwt
 
 
@@ -49,8 +152,12 @@ def create_refresh_token() -> str:
 
 
 def hash_refresh_token(token: str) -> str:
-    """Hash a refresh token using SHA256."""
-    return hashlib.sha256(token.encode()).hexdigest()
+    """Hash a refresh token with HMAC-SHA256.
+
+    Sessions are found by an indexed equality lookup on this hash; the raw token
+    is never stored or compared in Python.
+    """
+    return hmac.new(_refresh_token_key, token.encode(), hashlib.sha256).hexdigest()
 
 
 def decode_token(token: str) -> dict[str, Any]:
@@ -62,7 +169,7 @@ def decode_token(token: str) -> dict[str, Any]:
     try:
         payload = jwt.decode(
             token,
-            settings.JWT_SECRET_KEY,
+            _jwt_key,
             algorithms=[settings.JWT_ALGORITHM],
         )
         return payload
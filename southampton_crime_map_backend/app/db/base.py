@@ -2,7 +2,9 @@
 
 from typing import Generator
 
-from sqlalchemy import create_engine
+from geoalchemy2 import Geometry
+from sqlalchemy import JSON, create_engine
+from sqlalchemy.dialects.postgresql import JSONB
 from sqlalchemy.orm import Session, declarative_base, sessionmaker
 
 from app.config import get_settings
@@ -13,21 +15,49 @@ settings = get_settings()
 engine = create_engine(
     settings.DATABASE_URL,
     pool_pre_ping=True,
-    pool_size=10,
-    max_overflow=20,
+    pool_size=settings.DB_POOL_SIZE,
+    max_overflow=settings.DB_MAX_OVERFLOW,
+    pool_timeout=settings.DB_POOL_TIMEOUT,
+    pool_recycle=settings.DB_POOL_RECYCLE,
+    # Room for every repository/service statement shape so none is recompiled
+    # after being evicted (SQLAlchemy's default is 500)
+    query_cache_size=1200,
 )
 
-# Create session factory
-SessionLocal = sessionmaker(autocommit=False, autoflush=False, bind=engine)
+# Create session factory. Objects stay loaded after commit, so reading them
+# afterwards does not re-SELECT.
+SessionLocal = sessionmaker(autocommit=False, autoflush=False, expire_on_commit=False, bind=engine)
 
 # Create declarative base
 Base = declarative_base()
 
+# JSON document column type: binary JSONB on PostgreSQL, plain JSON elsewhere (SQLite tests)
+JSONDocument = JSON().with_variant(JSONB(), "postgresql")
+
+
+class CacheableGeometry(Geometry):
+    """GeoAlchemy2 ``Geometry`` that opts in to SQLAlchemy's statement cache.
+
+    ``Geometry`` leaves ``cache_ok`` unset, so any statement touching a geometry
+    column (including the ORM's INSERTs) was recompiled on every execution. Its
+    constructor arguments are plain hashable values, which makes caching safe.
+    """
+
+    cache_ok = True
+
 
 def get_db() -> Generator[Session, None, None]:
-    """Get database session dependency."""
+    """Get database session dependency.
+
+    Commits the request's writes in one transaction once the endpoint returns and
+    rolls them back if it raises.
+    """
     db = SessionLocal()
     try:
         yield db
+        db.commit()
+    except Exception:
+        db.rollback()
+        raise
     finally:
         db.close()
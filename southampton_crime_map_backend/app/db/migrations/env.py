@@ -5,6 +5,9 @@ from logging.config import fileConfig
 from alembic import context
 from sqlalchemy import engine_from_config, pool
 
+import app.models.crime  # noqa: F401  (register every table on Base.metadata)
+import app.models.route  # noqa: F401
+import app.models.user  # noqa: F401
 from app.config import get_settings
 from app.db.base import Base
 
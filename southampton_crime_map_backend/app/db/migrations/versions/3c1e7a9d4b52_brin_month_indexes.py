@@ -0,0 +1,64 @@
+"""Replace btree month indexes with BRIN
+
+Revision ID: 3c1e7a9d4b52
+Revises: 9f553b9963f0
+Create Date: 2026-10-16 09:41:07.552913
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "3c1e7a9d4b52"
+down_revision: Union[str, None] = "9f553b9963f0"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.drop_index("ix_crime_incidents_month_desc", table_name="crime_incidents")
+    op.drop_index(op.f("ix_crime_incidents_month"), table_name="crime_incidents")
+    op.create_index(
+        "ix_crime_incidents_month_brin",
+        "crime_incidents",
+        ["month"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
+
+    op.drop_index("ix_safety_cells_month_desc", table_name="safety_cells")
+    op.drop_index(op.f("ix_safety_cells_month"), table_name="safety_cells")
+    op.create_index(
+        "ix_safety_cells_month_brin",
+        "safety_cells",
+        ["month"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
+
+    op.drop_index(op.f("ix_ingestion_runs_month"), table_name="ingestion_runs")
+    op.create_index(
+        "ix_ingestion_runs_month_brin",
+        "ingestion_runs",
+        ["month"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_runs_month_brin", table_name="ingestion_runs")
+    op.create_index(op.f("ix_ingestion_runs_month"), "ingestion_runs", ["month"], unique=False)
+
+    op.drop_index("ix_safety_cells_month_brin", table_name="safety_cells")
+    op.create_index(op.f("ix_safety_cells_month"), "safety_cells", ["month"], unique=False)
+    op.create_index("ix_safety_cells_month_desc", "safety_cells", ["month"], unique=False)
+
+    op.drop_index("ix_crime_incidents_month_brin", table_name="crime_incidents")
+    op.create_index(op.f("ix_crime_incidents_month"), "crime_incidents", ["month"], unique=False)
+    op.create_index("ix_crime_incidents_month_desc", "crime_incidents", ["month"], unique=False)
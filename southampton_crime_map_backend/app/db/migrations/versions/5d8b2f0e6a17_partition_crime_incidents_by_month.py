@@ -0,0 +1,122 @@
+"""Partition crime_incidents by month
+
+Revision ID: 5d8b2f0e6a17
+Revises: 3c1e7a9d4b52
+Create Date: 2026-10-16 10:26:53.904116
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "5d8b2f0e6a17"
+down_revision: Union[str, None] = "3c1e7a9d4b52"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+INDEXES = [
+    "ix_crime_incidents_category_id",
+    "ix_crime_incidents_force_id",
+    "ix_crime_incidents_month_category",
+    "ix_crime_incidents_month_brin",
+    "ix_crime_incidents_geom",
+    "idx_crime_incidents_geom",
+]
+
+
+def _create_indexes() -> None:
+    op.create_index(
+        op.f("ix_crime_incidents_category_id"), "crime_incidents", ["category_id"], unique=False
+    )
+    op.create_index(
+        op.f("ix_crime_incidents_force_id"), "crime_incidents", ["force_id"], unique=False
+    )
+    op.create_index(
+        "ix_crime_incidents_month_category",
+        "crime_incidents",
+        ["month", "category_id"],
+        unique=False,
+    )
+    op.create_index(
+        "ix_crime_incidents_geom",
+        "crime_incidents",
+        ["geom"],
+        unique=False,
+        postgresql_using="gist",
+    )
+
+
+def upgrade() -> None:
+    for index_name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("ALTER TABLE crime_incidents RENAME TO crime_incidents_unpartitioned")
+
+    op.execute(
+        """
+        CREATE TABLE crime_incidents (
+            LIKE crime_incidents_unpartitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id, month),
+            FOREIGN KEY (category_id) REFERENCES crime_categories (id)
+        ) PARTITION BY RANGE (month)
+        """
+    )
+    op.execute("ALTER SEQUENCE crime_incidents_id_seq OWNED BY crime_incidents.id")
+    # One partition per month already present in the data. No DEFAULT partition:
+    # ingestion creates each new month's partition on demand, and a DEFAULT holding
+    # rows for that month would make the CREATE fail.
+    op.execute(
+        """
+        DO $$
+        DECLARE
+            m date;
+        BEGIN
+            FOR m IN SELECT DISTINCT date_trunc('month', month)::date
+                     FROM crime_incidents_unpartitioned
+            LOOP
+                EXECUTE format(
+                    'CREATE TABLE %I PARTITION OF crime_incidents FOR VALUES FROM (%L) TO (%L)',
+                    'crime_incidents_' || to_char(m, 'YYYY_MM'),
+                    m,
+                    (m + interval '1 month')::date
+                );
+            END LOOP;
+        END $$;
+        """
+    )
+    op.execute("INSERT INTO crime_incidents SELECT * FROM crime_incidents_unpartitioned")
+    op.execute("DROP TABLE crime_incidents_unpartitioned")
+
+    _create_indexes()
+
+
+def downgrade() -> None:
+    for index_name in INDEXES:
+        op.execute(f"DROP INDEX IF EXISTS {index_name}")
+    op.execute("ALTER TABLE crime_incidents RENAME TO crime_incidents_partitioned")
+
+    op.execute(
+        """
+        CREATE TABLE crime_incidents (
+            LIKE crime_incidents_partitioned INCLUDING DEFAULTS,
+            PRIMARY KEY (id),
+            FOREIGN KEY (category_id) REFERENCES crime_categories (id)
+        )
+        """
+    )
+    op.execute("ALTER SEQUENCE crime_incidents_id_seq OWNED BY crime_incidents.id")
+    op.execute("INSERT INTO crime_incidents SELECT * FROM crime_incidents_partitioned")
+    # Dropping the parent drops every monthly partition with it
+    op.execute("DROP TABLE crime_incidents_partitioned")
+
+    _create_indexes()
+    # Partitions made the month BRIN index redundant; the unpartitioned table needs it
+    op.create_index(
+        "ix_crime_incidents_month_brin",
+        "crime_incidents",
+        ["month"],
+        unique=False,
+        postgresql_using="brin",
+        postgresql_with={"pages_per_range": 32},
+    )
@@ -0,0 +1,47 @@
+"""Store safety cell H3 indices as BIGINT
+
+Revision ID: 7a4c0d93e2b8
+Revises: 5d8b2f0e6a17
+Create Date: 2026-10-16 11:03:18.672430
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "7a4c0d93e2b8"
+down_revision: Union[str, None] = "5d8b2f0e6a17"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.add_column("safety_cells", sa.Column("cell_id_int", sa.BigInteger(), nullable=True))
+    # cell_id was "{h3_hex}_{YYYYMM}"; H3 hex is 15 chars, pad to 16 for bit(64)
+    op.execute(
+        """
+        UPDATE safety_cells
+        SET cell_id_int = ('x' || lpad(split_part(cell_id, '_', 1), 16, '0'))::bit(64)::bigint
+        """
+    )
+    op.drop_index(op.f("ix_safety_cells_cell_id"), table_name="safety_cells")
+    op.drop_column("safety_cells", "cell_id")
+    op.alter_column("safety_cells", "cell_id_int", new_column_name="cell_id", nullable=False)
+    op.create_unique_constraint("uq_safety_cells_cell_month", "safety_cells", ["cell_id", "month"])
+
+
+def downgrade() -> None:
+    op.drop_constraint("uq_safety_cells_cell_month", "safety_cells", type_="unique")
+    op.add_column("safety_cells", sa.Column("cell_id_str", sa.String(length=200), nullable=True))
+    op.execute(
+        """
+        UPDATE safety_cells
+        SET cell_id_str = ltrim(to_hex(cell_id), '0') || '_' || to_char(month, 'YYYYMM')
+        """
+    )
+    op.drop_column("safety_cells", "cell_id")
+    op.alter_column("safety_cells", "cell_id_str", new_column_name="cell_id", nullable=False)
+    op.create_index(op.f("ix_safety_cells_cell_id"), "safety_cells", ["cell_id"], unique=True)
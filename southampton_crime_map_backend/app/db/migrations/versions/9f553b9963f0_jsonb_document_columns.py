@@ -0,0 +1,33 @@
+"""Store JSON document columns as JSONB
+
+Revision ID: 9f553b9963f0
+Revises: ac5c912b8be6
+Create Date: 2026-10-16 09:12:40.118204
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "9f553b9963f0"
+down_revision: Union[str, None] = "ac5c912b8be6"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    op.execute("ALTER TABLE safety_cells ALTER COLUMN stats TYPE jsonb USING stats::jsonb")
+    op.execute(
+        "ALTER TABLE route_history ALTER COLUMN request_meta TYPE jsonb USING request_meta::jsonb"
+    )
+    op.execute("ALTER TABLE users ALTER COLUMN settings TYPE jsonb USING settings::jsonb")
+
+
+def downgrade() -> None:
+    op.execute("ALTER TABLE users ALTER COLUMN settings TYPE json USING settings::json")
+    op.execute(
+        "ALTER TABLE route_history ALTER COLUMN request_meta TYPE json USING request_meta::json"
+    )
+    op.execute("ALTER TABLE safety_cells ALTER COLUMN stats TYPE json USING stats::json")
@@ -0,0 +1,79 @@
+"""Partial indexes for the history list and refresh token lookup
+
+Revision ID: a9c4e7b2d516
+Revises: f1b6d2e84a30
+Create Date: 2026-10-16 15:31:52.884210
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "a9c4e7b2d516"
+down_revision: Union[str, None] = "f1b6d2e84a30"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_route_history_user_created_active",
+            "route_history",
+            ["user_id", sa.text("created_at DESC")],
+            unique=False,
+            postgresql_where="deleted_at IS NULL",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_refresh_sessions_token_active",
+            "refresh_sessions",
+            ["token_hash"],
+            unique=False,
+            postgresql_where="revoked_at IS NULL",
+            postgresql_concurrently=True,
+        )
+        # Both are covered by ix_route_history_user_created_active
+        op.drop_index(
+            "ix_route_history_user_created",
+            table_name="route_history",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_route_history_active",
+            table_name="route_history",
+            postgresql_concurrently=True,
+        )
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_route_history_active",
+            "route_history",
+            ["user_id", "deleted_at"],
+            unique=False,
+            postgresql_where="deleted_at IS NULL",
+            postgresql_concurrently=True,
+        )
+        op.create_index(
+            "ix_route_history_user_created",
+            "route_history",
+            ["user_id", "created_at"],
+            unique=False,
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_refresh_sessions_token_active",
+            table_name="refresh_sessions",
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_route_history_user_created_active",
+            table_name="route_history",
+            postgresql_concurrently=True,
+        )
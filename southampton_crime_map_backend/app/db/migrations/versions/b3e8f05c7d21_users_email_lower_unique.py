@@ -0,0 +1,27 @@
+"""Case-insensitive unique index on users.email
+
+Revision ID: b3e8f05c7d21
+Revises: a9c4e7b2d516
+Create Date: 2026-10-16 16:12:40.571936
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "b3e8f05c7d21"
+down_revision: Union[str, None] = "a9c4e7b2d516"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # Fails if existing accounts differ only by case; those must be merged first
+    op.create_index("ix_users_email_lower", "users", [sa.text("lower(email)")], unique=True)
+
+
+def downgrade() -> None:
+    op.drop_index("ix_users_email_lower", table_name="users")
@@ -0,0 +1,82 @@
+"""Denormalize crime incident location to an H3 cell column
+
+Revision ID: b81e6f4c2a95
+Revises: 7a4c0d93e2b8
+Create Date: 2026-10-16 11:47:32.204619
+
+"""
+
+from typing import Sequence, Union
+
+import h3
+import sqlalchemy as sa
+from alembic import op
+
+from app.config import get_settings
+
+# revision identifiers, used by Alembic.
+revision: str = "b81e6f4c2a95"
+down_revision: Union[str, None] = "7a4c0d93e2b8"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+BATCH_SIZE = 5000
+
+
+def upgrade() -> None:
+    op.add_column("crime_incidents", sa.Column("h3_cell", sa.BigInteger(), nullable=True))
+
+    # Backfill in keyset-paginated batches so the table is never held in memory
+    resolution = get_settings().H3_RESOLUTION
+    bind = op.get_bind()
+    select_batch = sa.text(
+        """
+        SELECT id, month, ST_Y(geom) AS lat, ST_X(geom) AS lng
+        FROM crime_incidents
+        WHERE id > :last_id
+        ORDER BY id
+        LIMIT :batch_size
+        """
+    )
+    update = sa.text(
+        "UPDATE crime_incidents SET h3_cell = :cell_id WHERE id = :id AND month = :month"
+    )
+    last_id = 0
+    while True:
+        rows = bind.execute(select_batch, {"last_id": last_id, "batch_size": BATCH_SIZE}).all()
+        if not rows:
+            break
+        bind.execute(
+            update,
+            [
+                {
+                    "id": row.id,
+                    "month": row.month,
+                    "cell_id": h3.str_to_int(h3.latlng_to_cell(row.lat, row.lng, resolution)),
+                }
+                for row in rows
+            ],
+        )
+        last_id = rows[-1].id
+
+    op.alter_column("crime_incidents", "h3_cell", nullable=False)
+    op.create_index(
+        "ix_crime_incidents_month_cell",
+        "crime_incidents",
+        ["month", "h3_cell"],
+        unique=False,
+    )
+    op.execute("DROP INDEX IF EXISTS ix_crime_incidents_geom")
+    op.execute("DROP INDEX IF EXISTS idx_crime_incidents_geom")
+
+
+def downgrade() -> None:
+    op.create_index(
+        "ix_crime_incidents_geom",
+        "crime_incidents",
+        ["geom"],
+        unique=False,
+        postgresql_using="gist",
+    )
+    op.drop_index("ix_crime_incidents_month_cell", table_name="crime_incidents")
+    op.drop_column("crime_incidents", "h3_cell")
@@ -0,0 +1,51 @@
+"""Carry mode in the history list index
+
+Revision ID: c6d1e9a47f38
+Revises: b3e8f05c7d21
+Create Date: 2026-10-16 21:32:05.114827
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "c6d1e9a47f38"
+down_revision: Union[str, None] = "b3e8f05c7d21"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def _rebuild_list_index(include: list[str] | None) -> None:
+    """Swap ix_route_history_user_created_active for a rebuilt copy, without locking writes."""
+    op.create_index(
+        "ix_route_history_user_created_active_new",
+        "route_history",
+        ["user_id", sa.text("created_at DESC")],
+        unique=False,
+        postgresql_where="deleted_at IS NULL",
+        postgresql_include=include,
+        postgresql_concurrently=True,
+    )
+    op.drop_index(
+        "ix_route_history_user_created_active",
+        table_name="route_history",
+        postgresql_concurrently=True,
+    )
+    op.execute(
+        "ALTER INDEX ix_route_history_user_created_active_new "
+        "RENAME TO ix_route_history_user_created_active"
+    )
+
+
+def upgrade() -> None:
+    # CONCURRENTLY cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        _rebuild_list_index(["mode"])
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        _rebuild_list_index(None)
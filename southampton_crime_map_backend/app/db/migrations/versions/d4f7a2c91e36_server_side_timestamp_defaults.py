@@ -0,0 +1,40 @@
+"""Use server-side now() defaults for timestamp columns
+
+Revision ID: d4f7a2c91e36
+Revises: b81e6f4c2a95
+Create Date: 2026-10-16 13:05:41.318772
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "d4f7a2c91e36"
+down_revision: Union[str, None] = "b81e6f4c2a95"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+TIMESTAMP_COLUMNS = [
+    ("crime_categories", "created_at"),
+    ("crime_categories", "updated_at"),
+    ("crime_incidents", "created_at"),
+    ("crime_incidents", "ingested_at"),
+    ("safety_cells", "updated_at"),
+    ("ingestion_runs", "started_at"),
+    ("route_history", "created_at"),
+    ("users", "created_at"),
+    ("refresh_sessions", "created_at"),
+]
+
+
+def upgrade() -> None:
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name, server_default=sa.func.now())
+
+
+def downgrade() -> None:
+    for table_name, column_name in TIMESTAMP_COLUMNS:
+        op.alter_column(table_name, column_name, server_default=None)
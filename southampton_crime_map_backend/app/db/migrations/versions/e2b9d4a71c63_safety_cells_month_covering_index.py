@@ -0,0 +1,56 @@
+"""Covering month index for safety cell count scans, replacing the month BRIN
+
+Revision ID: e2b9d4a71c63
+Revises: c6d1e9a47f38
+Create Date: 2026-10-16 22:58:41.206315
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e2b9d4a71c63"
+down_revision: Union[str, None] = "c6d1e9a47f38"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # CONCURRENTLY (and VACUUM) cannot run inside a transaction
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_safety_cells_month_covering",
+            "safety_cells",
+            ["month"],
+            unique=False,
+            postgresql_include=["cell_id", "crime_count_total", "crime_count_weighted"],
+            postgresql_concurrently=True,
+        )
+        # The covering btree serves every month filter the BRIN index did
+        op.drop_index(
+            "ix_safety_cells_month_brin",
+            table_name="safety_cells",
+            postgresql_concurrently=True,
+        )
+        # Index-only scans need the visibility map set
+        op.execute("VACUUM (ANALYZE) safety_cells")
+
+
+def downgrade() -> None:
+    with op.get_context().autocommit_block():
+        op.create_index(
+            "ix_safety_cells_month_brin",
+            "safety_cells",
+            ["month"],
+            unique=False,
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+            postgresql_concurrently=True,
+        )
+        op.drop_index(
+            "ix_safety_cells_month_covering",
+            table_name="safety_cells",
+            postgresql_concurrently=True,
+        )
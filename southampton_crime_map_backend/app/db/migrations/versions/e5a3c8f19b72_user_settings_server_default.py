@@ -0,0 +1,30 @@
+"""Give users.settings a server-side default
+
+Revision ID: e5a3c8f19b72
+Revises: d4f7a2c91e36
+Create Date: 2026-10-16 14:22:09.540183
+
+"""
+
+from typing import Sequence, Union
+
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "e5a3c8f19b72"
+down_revision: Union[str, None] = "d4f7a2c91e36"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+# Kept literal so the migration does not change if the model default does
+USER_SETTINGS_DEFAULT = (
+    '{"history_enabled":true,"history_retention_days":90,"default_safety_weight":0.8}'
+)
+
+
+def upgrade() -> None:
+    op.alter_column("users", "settings", server_default=USER_SETTINGS_DEFAULT)
+
+
+def downgrade() -> None:
+    op.alter_column("users", "settings", server_default=None)
@@ -0,0 +1,36 @@
+"""Index ingestion runs by area, month and newest start
+
+Revision ID: f1b6d2e84a30
+Revises: e5a3c8f19b72
+Create Date: 2026-10-16 14:48:31.207645
+
+"""
+
+from typing import Sequence, Union
+
+import sqlalchemy as sa
+from alembic import op
+
+# revision identifiers, used by Alembic.
+revision: str = "f1b6d2e84a30"
+down_revision: Union[str, None] = "e5a3c8f19b72"
+branch_labels: Union[str, Sequence[str], None] = None
+depends_on: Union[str, Sequence[str], None] = None
+
+
+def upgrade() -> None:
+    # The new index has (area_name, month) as its prefix, so the old one is redundant
+    op.drop_index("ix_ingestion_runs_area_month", table_name="ingestion_runs")
+    op.create_index(
+        "ix_ingestion_runs_area_month_started",
+        "ingestion_runs",
+        ["area_name", "month", sa.text("started_at DESC")],
+        unique=False,
+    )
+
+
+def downgrade() -> None:
+    op.drop_index("ix_ingestion_runs_area_month_started", table_name="ingestion_runs")
+    op.create_index(
+        "ix_ingestion_runs_area_month", "ingestion_runs", ["area_name", "month"], unique=False
+    )
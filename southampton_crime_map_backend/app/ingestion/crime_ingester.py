@@ -91,59 +91,17 @@ class CrimeIngester:
         errors = []
 
         try:
+            # Fetch every tile before touching stored data, so a run that fetches
+            # nothing (or only some tiles) leaves the previous incidents in place
+            fetched: List[List[dict]] = []
             for tile_idx, tile in enumerate(tiles):
                 logger.info(f"Processing tile {tile_idx + 1}/{len(tiles)}")
 
                 try:
                     # Fetch crimes for this tile (with automatic splitting if needed)
-                    crimes = await self.api_client.get_crimes_with_split(tile, month)
-
-                    # Normalize and insert crimes
-                    for crime_data in crimes:
-                        # Skip None values (can happen with malformed API responses)
-                        if crime_data is None:
-                            continue
-
-                        try:
-                            normalized = self.api_client.normalize_crime(crime_data)
-
-                            # Skip if missing coordinates
-                            if normalized["latitude"] == 0 or normalized["longitude"] == 0:
-                                continue
-
-                            # Convert month string to date
-                            month_str = normalized["month"]
-                            crime_month = datetime.strptime(month_str, "%Y-%m").date()
-
-                            # Create incident
-                            self.repo.create_incident(
-                                month=crime_month,
-                                category_id=normalized["category"],
-                                crime_type=normalized["crime_type"],
-                                force_id=force_id,
-                                location_desc=normalized["street_name"] or "Unknown location",
-                                latitude=normalized["latitude"],
-                                longitude=normalized["longitude"],
-                                external_id=normalized["external_id"],
-                                context=normalized["context"],
-                                persistent_id=normalized["persistent_id"],
-                            )
-                            total_crimes += 1
-
-                        except Exception as e:
-                            logger.error(
-                                f"Error processing crime record: {str(e)} - Record: {crime_data if crime_data else 'None'}"
-                            )
-                            # Rollback the session on error to continue processing
-                            self.db.rollback()
-                            continue
-
+                    fetched.append(await self.api_client.get_crimes_with_split(tile, month))
                     tiles_processed += 1
-                    self.repo.update_ingestion_run(
-                        run.id,
-                        tiles_processed=tiles_processed,
-                        records_ingested=total_crimes,
-                    )
+                    self.repo.update_ingestion_run(run.id, tiles_processed=tiles_processed)
 
                 except Exception as e:
                     error_msg = f"Error processing tile {tile_idx + 1}: {str(e)}"
@@ -151,6 +109,59 @@ class CrimeIngester:
                     errors.append(error_msg)
                     continue
 
+            if tiles_processed < len(tiles) and self.repo.has_incidents(month, force_id):
+                # A partial fetch never replaces a stored month: wiping it would keep
+                # fewer incidents than an earlier run. Only a full fetch does.
+                errors.append("Partial fetch; kept the previously stored incidents")
+                fetched = []
+            elif fetched:
+                # Start from an empty month so partial/failed runs don't leave duplicates.
+                # Incidents are keyed by force and month; area_name only labels the run.
+                self.repo.reset_incident_partition(month, force_id)
+
+            for crimes in fetched:
+                # Normalize and insert crimes
+                for crime_data in crimes:
+                    # Skip None values (can happen with malformed API responses)
+                    if crime_data is None:
+                        continue
+
+                    try:
+                        normalized = self.api_client.normalize_crime(crime_data)
+
+                        # Skip if missing coordinates
+                        if normalized["latitude"] == 0 or normalized["longitude"] == 0:
+                            continue
+
+                        # Convert month string to date
+                        month_str = normalized["month"]
+                        crime_month = datetime.strptime(month_str, "%Y-%m").date()
+
+                        # Create incident
+                        self.repo.create_incident(
+                            month=crime_month,
+                            category_id=normalized["category"],
+                            crime_type=normalized["crime_type"],
+                            force_id=force_id,
+                            location_desc=normalized["street_name"] or "Unknown location",
+                            latitude=normalized["latitude"],
+                            longitude=normalized["longitude"],
+                            external_id=normalized["external_id"],
+                            context=normalized["context"],
+                            persistent_id=normalized["persistent_id"],
+                        )
+                        total_crimes += 1
+
+                    except Exception as e:
+                        logger.error(
+                            f"Error processing crime record: {str(e)} - Record: {crime_data if crime_data else 'None'}"
+                        )
+                        # Rollback the session on error to continue processing
+                        self.db.rollback()
+                        continue
+
+                self.repo.update_ingestion_run(run.id, records_ingested=total_crimes)
+
             # Determine final status
             if tiles_processed == len(tiles):
                 status = "success"
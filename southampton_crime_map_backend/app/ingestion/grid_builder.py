@@ -6,10 +6,11 @@ Calculates crime counts, weighted scores, and category breakdowns per cell/month
 
 import logging
 from collections import defaultdict
-from datetime import date, timedelta
+from datetime import date
 from typing import Any, Dict, List, Tuple
 
 import h3
+from dateutil.relativedelta import relativedelta
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
@@ -19,12 +20,12 @@ from app.repositories.crime_repository import CrimeRepository
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
-# H3 Resolution 10 chosen for optimal balance:
+# H3 resolution comes from settings.H3_RESOLUTION (10), chosen for optimal balance:
 # - Edge length: ~73m (close to our 100m target cell size)
 # - Cell area: ~13,781 m²
 # - Resolution 9 would be too large (~193m edge)
 # - Resolution 11 would be too fine-grained (~28m edge)
-H3_RESOLUTION = 10
+# Incidents store their cell in crime_incidents.h3_cell at this resolution.
 
 
 class GridBuilder:
@@ -105,7 +106,7 @@ class GridBuilder:
 
         # Get month range
         end_date = date.today().replace(day=1)
-        start_date = end_date - timedelta(days=30 * months)
+        start_date = end_date - relativedelta(months=months)
 
         cells_created = 0
 
@@ -114,53 +115,43 @@ class GridBuilder:
         while current_month <= end_date:
             logger.info(f"Processing month: {current_month.strftime('%Y-%m')}")
 
-            # Get all incidents for this month
-            incidents = self.repo.get_incidents_by_month(current_month)
-
-            if not incidents:
-                logger.info(f"No incidents found for {current_month}")
-                current_month = (current_month.replace(day=28) + timedelta(days=4)).replace(day=1)
-                continue
-
-            logger.info(f"Found {len(incidents)} incidents for {current_month.strftime('%Y-%m')}")
-
-            # Build cells using simple grid aggregation
-            # TODO: Implement true hexagonal grid using H3 or PostGIS extensions
-            cells_created += self._build_cells_simple(current_month, incidents)
+            # Aggregate incidents into H3 cells (a month without incidents yields 0)
+            cells_created += self._build_cells_simple(current_month)
 
             # Move to next month
-            current_month = (current_month.replace(day=28) + timedelta(days=4)).replace(day=1)
+            current_month += relativedelta(months=1)
 
         logger.info(f"Safety cells build complete. Created/updated {cells_created} cells")
         return cells_created
 
-    def _build_cells_simple(self, month: date, incidents: List) -> int:
-        """Build H3 hexagonal cells from crime incidents.
+    def _build_cells_simple(self, month: date) -> int:
+        """Build H3 hexagonal cells from one month of crime incidents.
 
-        Uses H3 resolution 9 (~100m hexagons) for fine-grained spatial analysis.
+        Groups incidents by their stored H3 cell (``settings.H3_RESOLUTION``, ~73m
+        hexagons). Returns 0 when the month has no incidents.
         """
         cells_created = 0
 
-        # SQL query to get crimes with coordinates and categories
+        # Incidents carry their H3 cell, so aggregation is a plain GROUP BY
         sql = text(
             """
             SELECT
-                c.id,
+                c.h3_cell,
                 c.category_id,
-                cat.harm_weight_default,
-                ST_Y(c.geom) as lat,
-                ST_X(c.geom) as lng
+                COUNT(*) as crime_count,
+                SUM(COALESCE(cat.harm_weight_default, 1.0)) as weighted_count
             FROM crime_incidents c
             LEFT JOIN crime_categories cat ON c.category_id = cat.id
             WHERE c.month = :month
+            GROUP BY c.h3_cell, c.category_id
         """
         )
 
         try:
             result = self.db.execute(sql, {"month": month})
 
-            # Group crimes by H3 cell
-            h3_cells: Dict[str, Dict[str, Any]] = defaultdict(
+            # Fold per-category rows into one entry per H3 cell
+            h3_cells: Dict[int, Dict[str, Any]] = defaultdict(
                 lambda: {
                     "crime_count": 0,
                     "weighted_count": 0.0,
@@ -169,16 +160,14 @@ class GridBuilder:
             )
 
             for row in result:
-                # Convert crime location to H3 cell
-                h3_index = h3.latlng_to_cell(row.lat, row.lng, H3_RESOLUTION)
-
-                # Aggregate crime data
-                h3_cells[h3_index]["crime_count"] += 1
-                h3_cells[h3_index]["weighted_count"] += float(row.harm_weight_default or 1.0)
-                h3_cells[h3_index]["category_stats"][row.category_id] += 1
+                h3_cells[row.h3_cell]["crime_count"] += row.crime_count
+                h3_cells[row.h3_cell]["weighted_count"] += float(row.weighted_count)
+                h3_cells[row.h3_cell]["category_stats"][row.category_id] += row.crime_count
 
             # Create safety cells for each H3 hexagon
-            for h3_index, data in h3_cells.items():
+            for cell_id, data in h3_cells.items():
+                h3_index = h3.int_to_str(cell_id)
+
                 # Get H3 cell boundary as WKT polygon
                 boundary = h3.cell_to_boundary(h3_index)
                 # boundary is list of (lat, lng) tuples - H3 returns in WGS84 (EPSG:4326)
@@ -188,8 +177,6 @@ class GridBuilder:
                 first_point = boundary[0]
                 geom_wkt = f"SRID=4326;POLYGON(({wkt_coords}, {first_point[1]} {first_point[0]}))"
 
-                cell_id = f"{h3_index}_{month.strftime('%Y%m')}"
-
                 self.repo.create_or_update_cell(
                     cell_id=cell_id,
                     geom_wkt=geom_wkt,
@@ -201,7 +188,7 @@ class GridBuilder:
                 cells_created += 1
 
             logger.info(
-                f"Created {cells_created} H3 hexagonal cells (resolution {H3_RESOLUTION}) for {month.strftime('%Y-%m')}"
+                f"Created {cells_created} H3 hexagonal cells (resolution {settings.H3_RESOLUTION}) for {month.strftime('%Y-%m')}"
             )
 
         except Exception as e:
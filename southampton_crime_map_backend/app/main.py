@@ -9,16 +9,19 @@ from typing import AsyncGenerator
 
 from fastapi import FastAPI, Request
 from fastapi.middleware.cors import CORSMiddleware
-from fastapi.responses import JSONResponse
+from fastapi.responses import ORJSONResponse
 from slowapi import _rate_limit_exceeded_handler
 from slowapi.errors import RateLimitExceeded
 
 from app.api.v1 import admin, auth, routes, safety, users
 from app.config import get_settings
 from app.core.exceptions import SafeRouteException
+from app.core.http_pool import close_http_client
 from app.core.logging_config import get_logger, setup_logging
-from app.core.middleware import MetricsMiddleware, RequestLoggingMiddleware
+from app.core.middleware import MetricsMiddleware, RequestLoggingMiddleware, RequestMetrics
 from app.core.rate_limit import limiter
+from app.core.redis_pool import close_redis, get_redis
+from app.core.security import calibrate_password_hasher
 
 
 @asynccontextmanager
@@ -29,9 +32,16 @@ async def lifespan(app: FastAPI) -> AsyncGenerator:
     setup_logging()
     logger = get_logger(__name__)
     logger.info(f"Starting SafeRoute API in {settings.APP_ENV} mode")
+    # Size password hashing to this host (tests keep the cheap configured cost)
+    if settings.APP_ENV != "test":
+        calibrate_password_hasher()
+    # Open the shared Redis pool up front (caching is skipped if it's unreachable)
+    await get_redis()
     yield
     # Shutdown
     logger.info("Shutting down SafeRoute API")
+    await close_redis()
+    await close_http_client()
 
 
 # Create FastAPI application
@@ -49,6 +59,7 @@ Authentication is optional. Authenticated users get route history tracking, cust
     docs_url="/docs",
     redoc_url="/redoc",
     lifespan=lifespan,
+    default_response_class=ORJSONResponse,
     contact={
         "name": "SafeRoute API Support",
         "url": "https://github.com/ss2d22/saferoute",
@@ -97,8 +108,8 @@ app.state.limiter = limiter
 app.add_exception_handler(RateLimitExceeded, _rate_limit_exceeded_handler)
 
 # Add metrics middleware (must be added before request logging for accurate timing)
-metrics_middleware = MetricsMiddleware(app)
-app.add_middleware(MetricsMiddleware)
+request_metrics = RequestMetrics()
+app.add_middleware(MetricsMiddleware, metrics=request_metrics)
 
 # Add request logging middleware
 app.add_middleware(RequestLoggingMiddleware)
@@ -112,15 +123,15 @@ app.add_middleware(
     allow_headers=["*"],
 )
 
-# Store metrics middleware reference for metrics endpoint
-app.state.metrics_middleware = metrics_middleware
+# Store the shared metrics collector for the metrics endpoint
+app.state.request_metrics = request_metrics
 
 
 # Global exception handler for custom exceptions
 @app.exception_handler(SafeRouteException)
 async def saferoute_exception_handler(request: Request, exc: SafeRouteException):
     """Handle SafeRoute custom exceptions."""
-    return JSONResponse(
+    return ORJSONResponse(
         status_code=exc.status_code,
         content={
             "error": exc.__class__.__name__,
@@ -150,8 +161,7 @@ async def get_metrics(request: Request):
 
     Returns request counts, response times, and status codes.
     """
-    metrics_middleware = request.app.state.metrics_middleware
-    return metrics_middleware.get_metrics()
+    return request.app.state.request_metrics.get_metrics()
 
 
 # Include API routers
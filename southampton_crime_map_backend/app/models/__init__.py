@@ -1,8 +1,27 @@
-"""Database models."""
+"""Database models.
 
-from app.models.crime import CrimeCategory, CrimeIncident, IngestionRun, SafetyCell
-from app.models.route import RouteHistory
-from app.models.user import RefreshSession, User
+Models are re-exported lazily (PEP 562) so importing one model does not pull in
+every other model module and its dependencies. Code that needs every table on
+``Base.metadata`` (``create_all``, Alembic) must import the model modules itself.
+"""
+
+import importlib
+from typing import TYPE_CHECKING, Any
+
+if TYPE_CHECKING:
+    from app.models.crime import CrimeCategory, CrimeIncident, IngestionRun, SafetyCell
+    from app.models.route import RouteHistory
+    from app.models.user import RefreshSession, User
+
+_LAZY_MODELS = {
+    "User": "app.models.user",
+    "RefreshSession": "app.models.user",
+    "RouteHistory": "app.models.route",
+    "CrimeCategory": "app.models.crime",
+    "CrimeIncident": "app.models.crime",
+    "SafetyCell": "app.models.crime",
+    "IngestionRun": "app.models.crime",
+}
 
 __all__ = [
     "User",
@@ -13,3 +32,9 @@ __all__ = [
     "SafetyCell",
     "IngestionRun",
 ]
+
+
+def __getattr__(name: str) -> Any:
+    if name in _LAZY_MODELS:
+        return getattr(importlib.import_module(_LAZY_MODELS[name]), name)
+    raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
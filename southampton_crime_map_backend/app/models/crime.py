@@ -5,9 +5,7 @@ from datetime import date, datetime
 from decimal import Decimal
 from typing import Any
 
-from geoalchemy2 import Geometry
 from sqlalchemy import (
-    JSON,
     BigInteger,
     Boolean,
     Date,
@@ -18,11 +16,14 @@ from sqlalchemy import (
     Integer,
     String,
     Text,
+    UniqueConstraint,
+    desc,
+    func,
 )
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
+from app.db.base import Base, CacheableGeometry, JSONDocument
 
 
 class CrimeCategory(Base):
@@ -36,10 +37,10 @@ class CrimeCategory(Base):
     is_personal: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     is_property: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     def __repr__(self) -> str:
@@ -47,13 +48,21 @@ class CrimeCategory(Base):
 
 
 class CrimeIncident(Base):
-    """Crime incident from UK Police API."""
+    """Crime incident from UK Police API.
+
+    The table is range-partitioned by month, so ``month`` is part of the primary
+    key. There is no DEFAULT partition: ``CrimeRepository.reset_incident_partition``
+    creates each month's partition before it is ingested. ``h3_cell`` is the H3 cell
+    (at ``settings.H3_RESOLUTION``) containing the point, computed at insert time so
+    grid aggregation is a plain ``GROUP BY`` rather than a spatial query. Changing the
+    resolution means recomputing it for existing rows.
+    """
 
     __tablename__ = "crime_incidents"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
     external_id: Mapped[str | None] = mapped_column(String(200), nullable=True)
-    month: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    month: Mapped[date] = mapped_column(Date, primary_key=True, nullable=False)
     category_id: Mapped[str] = mapped_column(
         String(100), ForeignKey("crime_categories.id"), nullable=False, index=True
     )
@@ -63,18 +72,22 @@ class CrimeIncident(Base):
     lsoa_code: Mapped[str | None] = mapped_column(String(100), nullable=True)
     force_id: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
     location_desc: Mapped[str] = mapped_column(Text, nullable=False)
-    geom: Mapped[Any] = mapped_column(Geometry("POINT", srid=4326), nullable=False)
+    geom: Mapped[Any] = mapped_column(
+        CacheableGeometry("POINT", srid=4326, spatial_index=False), nullable=False
+    )
+    h3_cell: Mapped[int] = mapped_column(BigInteger, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     ingested_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
 
     __table_args__ = (
+        # Each partition holds a single month, so month needs no index of its own
         Index("ix_crime_incidents_month_category", "month", "category_id"),
-        Index("ix_crime_incidents_month_desc", "month"),
-        Index("ix_crime_incidents_geom", "geom", postgresql_using="gist"),
+        Index("ix_crime_incidents_month_cell", "month", "h3_cell"),
+        {"postgresql_partition_by": "RANGE (month)"},
     )
 
     def __repr__(self) -> str:
@@ -84,26 +97,34 @@ class CrimeIncident(Base):
 class SafetyCell(Base):
     """Pre-aggregated safety grid cell.
 
-    Stores H3 hexagonal grid cells with crime statistics.
+    Stores H3 hexagonal grid cells with crime statistics, one row per cell and month.
+    ``cell_id`` is the 64-bit H3 index; use ``h3.int_to_str`` for the hex form.
     Geometry is stored in WGS84 (EPSG:4326) to match H3's coordinate system.
     """
 
     __tablename__ = "safety_cells"
 
     id: Mapped[int] = mapped_column(BigInteger, primary_key=True, autoincrement=True)
-    cell_id: Mapped[str] = mapped_column(String(200), nullable=False, unique=True, index=True)
-    geom: Mapped[Any] = mapped_column(Geometry("POLYGON", srid=4326), nullable=False)
-    month: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    cell_id: Mapped[int] = mapped_column(BigInteger, nullable=False)  # H3 index as int64
+    geom: Mapped[Any] = mapped_column(CacheableGeometry("POLYGON", srid=4326), nullable=False)
+    month: Mapped[date] = mapped_column(Date, nullable=False)
     crime_count_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
     crime_count_weighted: Mapped[Decimal] = mapped_column(Float, default=0, nullable=False)
-    stats: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
+    stats: Mapped[dict[str, Any]] = mapped_column(JSONDocument, default=dict, nullable=False)
     updated_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, onupdate=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), onupdate=func.now(), nullable=False
     )
 
     __table_args__ = (
+        UniqueConstraint("cell_id", "month", name="uq_safety_cells_cell_month"),
         Index("ix_safety_cells_geom", "geom", postgresql_using="gist"),
-        Index("ix_safety_cells_month_desc", "month"),
+        # Month count scans (grid snapshots, health checks) run as index-only scans;
+        # it also serves every other month filter, so there is no separate BRIN index
+        Index(
+            "ix_safety_cells_month_covering",
+            "month",
+            postgresql_include=["cell_id", "crime_count_total", "crime_count_weighted"],
+        ),
     )
 
     def __repr__(self) -> str:
@@ -117,12 +138,12 @@ class IngestionRun(Base):
 
     id: Mapped[uuid.UUID] = mapped_column(UUID(as_uuid=True), primary_key=True, default=uuid.uuid4)
     area_name: Mapped[str] = mapped_column(String(100), nullable=False, index=True)
-    month: Mapped[date] = mapped_column(Date, nullable=False, index=True)
+    month: Mapped[date] = mapped_column(Date, nullable=False)
     status: Mapped[str] = mapped_column(
         String(50), nullable=False, index=True
     )  # pending, running, success, failed, partial
     started_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     finished_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     error_message: Mapped[str | None] = mapped_column(Text, nullable=True)
@@ -131,8 +152,15 @@ class IngestionRun(Base):
     tiles_total: Mapped[int] = mapped_column(Integer, default=0, nullable=False)
 
     __table_args__ = (
-        Index("ix_ingestion_runs_area_month", "area_name", "month"),
+        # Serves get_latest_ingestion_run's ORDER BY started_at DESC LIMIT 1 without a sort
+        Index("ix_ingestion_runs_area_month_started", "area_name", "month", desc("started_at")),
         Index("ix_ingestion_runs_status", "status"),
+        Index(
+            "ix_ingestion_runs_month_brin",
+            "month",
+            postgresql_using="brin",
+            postgresql_with={"pages_per_range": 32},
+        ),
     )
 
     def __repr__(self) -> str:
@@ -5,12 +5,11 @@ from datetime import datetime
 from decimal import Decimal
 from typing import Any
 
-from geoalchemy2 import Geometry
-from sqlalchemy import JSON, DateTime, Float, ForeignKey, Index, Integer, String
+from sqlalchemy import DateTime, Float, ForeignKey, Index, Integer, String, desc, func
 from sqlalchemy.dialects.postgresql import UUID
 from sqlalchemy.orm import Mapped, mapped_column
 
-from app.db.base import Base
+from app.db.base import Base, CacheableGeometry, JSONDocument
 
 
 class RouteHistory(Base):
@@ -23,7 +22,7 @@ class RouteHistory(Base):
         UUID(as_uuid=True), ForeignKey("users.id", ondelete="CASCADE"), nullable=False, index=True
     )
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     origin_lat: Mapped[float] = mapped_column(Float, nullable=False)
     origin_lng: Mapped[float] = mapped_column(Float, nullable=False)
@@ -33,17 +32,22 @@ class RouteHistory(Base):
     safety_score_best: Mapped[Decimal | None] = mapped_column(Float, nullable=True)  # 0-100
     distance_m_best: Mapped[int | None] = mapped_column(Integer, nullable=True)
     duration_s_best: Mapped[int | None] = mapped_column(Integer, nullable=True)
-    request_meta: Mapped[dict[str, Any]] = mapped_column(JSON, default=dict, nullable=False)
-    route_geom: Mapped[Any | None] = mapped_column(Geometry("LINESTRING", srid=4326), nullable=True)
+    request_meta: Mapped[dict[str, Any]] = mapped_column(JSONDocument, default=dict, nullable=False)
+    # Deferred: only loaded when accessed or explicitly undeferred
+    route_geom: Mapped[Any | None] = mapped_column(
+        CacheableGeometry("LINESTRING", srid=4326), nullable=True, deferred=True
+    )
     deleted_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
 
     __table_args__ = (
-        Index("ix_route_history_user_created", "user_id", "created_at"),
+        # Matches get_user_history: active rows for a user, newest first. mode is
+        # carried in the index so the mode filter is checked before the heap fetch
         Index(
-            "ix_route_history_active",
+            "ix_route_history_user_created_active",
             "user_id",
-            "deleted_at",
+            desc("created_at"),
             postgresql_where="deleted_at IS NULL",
+            postgresql_include=["mode"],
         ),
         Index(
             "ix_route_history_geom",
@@ -52,6 +56,8 @@ class RouteHistory(Base):
             postgresql_where="route_geom IS NOT NULL",
         ),
     )
+    # Fetch created_at with INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f"<RouteHistory(id={self.id}, user_id={self.user_id}, mode={self.mode})>"
@@ -1,14 +1,26 @@
 """User and authentication models."""
 
+import json
 import uuid
 from datetime import datetime
+from types import MappingProxyType
 from typing import Any
 
-from sqlalchemy import JSON, Boolean, DateTime, ForeignKey, Index, String, Text
+from sqlalchemy import Boolean, DateTime, ForeignKey, Index, String, Text, func, text
 from sqlalchemy.dialects.postgresql import UUID
-from sqlalchemy.orm import Mapped, mapped_column
+from sqlalchemy.orm import Mapped, mapped_column, relationship
 
-from app.db.base import Base
+from app.db.base import Base, JSONDocument
+
+USER_SETTINGS_DEFAULTS = MappingProxyType(
+    {
+        "history_enabled": True,
+        "history_retention_days": 90,
+        "default_safety_weight": 0.8,
+    }
+)
+# Serialized once; new rows take the default from the database
+USER_SETTINGS_DEFAULT_JSON = json.dumps(dict(USER_SETTINGS_DEFAULTS), separators=(",", ":"))
 
 
 class User(Base):
@@ -22,20 +34,22 @@ class User(Base):
     is_active: Mapped[bool] = mapped_column(Boolean, default=True, nullable=False)
     is_superuser: Mapped[bool] = mapped_column(Boolean, default=False, nullable=False)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     last_login_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
     settings: Mapped[dict[str, Any]] = mapped_column(
-        JSON,
-        default=lambda: {
-            "history_enabled": True,
-            "history_retention_days": 90,
-            "default_safety_weight": 0.8,
-        },
+        JSONDocument,
+        server_default=USER_SETTINGS_DEFAULT_JSON,
         nullable=False,
     )
 
-    __table_args__ = (Index("ix_users_created_at", "created_at"),)
+    __table_args__ = (
+        Index("ix_users_created_at", "created_at"),
+        # Emails are matched case-insensitively (see UserRepository.get_by_email)
+        Index("ix_users_email_lower", text("lower(email)"), unique=True),
+    )
+    # Fetch server defaults (created_at, settings) with INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f"<User(id={self.id}, email={self.email})>"
@@ -52,7 +66,7 @@ class RefreshSession(Base):
     )
     token_hash: Mapped[str] = mapped_column(String, nullable=False, index=True)
     created_at: Mapped[datetime] = mapped_column(
-        DateTime(timezone=True), default=datetime.utcnow, nullable=False
+        DateTime(timezone=True), server_default=func.now(), nullable=False
     )
     expires_at: Mapped[datetime] = mapped_column(DateTime(timezone=True), nullable=False)
     revoked_at: Mapped[datetime | None] = mapped_column(DateTime(timezone=True), nullable=True)
@@ -61,9 +75,17 @@ class RefreshSession(Base):
     )  # IPv4 (15) or IPv6 (45)
     user_agent: Mapped[str | None] = mapped_column(Text, nullable=True)
 
+    user: Mapped[User] = relationship()
+
     __table_args__ = (
         Index("ix_refresh_sessions_user_id", "user_id"),
         Index("ix_refresh_sessions_token_hash", "token_hash"),
+        # Refresh and logout only ever look up unrevoked tokens
+        Index(
+            "ix_refresh_sessions_token_active",
+            "token_hash",
+            postgresql_where="revoked_at IS NULL",
+        ),
         Index("ix_refresh_sessions_expires_at", "expires_at"),
         Index(
             "ix_refresh_sessions_active",
@@ -72,6 +94,8 @@ class RefreshSession(Base):
             postgresql_where="revoked_at IS NULL",
         ),
     )
+    # Fetch created_at with INSERT ... RETURNING
+    __mapper_args__ = {"eager_defaults": True}
 
     def __repr__(self) -> str:
         return f"<RefreshSession(id={self.id}, user_id={self.user_id})>"
@@ -1,13 +1,26 @@
 """Crime data repository."""
 
-from datetime import date, datetime
-from typing import Any, Dict, List, Optional
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Sequence, Tuple
 
+import h3
+import numpy as np
 from geoalchemy2 import WKTElement
-from sqlalchemy import and_
-from sqlalchemy.orm import Session
+from geoalchemy2.shape import from_shape
+from shapely import prepare
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy import and_, cast, exists, func, select, text, update
+from sqlalchemy.dialects.postgresql import JSONB
+from sqlalchemy.orm import Session, defer
 
+from app.config import get_settings
 from app.models.crime import CrimeCategory, CrimeIncident, IngestionRun, SafetyCell
+from app.utils.geometry import h3_cell_polygon
+
+settings = get_settings()
+
+# Rows per fetch when streaming cell statistics (get_cell_stats_for_months)
+_STATS_BATCH_SIZE = 5000
 
 
 class CrimeRepository:
@@ -15,6 +28,7 @@ class CrimeRepository:
 
     def __init__(self, db: Session):
         self.db = db
+        self._dialect = db.bind.dialect.name
 
     # Crime Categories
     def get_category(self, category_id: str) -> Optional[CrimeCategory]:
@@ -62,10 +76,7 @@ class CrimeRepository:
         lsoa_code: Optional[str] = None,
     ) -> CrimeIncident:
         """Create a crime incident."""
-        # Detect if we're using SQLite or PostgreSQL
-        dialect_name = self.db.bind.dialect.name
-
-        if dialect_name == "sqlite":
+        if self._dialect == "sqlite":
             # For SQLite, store as WKT string
             geom_value = f"SRID=4326;POINT({longitude} {latitude})"
         else:
@@ -83,6 +94,7 @@ class CrimeRepository:
             force_id=force_id,
             location_desc=location_desc,
             geom=geom_value,
+            h3_cell=h3.str_to_int(h3.latlng_to_cell(latitude, longitude, settings.H3_RESOLUTION)),
         )
         self.db.add(incident)
         self.db.commit()
@@ -98,42 +110,115 @@ class CrimeRepository:
             query = query.filter(CrimeIncident.force_id == force_id)
         return query.all()
 
+    def has_incidents(self, month: date, force_id: str) -> bool:
+        """Whether any of one force's incidents are stored for a month."""
+        return bool(
+            self.db.scalar(
+                select(
+                    exists().where(
+                        CrimeIncident.month == month.replace(day=1),
+                        CrimeIncident.force_id == force_id,
+                    )
+                )
+            )
+        )
+
+    def reset_incident_partition(self, month: date, force_id: str) -> None:
+        """Clear one force's incidents for a month before (re)ingesting it.
+
+        On PostgreSQL this first creates the month's partition if needed. When the
+        partition holds no other force's rows it is truncated, which is far cheaper
+        than a DELETE; otherwise only this force's rows are deleted. Other dialects
+        always delete.
+        """
+        month = month.replace(day=1)
+        scoped = and_(CrimeIncident.month == month, CrimeIncident.force_id == force_id)
+        if self._dialect != "postgresql":
+            self.db.query(CrimeIncident).filter(scoped).delete(synchronize_session=False)
+            self.db.commit()
+            return
+
+        next_month = (month + timedelta(days=32)).replace(day=1)
+        partition = f"crime_incidents_{month.strftime('%Y_%m')}"
+        self.db.execute(
+            text(
+                f"CREATE TABLE IF NOT EXISTS {partition} PARTITION OF crime_incidents "
+                f"FOR VALUES FROM ('{month.isoformat()}') TO ('{next_month.isoformat()}')"
+            )
+        )
+        shared = self.db.execute(
+            text(f"SELECT EXISTS (SELECT 1 FROM {partition} WHERE force_id <> :force_id)"),
+            {"force_id": force_id},
+        ).scalar()
+        if shared:
+            self.db.query(CrimeIncident).filter(scoped).delete(synchronize_session=False)
+        else:
+            self.db.execute(text(f"TRUNCATE TABLE {partition}"))
+        self.db.commit()
+
     # Safety Cells
     def create_or_update_cell(
         self,
-        cell_id: str,
+        cell_id: int,
         geom_wkt: str,
         month: date,
         crime_count_total: int,
         crime_count_weighted: float,
-        stats: Dict[str, Any],
+        stats: Optional[Dict[str, Any]] = None,
+        stats_delta: Optional[Dict[str, Any]] = None,
     ) -> SafetyCell:
-        """Create or update a safety cell."""
-        # Detect dialect first
-        dialect_name = self.db.bind.dialect.name
-
-        # Check if cell exists
-        query = self.db.query(SafetyCell).filter(SafetyCell.cell_id == cell_id)
+        """Create or update a safety cell.
 
-        # For SQLite, defer loading the geom column to avoid PostGIS functions
-        if dialect_name == "sqlite":
-            from sqlalchemy.orm import defer
+        ``stats`` replaces the stored category stats; ``stats_delta`` is merged into
+        them instead. Only one of the two may be given. On PostgreSQL an existing
+        cell is updated with a single UPDATE (the merge runs server-side as
+        ``stats || :delta``) and the returned cell has ``stats`` deferred, so the
+        document is never read back.
+        """
+        if stats is not None and stats_delta is not None:
+            raise ValueError("Pass either stats or stats_delta, not both")
 
-            query = query.options(defer(SafetyCell.geom))
+        match = and_(SafetyCell.cell_id == cell_id, SafetyCell.month == month)
 
-        cell = query.first()
+        if self._dialect != "sqlite":
+            values: Dict[str, Any] = {
+                "crime_count_total": crime_count_total,
+                "crime_count_weighted": crime_count_weighted,
+            }
+            if stats_delta is not None:
+                values["stats"] = SafetyCell.stats.op("||")(cast(stats_delta, JSONB))
+            elif stats is not None:
+                values["stats"] = stats
+            updated_id = self.db.execute(
+                update(SafetyCell)
+                .where(match)
+                .values(**values)
+                .returning(SafetyCell.id)
+                .execution_options(synchronize_session=False)
+            ).scalar_one_or_none()
+            if updated_id is not None:
+                self.db.commit()
+                return self.db.get(
+                    SafetyCell,
+                    updated_id,
+                    options=[defer(SafetyCell.stats)],
+                    populate_existing=True,
+                )
+            cell = None
+        else:
+            # For SQLite, defer loading the geom column to avoid PostGIS functions
+            cell = self.db.query(SafetyCell).filter(match).options(defer(SafetyCell.geom)).first()
 
         if cell:
-            # Update existing
+            # Update existing (SQLite): merge in Python
             cell.crime_count_total = crime_count_total
             cell.crime_count_weighted = crime_count_weighted
-            cell.stats = stats
-            cell.updated_at = datetime.utcnow()
+            if stats_delta is not None:
+                cell.stats = {**(cell.stats or {}), **stats_delta}
+            elif stats is not None:
+                cell.stats = stats
         else:
-            # Detect if we're using SQLite or PostgreSQL
-            dialect_name = self.db.bind.dialect.name
-
-            if dialect_name == "sqlite":
+            if self._dialect == "sqlite":
                 # For SQLite, store as WKT string
                 geom_value = geom_wkt
             else:
@@ -154,7 +239,7 @@ class CrimeRepository:
                 month=month,
                 crime_count_total=crime_count_total,
                 crime_count_weighted=crime_count_weighted,
-                stats=stats,
+                stats=stats_delta if stats_delta is not None else (stats or {}),
             )
             self.db.add(cell)
 
@@ -162,17 +247,119 @@ class CrimeRepository:
         self.db.refresh(cell)
         return cell
 
-    def get_cells_by_month(self, month: date) -> List[SafetyCell]:
-        """Get all safety cells for a specific month."""
-        from sqlalchemy.orm import defer
+    def get_cells_by_month(self, month: date, with_geometry: bool = True) -> List[SafetyCell]:
+        """Get all safety cells for a specific month.
+
+        Pass ``with_geometry=False`` when the caller never touches ``geom`` so the
+        EWKB bytes are not transferred or hydrated.
+        """
+        stmt = select(SafetyCell).where(SafetyCell.month == month)
+        # For SQLite: always defer geom to avoid AsEWKB() function call
+        if not with_geometry or self._dialect == "sqlite":
+            stmt = stmt.options(defer(SafetyCell.geom))
 
-        # For SQLite: defer loading geom to avoid AsEWKB() function call
-        dialect_name = self.db.bind.dialect.name
-        query_base = self.db.query(SafetyCell)
-        if dialect_name == "sqlite":
-            query_base = query_base.options(defer(SafetyCell.geom))
+        return list(self.db.scalars(stmt.execution_options(yield_per=1000)))
 
-        return query_base.filter(SafetyCell.month == month).all()
+    def get_cells_between(
+        self, start_month: date, end_month: date, with_geometry: bool = True
+    ) -> List[SafetyCell]:
+        """Get all safety cells for months in ``[start_month, end_month)``.
+
+        One query for a whole lookback window instead of one per month.
+        """
+        stmt = select(SafetyCell).where(
+            SafetyCell.month >= start_month, SafetyCell.month < end_month
+        )
+        # For SQLite: always defer geom to avoid AsEWKB() function call
+        if not with_geometry or self._dialect == "sqlite":
+            stmt = stmt.options(defer(SafetyCell.geom))
+
+        return list(self.db.scalars(stmt.execution_options(yield_per=1000)))
+
+    def get_cell_stats_for_months(
+        self,
+        months: List[date],
+        categories: Sequence[str] = (),
+        time_buckets: Sequence[str] = (),
+        within: Optional[BaseGeometry] = None,
+    ) -> Dict[date, Tuple[np.ndarray, np.ndarray]]:
+        """Get safety cell statistics for several months as NumPy arrays.
+
+        The counts are read out of the ``stats`` document in SQL, so no ORM objects
+        or per-cell dicts are built. Each month maps to ``(cell_ids, values)``: an
+        int64 array of H3 indices, and a float array with one row per cell and the
+        columns ``crime_count_weighted``, then each of ``categories`` (from
+        ``category_counts``), then each of ``time_buckets`` (from
+        ``time_buckets``). Missing counts read as 0. Every requested month is a
+        key. Pass an EPSG:4326 ``within`` area to keep only cells intersecting it;
+        on PostgreSQL the test runs in PostGIS against the GIST index on ``geom``.
+        """
+        columns = [SafetyCell.crime_count_weighted]
+        columns += [
+            func.coalesce(SafetyCell.stats[("category_counts", cat_id)].as_float(), 0.0)
+            for cat_id in categories
+        ]
+        columns += [
+            func.coalesce(SafetyCell.stats[("time_buckets", bucket)].as_float(), 0.0)
+            for bucket in time_buckets
+        ]
+
+        month_index = {month: i for i, month in enumerate(dict.fromkeys(months))}
+        if not month_index:
+            return {}
+
+        stmt = select(SafetyCell.month, SafetyCell.cell_id, *columns).where(
+            SafetyCell.month.in_(list(month_index))
+        )
+        if within is not None and self._dialect != "sqlite":
+            stmt = stmt.where(SafetyCell.geom.ST_Intersects(from_shape(within, srid=4326)))
+        if within is not None and self._dialect == "sqlite":
+            prepare(within)
+
+        # Stream the rows and pack each batch into arrays as it arrives, so only
+        # one batch of Row objects is alive at a time
+        month_chunks, id_chunks, value_chunks = [], [], []
+        result = self.db.execute(stmt.execution_options(yield_per=_STATS_BATCH_SIZE))
+        for chunk in result.partitions():
+            if within is not None and self._dialect == "sqlite":
+                # No spatial functions: test each cell's hexagon, rebuilt from H3
+                chunk = [row for row in chunk if within.intersects(h3_cell_polygon(row[1]))]
+            n = len(chunk)
+            month_chunks.append(np.fromiter((month_index[row[0]] for row in chunk), np.intp, n))
+            id_chunks.append(np.fromiter((row[1] for row in chunk), np.int64, n))
+            value_chunks.append(
+                np.array([row[2:] for row in chunk], dtype=float).reshape(n, len(columns))
+            )
+
+        month_idx = np.concatenate(month_chunks or [np.empty(0, dtype=np.intp)])
+        cell_ids = np.concatenate(id_chunks or [np.empty(0, dtype=np.int64)])
+        values = np.concatenate(value_chunks or [np.empty((0, len(columns)))])
+
+        # Group by month: stable sort on the month index, then split at the boundaries
+        order = np.argsort(month_idx, kind="stable")
+        bounds = np.cumsum(np.bincount(month_idx, minlength=len(month_index)))[:-1]
+        return {
+            month: (month_ids, month_values)
+            for month, month_ids, month_values in zip(
+                month_index, np.split(cell_ids[order], bounds), np.split(values[order], bounds)
+            )
+        }
+
+    def get_cell_counts_by_month(self, month: date) -> List[Tuple[int, int, float]]:
+        """Get (cell_id, crime_count_total, crime_count_weighted) for a month's cells.
+
+        Only the three columns are selected and rows are fetched in batches of 1000,
+        so no ORM objects are built.
+        """
+        result = self.db.execute(
+            select(
+                SafetyCell.cell_id, SafetyCell.crime_count_total, SafetyCell.crime_count_weighted
+            )
+            .where(SafetyCell.month == month)
+            .order_by(SafetyCell.cell_id)
+            .execution_options(yield_per=1000)
+        )
+        return [tuple(row) for row in result]
 
     # Ingestion Runs
     def create_ingestion_run(
@@ -1,20 +1,76 @@
 """Route history repository."""
 
+import json
 import uuid
 from datetime import date, datetime, timedelta
-from typing import List, Optional, Tuple
+from typing import List, Optional, Tuple, Union
 
-from sqlalchemy import and_, desc, or_
+from geoalchemy2 import WKBElement, WKTElement
+from geoalchemy2.shape import from_shape
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy import and_, desc, func, or_, select, text, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.models.route import RouteHistory
 
+# SQLite test path only: built once so the statement is not re-parsed per insert
+_SQLITE_INSERT_HISTORY = text(
+    """
+    INSERT INTO route_history (
+        id, user_id, created_at, origin_lat, origin_lng,
+        destination_lat, destination_lng, mode, safety_score_best,
+        distance_m_best, duration_s_best, request_meta, route_geom, deleted_at
+    ) VALUES (
+        :id, :user_id, :created_at, :origin_lat, :origin_lng,
+        :destination_lat, :destination_lng, :mode, :safety_score_best,
+        :distance_m_best, :duration_s_best, :request_meta, :route_geom, :deleted_at
+    )
+    """
+)
+
+# Columns returned by get_user_history (everything the history list shows)
+_HISTORY_LIST_COLUMNS = (
+    RouteHistory.id,
+    RouteHistory.created_at,
+    RouteHistory.origin_lat,
+    RouteHistory.origin_lng,
+    RouteHistory.destination_lat,
+    RouteHistory.destination_lng,
+    RouteHistory.mode,
+    RouteHistory.safety_score_best,
+    RouteHistory.distance_m_best,
+    RouteHistory.duration_s_best,
+)
+
+
+def _to_wkt_element(wkt: str, default_srid: int = 4326) -> WKTElement:
+    """Wrap (E)WKT as a WKTElement, moving any "SRID=n;" prefix into the SRID."""
+    if wkt.startswith("SRID="):
+        srid, wkt = wkt.split(";", 1)
+        return WKTElement(wkt, srid=int(srid[5:]))
+    return WKTElement(wkt, srid=default_srid)
+
+
+def _to_geom_element(
+    geom: Union[str, BaseGeometry], default_srid: int = 4326
+) -> Union[WKBElement, WKTElement]:
+    """Bind a Shapely geometry as WKB, or (E)WKT text as a WKTElement."""
+    if isinstance(geom, BaseGeometry):
+        return from_shape(geom, srid=default_srid)
+    return _to_wkt_element(geom, default_srid)
+
 
 class RouteRepository:
-    """Route history data access layer."""
+    """Route history data access layer.
+
+    Request-path methods flush but never commit; the request's ``get_db``
+    dependency commits once the endpoint has finished.
+    """
 
     def __init__(self, db: Session):
         self.db = db
+        self._dialect = db.bind.dialect.name
 
     def create_history(
         self,
@@ -28,38 +84,26 @@ class RouteRepository:
         distance_m_best: int,
         duration_s_best: int,
         request_meta: dict,
-        route_geom: Optional[str] = None,
+        route_geom: Optional[Union[str, BaseGeometry]] = None,
     ) -> RouteHistory:
-        """Create a route history entry."""
-        dialect_name = self.db.bind.dialect.name
+        """Create a route history entry.
 
-        if dialect_name == "sqlite":
+        ``route_geom`` may be WKT or a Shapely geometry in EPSG:4326. A geometry
+        is sent to PostGIS as binary WKB, which is smaller on the wire than WKT
+        and needs no text parsing.
+        """
+        if self._dialect == "sqlite":
             # For SQLite: Use raw SQL to bypass GeoAlchemy2's GeomFromEWKT() wrapper
-            import json
-            from datetime import datetime
-
-            from sqlalchemy import text
-
-            history_id = str(uuid.uuid4()).replace("-", "")
+            history_id = uuid.uuid4()
             now = datetime.utcnow()
+            if isinstance(route_geom, BaseGeometry):
+                route_geom = route_geom.wkt
 
             self.db.execute(
-                text(
-                    """
-                    INSERT INTO route_history (
-                        id, user_id, created_at, origin_lat, origin_lng,
-                        destination_lat, destination_lng, mode, safety_score_best,
-                        distance_m_best, duration_s_best, request_meta, route_geom, deleted_at
-                    ) VALUES (
-                        :id, :user_id, :created_at, :origin_lat, :origin_lng,
-                        :destination_lat, :destination_lng, :mode, :safety_score_best,
-                        :distance_m_best, :duration_s_best, :request_meta, :route_geom, :deleted_at
-                    )
-                """
-                ),
+                _SQLITE_INSERT_HISTORY,
                 {
-                    "id": history_id,
-                    "user_id": str(user_id).replace("-", ""),
+                    "id": history_id.hex,
+                    "user_id": user_id.hex,
                     "created_at": now,
                     "origin_lat": origin_lat,
                     "origin_lng": origin_lng,
@@ -74,12 +118,11 @@ class RouteRepository:
                     "deleted_at": None,
                 },
             )
-            self.db.commit()
 
             # For SQLite: Don't fetch back (would trigger AsEWKB() on geometry column)
             # Instead, construct a RouteHistory object manually
             history = RouteHistory()
-            history.id = uuid.UUID(history_id)
+            history.id = history_id
             history.user_id = user_id
             history.created_at = now
             history.origin_lat = origin_lat
@@ -96,18 +139,7 @@ class RouteRepository:
             return history
         else:
             # For PostgreSQL/PostGIS: Use ORM with WKTElement
-            geom_value = None
-            if route_geom:
-                from geoalchemy2 import WKTElement
-
-                # Remove SRID prefix if present (WKTElement handles SRID separately)
-                wkt_str = route_geom
-                srid = 4326  # default
-                if route_geom.startswith("SRID="):
-                    parts = route_geom.split(";", 1)
-                    srid = int(parts[0].replace("SRID=", ""))
-                    wkt_str = parts[1]
-                geom_value = WKTElement(wkt_str, srid=srid)
+            geom_value = _to_geom_element(route_geom) if route_geom is not None else None
 
             history = RouteHistory(
                 user_id=user_id,
@@ -123,8 +155,8 @@ class RouteRepository:
                 route_geom=geom_value,
             )
             self.db.add(history)
-            self.db.commit()
-            self.db.refresh(history)
+            # Assigns the row without reading anything back (route_geom is deferred)
+            self.db.flush()
             return history
 
     def get_user_history(
@@ -135,107 +167,211 @@ class RouteRepository:
         mode: Optional[str] = None,
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
-    ) -> Tuple[List[RouteHistory], int]:
+        before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> Tuple[List[Row], int]:
         """Get user's route history with pagination.
 
+        Only the columns the history list shows are selected, as plain rows
+        rather than RouteHistory instances. The page and the total come from one
+        statement via ``COUNT(*) OVER ()``.
+
+        ``before`` is a keyset cursor: pass the ``(created_at, id)`` of the last
+        row of the previous page to seek straight to the next one through
+        ix_route_history_user_created_active, instead of skipping ``offset`` rows.
+        ``id`` breaks ties between rows created in the same instant. The total
+        then counts the rows from the cursor on.
+
         Returns:
-            Tuple of (history_list, total_count)
+            Tuple of (history_rows, total_count)
         """
-        from sqlalchemy.orm import defer
-
-        # For SQLite: defer loading route_geom to avoid AsEWKB() function call
-        dialect_name = self.db.bind.dialect.name
-        query_base = self.db.query(RouteHistory)
-        if dialect_name == "sqlite":
-            query_base = query_base.options(defer(RouteHistory.route_geom))
-
-        query = query_base.filter(
-            and_(
-                RouteHistory.user_id == user_id,
-                RouteHistory.deleted_at.is_(None),
-            )
-        )
-
+        conditions = [
+            RouteHistory.user_id == user_id,
+            RouteHistory.deleted_at.is_(None),
+        ]
         if mode:
-            query = query.filter(RouteHistory.mode == mode)
+            conditions.append(RouteHistory.mode == mode)
         if from_date:
-            query = query.filter(RouteHistory.created_at >= from_date)
+            conditions.append(RouteHistory.created_at >= from_date)
         if to_date:
-            query = query.filter(RouteHistory.created_at <= to_date)
-
-        total = query.count()
+            conditions.append(RouteHistory.created_at <= to_date)
+        if before:
+            before_at, before_id = before
+            conditions.append(
+                or_(
+                    RouteHistory.created_at < before_at,
+                    and_(RouteHistory.created_at == before_at, RouteHistory.id < before_id),
+                )
+            )
 
-        history = query.order_by(desc(RouteHistory.created_at)).limit(limit).offset(offset).all()
+        rows = self.db.execute(
+            select(*_HISTORY_LIST_COLUMNS, func.count().over().label("total"))
+            .where(and_(*conditions))
+            .order_by(desc(RouteHistory.created_at), desc(RouteHistory.id))
+            .limit(limit)
+            .offset(offset)
+        ).all()
 
-        return history, total
+        if rows:
+            return rows, rows[0].total
+        if offset == 0:
+            return [], 0
+        # Past the last page the window has no rows to report the total on
+        total = self.db.scalar(
+            select(func.count()).select_from(RouteHistory).where(and_(*conditions))
+        )
+        return [], total
 
     def get_history_by_id(
         self, history_id: uuid.UUID, user_id: uuid.UUID
     ) -> Optional[RouteHistory]:
-        """Get a specific history item for a user."""
-        from sqlalchemy.orm import defer
-
-        # For SQLite: defer loading route_geom to avoid AsEWKB() function call
-        dialect_name = self.db.bind.dialect.name
-        query = self.db.query(RouteHistory)
-        if dialect_name == "sqlite":
-            query = query.options(defer(RouteHistory.route_geom))
-
-        return query.filter(
-            and_(
-                RouteHistory.id == history_id,
-                RouteHistory.user_id == user_id,
-                RouteHistory.deleted_at.is_(None),
+        """Get a specific history item for a user.
+
+        ``route_geom`` is deferred on the model, so it is not selected here.
+        """
+        return (
+            self.db.query(RouteHistory)
+            .filter(
+                and_(
+                    RouteHistory.id == history_id,
+                    RouteHistory.user_id == user_id,
+                    RouteHistory.deleted_at.is_(None),
+                )
             )
-        ).first()
+            .first()
+        )
 
     def delete_history_item(self, history_id: uuid.UUID, user_id: uuid.UUID) -> bool:
-        """Soft delete a single history item."""
-        history = self.get_history_by_id(history_id, user_id)
-        if history:
-            history.deleted_at = datetime.utcnow()
-            self.db.commit()
-            return True
-        return False
-
-    def delete_all_user_history(self, user_id: uuid.UUID) -> int:
-        """Soft delete all history for a user.
-
-        Returns:
-            Number of items deleted
-        """
+        """Soft delete a single history item with one UPDATE (no prior SELECT)."""
         count = (
             self.db.query(RouteHistory)
             .filter(
                 and_(
+                    RouteHistory.id == history_id,
                     RouteHistory.user_id == user_id,
                     RouteHistory.deleted_at.is_(None),
                 )
             )
-            .update({"deleted_at": datetime.utcnow()})
+            .update({"deleted_at": datetime.utcnow()}, synchronize_session=False)
         )
-        self.db.commit()
-        return count
+        return count > 0
 
-    def hard_delete_old_records(self, days: int = 365) -> int:
+    def delete_all_user_history(self, user_id: uuid.UUID, batch_size: int = 1000) -> int:
+        """Soft delete all history for a user.
+
+        Rows are soft deleted ``batch_size`` at a time, committing after each
+        batch, so a user with a long history never holds thousands of row locks
+        in one transaction. Unlike the other request-path methods this commits;
+        if it fails part way the deleted batches stay deleted and a retry picks
+        up the rest. The UPDATEs do not synchronize the session.
+
+        Returns:
+            Number of items deleted
+        """
+        active = and_(RouteHistory.user_id == user_id, RouteHistory.deleted_at.is_(None))
+        batch = select(RouteHistory.id).where(active).limit(batch_size).scalar_subquery()
+        stmt = (
+            update(RouteHistory)
+            .where(RouteHistory.id.in_(batch))
+            .execution_options(synchronize_session=False)
+        )
+
+        total = 0
+        while True:
+            deleted = self.db.execute(stmt.values(deleted_at=datetime.utcnow())).rowcount
+            self.db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    def soft_delete_old_records(self, cutoff: datetime, batch_size: int = 10000) -> int:
+        """Soft delete live records created before ``cutoff``.
+
+        Rows are soft deleted ``batch_size`` at a time, committing after each
+        batch, like hard_delete_old_records: a large backlog never holds one long
+        transaction, and on PostgreSQL rows locked by other transactions are
+        skipped and picked up next run.
+
+        Returns:
+            Number of records deleted
+        """
+        predicate = "deleted_at IS NULL AND created_at < :cutoff"
+        if self._dialect == "postgresql":
+            stmt = text(
+                f"""
+                WITH batch AS (
+                    SELECT ctid FROM route_history
+                    WHERE {predicate}
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
+                )
+                UPDATE route_history SET deleted_at = :deleted_at FROM batch
+                WHERE route_history.ctid = batch.ctid
+                """
+            )
+        else:
+            stmt = text(
+                f"""
+                UPDATE route_history SET deleted_at = :deleted_at WHERE rowid IN (
+                    SELECT rowid FROM route_history
+                    WHERE {predicate}
+                    LIMIT :batch_size
+                )
+                """
+            )
+
+        params = {"cutoff": cutoff, "deleted_at": datetime.utcnow(), "batch_size": batch_size}
+        total = 0
+        while True:
+            deleted = self.db.execute(stmt, params).rowcount
+            self.db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
+
+    def hard_delete_old_records(self, days: int = 365, batch_size: int = 10000) -> int:
         """Hard delete records older than specified days.
 
+        Rows are deleted ``batch_size`` at a time, committing after each batch, so
+        a large purge never holds one long transaction or lock. On PostgreSQL,
+        rows locked by other transactions are skipped and picked up next run.
+
         Returns:
             Number of records deleted
         """
         cutoff_date = datetime.utcnow() - timedelta(days=days)
-        count = (
-            self.db.query(RouteHistory)
-            .filter(
-                or_(
-                    RouteHistory.deleted_at < cutoff_date,
-                    and_(
-                        RouteHistory.deleted_at.is_(None),
-                        RouteHistory.created_at < cutoff_date,
-                    ),
+        predicate = "(deleted_at < :cutoff OR (deleted_at IS NULL AND created_at < :cutoff))"
+        if self._dialect == "postgresql":
+            stmt = text(
+                f"""
+                WITH batch AS (
+                    SELECT ctid FROM route_history
+                    WHERE {predicate}
+                    ORDER BY created_at
+                    LIMIT :batch_size
+                    FOR UPDATE SKIP LOCKED
                 )
+                DELETE FROM route_history USING batch
+                WHERE route_history.ctid = batch.ctid
+                """
             )
-            .delete()
-        )
-        self.db.commit()
-        return count
+        else:
+            stmt = text(
+                f"""
+                DELETE FROM route_history WHERE rowid IN (
+                    SELECT rowid FROM route_history
+                    WHERE {predicate}
+                    ORDER BY created_at
+                    LIMIT :batch_size
+                )
+                """
+            )
+
+        total = 0
+        while True:
+            deleted = self.db.execute(
+                stmt, {"cutoff": cutoff_date, "batch_size": batch_size}
+            ).rowcount
+            self.db.commit()
+            total += deleted
+            if deleted < batch_size:
+                return total
@@ -4,37 +4,45 @@ import uuid
 from datetime import datetime
 from typing import Optional
 
-from sqlalchemy import and_
+from sqlalchemy import and_, func, select, update
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.models.user import RefreshSession, User
 
 
 class UserRepository:
-    """User data access layer."""
+    """User data access layer.
+
+    Methods flush but never commit; the request's ``get_db`` dependency commits
+    once the endpoint has finished.
+    """
 
     def __init__(self, db: Session):
         self.db = db
 
     def get_by_id(self, user_id: uuid.UUID) -> Optional[User]:
-        """Get user by ID."""
-        return self.db.query(User).filter(User.id == user_id).first()
+        """Get user by ID.
+
+        A user already loaded in this session (e.g. by get_by_email during login)
+        is returned from the identity map without another SELECT.
+        """
+        return self.db.get(User, user_id)
 
     def get_by_email(self, email: str) -> Optional[User]:
-        """Get user by email."""
-        return self.db.query(User).filter(User.email == email).first()
+        """Get user by email, ignoring case (served by ix_users_email_lower)."""
+        return self.db.query(User).filter(func.lower(User.email) == email.lower()).first()
 
     def create(self, email: str, hashed_password: str) -> User:
-        """Create a new user."""
+        """Create a new user. The email is stored lowercased."""
         user = User(
-            email=email,
+            email=email.lower(),
             hashed_password=hashed_password,
             is_active=True,
             is_superuser=False,
         )
         self.db.add(user)
-        self.db.commit()
-        self.db.refresh(user)
+        self.db.flush()
         return user
 
     def update_last_login(self, user_id: uuid.UUID) -> None:
@@ -42,7 +50,14 @@ class UserRepository:
         user = self.get_by_id(user_id)
         if user:
             user.last_login_at = datetime.utcnow()
-            self.db.commit()
+            self.db.flush()
+
+    def update_password(self, user_id: uuid.UUID, hashed_password: str) -> None:
+        """Replace a user's password hash."""
+        user = self.get_by_id(user_id)
+        if user:
+            user.hashed_password = hashed_password
+            self.db.flush()
 
     def update_settings(self, user_id: uuid.UUID, settings: dict) -> Optional[User]:
         """Update user settings."""
@@ -53,8 +68,7 @@ class UserRepository:
             user.settings.update(settings)
             # Mark the settings column as modified so SQLAlchemy persists the change
             flag_modified(user, "settings")
-            self.db.commit()
-            self.db.refresh(user)
+            self.db.flush()
         return user
 
     def delete(self, user_id: uuid.UUID) -> bool:
@@ -62,7 +76,7 @@ class UserRepository:
         user = self.get_by_id(user_id)
         if user:
             self.db.delete(user)
-            self.db.commit()
+            self.db.flush()
             return True
         return False
 
@@ -83,37 +97,84 @@ class UserRepository:
             user_agent=user_agent,
         )
         self.db.add(session)
-        self.db.commit()
-        self.db.refresh(session)
+        self.db.flush()
         return session
 
+    @staticmethod
+    def _active_session(token_hash: str):
+        """Filter matching the unrevoked, unexpired session for a token hash."""
+        return and_(
+            RefreshSession.token_hash == token_hash,
+            RefreshSession.revoked_at.is_(None),
+            RefreshSession.expires_at > datetime.utcnow(),
+        )
+
     def get_refresh_session(self, token_hash: str) -> Optional[RefreshSession]:
         """Get an active refresh session by token hash."""
-        return (
-            self.db.query(RefreshSession)
-            .filter(
-                and_(
-                    RefreshSession.token_hash == token_hash,
-                    RefreshSession.revoked_at.is_(None),
-                    RefreshSession.expires_at > datetime.utcnow(),
-                )
-            )
-            .first()
-        )
+        return self.db.query(RefreshSession).filter(self._active_session(token_hash)).first()
 
-    def revoke_refresh_session(self, session_id: uuid.UUID) -> None:
-        """Revoke a refresh session."""
-        session = self.db.query(RefreshSession).filter(RefreshSession.id == session_id).first()
-        if session:
-            session.revoked_at = datetime.utcnow()
-            self.db.commit()
+    def rotate_refresh_session(self, token_hash: str) -> Optional[Row]:
+        """Revoke the active session for a token hash, returning what its successor needs.
+
+        One UPDATE ... RETURNING both checks and revokes the session, so a token
+        can only ever be rotated once, even by concurrent requests: the second
+        UPDATE waits on the row lock and then matches nothing.
+
+        Returns:
+            Row of (user_id, ip_address, user_agent, user_is_active), or None if
+            no active session matched
+        """
+        user_is_active = (
+            select(User.is_active).where(User.id == RefreshSession.user_id).scalar_subquery()
+        )
+        return self.db.execute(
+            update(RefreshSession)
+            .where(self._active_session(token_hash))
+            .values(revoked_at=datetime.utcnow())
+            .returning(
+                RefreshSession.user_id,
+                RefreshSession.ip_address,
+                RefreshSession.user_agent,
+                user_is_active.label("user_is_active"),
+            )
+            .execution_options(synchronize_session=False)
+        ).first()
 
     def revoke_all_user_sessions(self, user_id: uuid.UUID) -> None:
-        """Revoke all refresh sessions for a user."""
+        """Revoke all refresh sessions for a user.
+
+        Runs as one UPDATE without synchronizing the session, so RefreshSession
+        instances already loaded in this session keep their old ``revoked_at``.
+        """
         self.db.query(RefreshSession).filter(
             and_(
                 RefreshSession.user_id == user_id,
                 RefreshSession.revoked_at.is_(None),
             )
-        ).update({"revoked_at": datetime.utcnow()})
-        self.db.commit()
+        ).update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+
+    def revoke_refresh_session_by_token(self, token_hash: str, revoke_all: bool = False) -> bool:
+        """Revoke the active session for a token hash in one UPDATE (no prior SELECT).
+
+        With ``revoke_all`` every active session of the token's owner is revoked,
+        the owner being looked up in a subquery of the same statement.
+
+        Returns:
+            False if no active session matched the token hash
+        """
+        if revoke_all:
+            owner = (
+                select(RefreshSession.user_id)
+                .where(self._active_session(token_hash))
+                .scalar_subquery()
+            )
+            condition = and_(RefreshSession.user_id == owner, RefreshSession.revoked_at.is_(None))
+        else:
+            condition = self._active_session(token_hash)
+
+        count = (
+            self.db.query(RefreshSession)
+            .filter(condition)
+            .update({"revoked_at": datetime.utcnow()}, synchronize_session=False)
+        )
+        return count > 0
@@ -2,7 +2,7 @@
 
 from datetime import datetime
 
-from pydantic import BaseModel, EmailStr, Field
+from pydantic import BaseModel, ConfigDict, EmailStr, Field
 
 
 class RegisterRequest(BaseModel):
@@ -37,11 +37,10 @@ class RefreshRequest(BaseModel):
 class UserResponse(BaseModel):
     """User info response."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     email: str
     is_active: bool
     settings: dict
     created_at: datetime
-
-    class Config:
-        from_attributes = True
@@ -3,24 +3,25 @@
 from datetime import datetime
 from typing import List, Optional
 
-from pydantic import BaseModel
+from pydantic import BaseModel, ConfigDict
+
+from app.schemas.route import Coordinate
 
 
 class RouteHistoryItem(BaseModel):
     """Single route history item."""
 
+    model_config = ConfigDict(from_attributes=True)
+
     id: str
     created_at: datetime
-    origin: dict  # {"lat": float, "lng": float}
-    destination: dict
+    origin: Coordinate
+    destination: Coordinate
     mode: str
     safety_score_best: Optional[float]
     distance_m_best: Optional[int]
     duration_s_best: Optional[int]
 
-    class Config:
-        from_attributes = True
-
 
 class HistoryListResponse(BaseModel):
     """Paginated history list response."""
@@ -29,6 +30,8 @@ class HistoryListResponse(BaseModel):
     total: int
     limit: int
     offset: int
+    # (created_at, id) key of the last item when the page is full; pass back as ``before``
+    next_cursor: Optional[str] = None
 
 
 class DeleteHistoryResponse(BaseModel):
@@ -2,7 +2,7 @@
 
 from typing import Any, Dict, List, Optional
 
-from pydantic import BaseModel, Field
+from pydantic import BaseModel, ConfigDict, Field
 
 
 class SafetyCell(BaseModel):
@@ -45,8 +45,8 @@ class SafetyCell(BaseModel):
         description="Crime count breakdown by category (e.g., {'burglary': 5, 'violence': 3})",
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "id": "891e204d89fffff",
                 "geometry": {
@@ -75,6 +75,7 @@ class SafetyCell(BaseModel):
                 },
             }
         }
+    )
 
 
 class SafetySummary(BaseModel):
@@ -100,8 +101,8 @@ class SafetySummary(BaseModel):
         None, description="Cell ID with lowest risk (None if no data)"
     )
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "total_cells": 248,
                 "total_crimes": 1523,
@@ -110,6 +111,7 @@ class SafetySummary(BaseModel):
                 "lowest_risk_cell": "891e204c12fffff",
             }
         }
+    )
 
 
 class SafetyMeta(BaseModel):
@@ -136,8 +138,8 @@ class SafetyMeta(BaseModel):
     )
     months_included: int = Field(..., ge=1, description="Actual number of months with data")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "bbox": [-1.4044, 50.9008, -1.3726, 50.9197],
                 "cell_size_m": 500,
@@ -147,6 +149,7 @@ class SafetyMeta(BaseModel):
                 "months_included": 12,
             }
         }
+    )
 
 
 class SafetySnapshotResponse(BaseModel):
@@ -166,8 +169,8 @@ class SafetySnapshotResponse(BaseModel):
     summary: SafetySummary = Field(..., description="Aggregate statistics across all cells")
     meta: SafetyMeta = Field(..., description="Request metadata and configuration")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "cells": [
                     {
@@ -239,6 +242,7 @@ class SafetySnapshotResponse(BaseModel):
                 },
             }
         }
+    )
 
 
 class ErrorResponse(BaseModel):
@@ -251,11 +255,12 @@ class ErrorResponse(BaseModel):
     message: str = Field(..., description="Human-readable error message")
     path: str = Field(..., description="API endpoint path where error occurred")
 
-    class Config:
-        json_schema_extra = {
+    model_config = ConfigDict(
+        json_schema_extra={
             "example": {
                 "error": "ValidationError",
                 "message": "Invalid bbox: Longitude must be between -180 and 180",
                 "path": "/api/v1/safety/snapshot",
             }
         }
+    )
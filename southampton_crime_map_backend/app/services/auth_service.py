@@ -1,13 +1,16 @@
 """Authentication service."""
 
+import threading
+import time
 import uuid
-from datetime import datetime, timedelta
+from datetime import datetime, timezone
 from typing import Optional, Tuple
 
+from cachetools import TTLCache
 from jose import JWTError
+from sqlalchemy import inspect
 from sqlalchemy.orm import Session
 
-from app.config import get_settings
 from app.core.exceptions import (
     AuthenticationError,
     ConflictError,
@@ -16,18 +19,44 @@ from app.core.exceptions import (
     inactive_user_exception,
 )
 from app.core.security import (
+    ACCESS_TOKEN_TTL,
+    REFRESH_TOKEN_TTL,
     create_access_token,
     create_refresh_token,
     decode_token,
-    hash_password,
+    hash_password_async,
     hash_refresh_token,
+    password_needs_rehash,
     validate_password_strength,
-    verify_password,
+    verify_password_async,
 )
 from app.models.user import User
 from app.repositories.user_repository import UserRepository
 
-settings = get_settings()
+# expires_in reported to clients alongside each new access token
+_ACCESS_TOKEN_EXPIRES_IN = int(ACCESS_TOKEN_TTL.total_seconds())
+
+# Access token -> (detached copy of its active user, token expiry as a timestamp).
+# Lets get_current_user skip the JWT verify and user lookup for repeat requests.
+# invalidate_cached_user() drops entries in this process only, so changes made
+# through another worker can take up to the TTL to show.
+# TTLCache is not thread-safe and the sync auth dependencies run in FastAPI's
+# threadpool, so every access holds _current_user_cache_lock.
+_current_user_cache: TTLCache = TTLCache(maxsize=10_000, ttl=30)
+_current_user_cache_lock = threading.Lock()
+
+
+def _detached_copy(user: User) -> User:
+    """Copy a user's column values into a new instance not bound to any session."""
+    return User(**{attr.key: getattr(user, attr.key) for attr in inspect(User).column_attrs})
+
+
+def invalidate_cached_user(user_id: uuid.UUID) -> None:
+    """Drop cached access-token lookups for a user (after it is changed or deleted)."""
+    with _current_user_cache_lock:
+        for token, (user, _) in list(_current_user_cache.items()):
+            if user.id == user_id:
+                _current_user_cache.pop(token, None)
 
 
 class AuthService:
@@ -37,7 +66,7 @@ class AuthService:
         self.db = db
         self.user_repo = UserRepository(db)
 
-    def register(self, email: str, password: str) -> User:
+    async def register(self, email: str, password: str) -> User:
         """Register a new user.
 
         Raises:
@@ -55,11 +84,11 @@ class AuthService:
             raise ValidationError(error_msg)
 
         # Hash password and create user
-        hashed_pwd = hash_password(password)
+        hashed_pwd = await hash_password_async(password)
         user = self.user_repo.create(email=email, hashed_password=hashed_pwd)
         return user
 
-    def login(
+    async def login(
         self,
         email: str,
         password: str,
@@ -76,13 +105,17 @@ class AuthService:
         """
         # Get user
         user = self.user_repo.get_by_email(email)
-        if not user or not verify_password(password, user.hashed_password):
+        if not user or not await verify_password_async(password, user.hashed_password):
             raise AuthenticationError("Invalid email or password")
 
         # Check if user is active
         if not user.is_active:
             raise AuthenticationError("User account is inactive")
 
+        # Upgrade hashes made with older Argon2 parameters while we have the password
+        if password_needs_rehash(user.hashed_password):
+            self.user_repo.update_password(user.id, await hash_password_async(password))
+
         # Update last login
         self.user_repo.update_last_login(user.id)
 
@@ -92,7 +125,7 @@ class AuthService:
         refresh_token_hash = hash_refresh_token(refresh_token_raw)
 
         # Store refresh session
-        expires_at = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+        expires_at = datetime.now(timezone.utc) + REFRESH_TOKEN_TTL
         self.user_repo.create_refresh_session(
             user_id=user.id,
             token_hash=refresh_token_hash,
@@ -101,10 +134,7 @@ class AuthService:
             user_agent=user_agent,
         )
 
-        # Calculate expires_in for access token
-        expires_in = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
-
-        return access_token, refresh_token_raw, expires_in
+        return access_token, refresh_token_raw, _ACCESS_TOKEN_EXPIRES_IN
 
     def refresh(self, refresh_token: str) -> tuple[str, str, int]:
         """Refresh access token using refresh token.
@@ -115,39 +145,33 @@ class AuthService:
         Raises:
             AuthenticationError: If refresh token is invalid or expired
         """
-        # Hash the provided token and look up session
+        # Revoke the old session (token rotation); the lookup is the same UPDATE.
+        # If we raise below, get_db rolls the revocation back.
         token_hash = hash_refresh_token(refresh_token)
-        session = self.user_repo.get_refresh_session(token_hash)
+        session = self.user_repo.rotate_refresh_session(token_hash)
 
         if not session:
             raise AuthenticationError("Invalid or expired refresh token")
 
-        # Get user
-        user = self.user_repo.get_by_id(session.user_id)
-        if not user or not user.is_active:
+        if not session.user_is_active:
             raise AuthenticationError("User not found or inactive")
 
-        # Revoke old session (token rotation)
-        self.user_repo.revoke_refresh_session(session.id)
-
         # Create new tokens
-        access_token = create_access_token(subject=str(user.id))
+        access_token = create_access_token(subject=str(session.user_id))
         new_refresh_token_raw = create_refresh_token()
         new_refresh_token_hash = hash_refresh_token(new_refresh_token_raw)
 
         # Store new refresh session
-        expires_at = datetime.utcnow() + timedelta(days=settings.JWT_REFRESH_TOKEN_EXPIRE_DAYS)
+        expires_at = datetime.now(timezone.utc) + REFRESH_TOKEN_TTL
         self.user_repo.create_refresh_session(
-            user_id=user.id,
+            user_id=session.user_id,
             token_hash=new_refresh_token_hash,
             expires_at=expires_at,
             ip_address=session.ip_address,
             user_agent=session.user_agent,
         )
 
-        expires_in = settings.JWT_ACCESS_TOKEN_EXPIRE_MINUTES * 60
-
-        return access_token, new_refresh_token_raw, expires_in
+        return access_token, new_refresh_token_raw, _ACCESS_TOKEN_EXPIRES_IN
 
     def logout(self, refresh_token: str, revoke_all: bool = False) -> None:
         """Logout user by revoking refresh token(s).
@@ -160,22 +184,26 @@ class AuthService:
             AuthenticationError: If refresh token is invalid
         """
         token_hash = hash_refresh_token(refresh_token)
-        session = self.user_repo.get_refresh_session(token_hash)
-
-        if not session:
+        # Lookup and revocation are one UPDATE; nothing matched means the token
+        # was unknown, expired or already revoked
+        if not self.user_repo.revoke_refresh_session_by_token(token_hash, revoke_all=revoke_all):
             raise AuthenticationError("Invalid refresh token")
 
-        if revoke_all:
-            self.user_repo.revoke_all_user_sessions(session.user_id)
-        else:
-            self.user_repo.revoke_refresh_session(session.id)
-
     def get_current_user(self, token: str) -> User:
         """Get current user from access token.
 
+        Active users are cached per token for a short while (see
+        ``_current_user_cache``); cached users are detached copies, so treat them
+        as read-only.
+
         Raises:
             HTTPException: If token is invalid or user not found
         """
+        with _current_user_cache_lock:
+            cached = _current_user_cache.get(token)
+            if cached is not None and cached[1] > time.time():
+                return cached[0]
+
         try:
             payload = decode_token(token)
             user_id_str: str = payload.get("sub")
@@ -198,4 +226,8 @@ class AuthService:
         if not user.is_active:
             raise inactive_user_exception()
 
+        # The whole token is the key, so a forged payload can never match an entry
+        cached = (_detached_copy(user), payload["exp"])
+        with _current_user_cache_lock:
+            _current_user_cache[token] = cached
         return user
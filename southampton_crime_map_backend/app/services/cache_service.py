@@ -1,147 +1,303 @@
 """Redis caching service for safety data."""
 
+import asyncio
 import hashlib
-import json
 import logging
-from typing import Any, Dict, Optional
+import struct
+import time
+from datetime import date
+from typing import Any, Dict, Iterable, List, Optional, Tuple
 
+import orjson
 import redis.asyncio as redis
+import zstandard
+from cachetools import TTLCache
 
 from app.config import get_settings
+from app.core.redis_pool import get_redis
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Packed month-of-cells record: H3 cell_id (u64), crime count (u32), weighted count (f32),
+# little-endian, 16 bytes per cell
+CELL_RECORD = struct.Struct("<QIf")
+
+# Snapshot (and ORS response) JSON at or above this size is stored zstd-compressed;
+# smaller payloads gain little and are stored as-is
+SNAPSHOT_COMPRESS_MIN_BYTES = 1024
+_ZSTD_MAGIC = b"\x28\xb5\x2f\xfd"
+_compressor = zstandard.ZstdCompressor(level=3)
+_decompressor = zstandard.ZstdDecompressor()
+
+# Cached values at least this large (as stored) are decoded in a worker thread, so
+# a big snapshot or route doesn't stall the event loop. Encoding always runs in a
+# thread: it follows a database build or an ORS call, which dwarf the handoff.
+DECODE_OFFLOAD_MIN_BYTES = 16 * 1024
+
+# While one request builds a missing snapshot it holds a fill marker for it; other
+# requests for the same snapshot poll for the result instead of building it too.
+# The marker expires on its own if its holder dies. Waiters give up well before
+# that and build the snapshot themselves.
+SNAPSHOT_FILL_TTL = 30
+SNAPSHOT_FILL_WAIT = 10.0
+SNAPSHOT_FILL_POLL = 0.1
+
+# Per-process copies of recently served snapshots, in front of Redis. Invalidation
+# from another process (the Celery worker) cannot reach these, so the short TTL
+# bounds how stale a local copy can get. Callers must treat the dicts as read-only.
+_local_snapshots: TTLCache = TTLCache(maxsize=256, ttl=30)
+
+
+def encode_snapshot(data: Dict[str, Any]) -> bytes:
+    """Serialize a snapshot, zstd-compressing it if it is large.
+
+    Also used for cached ORS responses, which are large, repetitive GeoJSON.
+    """
+    payload = orjson.dumps(data)
+    if len(payload) >= SNAPSHOT_COMPRESS_MIN_BYTES:
+        return _compressor.compress(payload)
+    return payload
+
+
+def decode_snapshot(raw: bytes) -> Dict[str, Any]:
+    """Inverse of encode_snapshot (JSON can never start with the zstd magic)."""
+    if raw[:4] == _ZSTD_MAGIC:
+        raw = _decompressor.decompress(raw)
+    return orjson.loads(raw)
+
+
+async def encode_snapshot_async(data: Dict[str, Any]) -> bytes:
+    """encode_snapshot, run in a worker thread."""
+    return await asyncio.to_thread(encode_snapshot, data)
+
+
+async def decode_snapshot_async(raw: bytes) -> Dict[str, Any]:
+    """decode_snapshot, run in a worker thread if ``raw`` is large."""
+    if len(raw) >= DECODE_OFFLOAD_MIN_BYTES:
+        return await asyncio.to_thread(decode_snapshot, raw)
+    return decode_snapshot(raw)
+
+
+def pack_cells(rows: Iterable[Tuple[int, int, float]]) -> bytes:
+    """Pack (cell_id, crime_count, weighted_count) rows into CELL_RECORD blobs."""
+    return b"".join(CELL_RECORD.pack(*row) for row in rows)
+
 
 class CacheService:
     """Redis cache for safety snapshots."""
 
     def __init__(self):
         self.cache_ttl = 3600  # 1 hour for safety snapshots
-        self._redis_client: Optional[redis.Redis] = None
+        self.cells_ttl = 86400  # 1 day for packed month cells (invalidated on grid rebuild)
+        self.route_score_ttl = 86400  # 1 day for route scores (invalidated on new data)
 
     async def _get_redis_client(self) -> Optional[redis.Redis]:
-        """Get or create Redis client."""
-        if self._redis_client is None:
-            try:
-                self._redis_client = redis.from_url(
-                    settings.REDIS_URL, encoding="utf-8", decode_responses=True
-                )
-                # Test connection
-                await self._redis_client.ping()
-                logger.debug("Redis connection established for safety caching")
-            except Exception as e:
-                logger.warning(f"Redis connection failed: {str(e)}. Caching disabled.")
-                self._redis_client = None
-        return self._redis_client
+        """Get the shared Redis client."""
+        return await get_redis()
 
-    def _generate_cache_key(
+    async def _get_binary_redis_client(self) -> Optional[redis.Redis]:
+        """Get the shared Redis client that returns raw bytes."""
+        return await get_redis(decode_responses=False)
+
+    def snapshot_key(
         self, bbox: str, lookback_months: int, time_of_day: Optional[str] = None
     ) -> str:
         """Generate cache key from snapshot parameters.
 
+        Build it once per request and pass it to the other snapshot methods.
+
         Args:
             bbox: Bounding box
             lookback_months: Months of historical data
             time_of_day: Time period filter
 
         Returns:
-            MD5 hash as cache key
+            Cache key
         """
-        # Create a stable cache key from parameters
-        key_data = f"{bbox}:{lookback_months}:{time_of_day or 'none'}"
-        key_hash = hashlib.md5(key_data.encode()).hexdigest()
-        return f"safety:snapshot:{key_hash}"
+        # The parameters are short, so they are used verbatim instead of hashed:
+        # the key stays about as long as an MD5 digest and costs no hashing. Only
+        # snapshots for bboxes that parsed successfully are ever stored.
+        return f"safety:snapshot:{bbox}:{lookback_months}:{time_of_day or 'none'}"
 
-    async def get_snapshot(
-        self, bbox: str, lookback_months: int, time_of_day: Optional[str] = None
-    ) -> Optional[Dict[str, Any]]:
+    @staticmethod
+    def _fill_key(cache_key: str) -> str:
+        """Key of the fill marker for a snapshot (outside ``safety:snapshot:*``)."""
+        return f"safety:fill:{cache_key}"
+
+    async def get_snapshot(self, cache_key: str) -> Optional[Dict[str, Any]]:
         """Retrieve cached safety snapshot.
 
         Args:
-            bbox: Bounding box
-            lookback_months: Months of historical data
-            time_of_day: Time period filter
+            cache_key: Key from snapshot_key
 
         Returns:
             Cached data or None
         """
-        cache_key = self._generate_cache_key(bbox, lookback_months, time_of_day)
-        redis_client = await self._get_redis_client()
+        local = _local_snapshots.get(cache_key)
+        if local is not None:
+            return local
+
+        # Bytes client: orjson parses the raw value without a str decode
+        redis_client = await self._get_binary_redis_client()
 
         if redis_client:
             try:
                 cached = await redis_client.get(cache_key)
+                # Per-request hit/miss logs are DEBUG, with lazy %-formatting so
+                # nothing is built unless DEBUG is enabled
                 if cached:
-                    logger.info(f"Cache HIT for safety snapshot: {cache_key}")
-                    return json.loads(cached)
-                logger.info(f"Cache MISS for safety snapshot: {cache_key}")
+                    logger.debug("Cache HIT for safety snapshot: %s", cache_key)
+                    snapshot = await decode_snapshot_async(cached)
+                    _local_snapshots[cache_key] = snapshot
+                    return snapshot
+                logger.debug("Cache MISS for safety snapshot: %s", cache_key)
             except Exception as e:
-                logger.warning(f"Redis get error: {str(e)}")
+                logger.warning("Redis get error: %s", e)
 
         return None
 
     async def set_snapshot(
-        self,
-        bbox: str,
-        lookback_months: int,
-        time_of_day: Optional[str],
-        data: Dict[str, Any],
-        ttl: Optional[int] = None,
+        self, cache_key: str, data: Dict[str, Any], ttl: Optional[int] = None
     ) -> bool:
         """Cache safety snapshot data.
 
         Args:
-            bbox: Bounding box string
-            lookback_months: Number of months to look back
-            time_of_day: Optional time of day filter
+            cache_key: Key from snapshot_key
             data: Snapshot data to cache
             ttl: Time to live in seconds (default: 1 hour)
 
         Returns:
             True if cached successfully, False otherwise
         """
-        cache_key = self._generate_cache_key(bbox, lookback_months, time_of_day)
-        redis_client = await self._get_redis_client()
+        _local_snapshots[cache_key] = data
+        redis_client = await self._get_binary_redis_client()
 
         if redis_client:
             try:
                 ttl = ttl or self.cache_ttl
-                await redis_client.setex(cache_key, ttl, json.dumps(data))
-                logger.info(f"Cached safety snapshot: {cache_key} (TTL: {ttl}s)")
+                raw = await encode_snapshot_async(data)
+                # Store the snapshot and drop its fill marker in one round trip
+                async with redis_client.pipeline(transaction=False) as pipe:
+                    pipe.setex(cache_key, ttl, raw)
+                    pipe.delete(self._fill_key(cache_key))
+                    await pipe.execute()
+                logger.debug("Cached safety snapshot: %s (TTL: %ss)", cache_key, ttl)
                 return True
             except Exception as e:
-                logger.warning(f"Redis set error: {str(e)}")
+                logger.warning("Redis set error: %s", e)
 
         return False
 
-    async def invalidate_snapshot(
-        self, bbox: str, lookback_months: int, time_of_day: Optional[str] = None
-    ) -> bool:
+    async def claim_snapshot_fill(self, cache_key: str) -> bool:
+        """Claim the right to build a snapshot that missed the cache.
+
+        Sets the fill marker with ``SET ... NX EX``, so exactly one caller wins.
+        set_snapshot clears the marker; call release_snapshot_fill if the build
+        fails instead.
+
+        Returns:
+            True if the caller should build the snapshot (including when Redis is
+            unavailable), False if another request is already building it
+        """
+        redis_client = await self._get_redis_client()
+
+        if redis_client:
+            try:
+                return bool(
+                    await redis_client.set(
+                        self._fill_key(cache_key), 1, ex=SNAPSHOT_FILL_TTL, nx=True
+                    )
+                )
+            except Exception as e:
+                logger.warning("Redis set error: %s", e)
+
+        return True
+
+    async def release_snapshot_fill(self, cache_key: str) -> None:
+        """Drop the fill marker after a failed build so waiters stop polling."""
+        redis_client = await self._get_redis_client()
+
+        if redis_client:
+            try:
+                await redis_client.delete(self._fill_key(cache_key))
+            except Exception as e:
+                logger.warning("Redis delete error: %s", e)
+
+    async def wait_for_snapshot(
+        self, cache_key: str, timeout: float = SNAPSHOT_FILL_WAIT
+    ) -> Optional[Dict[str, Any]]:
+        """Poll for a snapshot another request is building.
+
+        Returns:
+            The snapshot, or None if its builder gave up or ``timeout`` passed
+        """
+        redis_client = await self._get_redis_client()
+        if not redis_client:
+            return None
+
+        fill_key = self._fill_key(cache_key)
+        deadline = time.monotonic() + timeout
+        try:
+            while time.monotonic() < deadline:
+                await asyncio.sleep(SNAPSHOT_FILL_POLL)
+                snapshot = await self.get_snapshot(cache_key)
+                if snapshot is not None:
+                    return snapshot
+                if not await redis_client.exists(fill_key):
+                    return None
+        except Exception as e:
+            logger.warning("Redis get error: %s", e)
+
+        return None
+
+    async def invalidate_snapshot(self, cache_key: str) -> bool:
         """Invalidate cached safety snapshot.
 
         Args:
-            bbox: Bounding box string
-            lookback_months: Number of months to look back
-            time_of_day: Optional time of day filter
+            cache_key: Key from snapshot_key
 
         Returns:
             True if invalidated successfully, False otherwise
         """
-        cache_key = self._generate_cache_key(bbox, lookback_months, time_of_day)
+        _local_snapshots.pop(cache_key, None)
         redis_client = await self._get_redis_client()
 
         if redis_client:
             try:
                 deleted = await redis_client.delete(cache_key)
                 if deleted:
-                    logger.info(f"Invalidated cache: {cache_key}")
+                    logger.info("Invalidated cache: %s", cache_key)
                     return True
             except Exception as e:
-                logger.warning(f"Redis delete error: {str(e)}")
+                logger.warning("Redis delete error: %s", e)
 
         return False
 
+    async def _unlink_matching(self, pattern: str, batch_size: int = 500) -> int:
+        """UNLINK keys matching ``pattern`` in batches as the SCAN yields them.
+
+        UNLINK frees values in a Redis background thread, and batching keeps the
+        key list (and each command) bounded however many keys match.
+
+        Returns:
+            Number of keys removed
+        """
+        redis_client = await self._get_redis_client()
+        if not redis_client:
+            return 0
+
+        removed = 0
+        batch = []
+        async for key in redis_client.scan_iter(match=pattern, count=batch_size):
+            batch.append(key)
+            if len(batch) >= batch_size:
+                removed += await redis_client.unlink(*batch)
+                batch.clear()
+        if batch:
+            removed += await redis_client.unlink(*batch)
+        return removed
+
     async def invalidate_all_snapshots(self) -> int:
         """Invalidate all cached safety snapshots.
 
@@ -150,32 +306,151 @@ class CacheService:
         Returns:
             Number of keys deleted
         """
-        redis_client = await self._get_redis_client()
+        _local_snapshots.clear()
+        try:
+            deleted = await self._unlink_matching("safety:snapshot:*")
+        except Exception as e:
+            logger.warning("Redis invalidate all error: %s", e)
+            return 0
+
+        if deleted:
+            logger.info("Invalidated %d safety snapshot caches", deleted)
+        else:
+            logger.info("No safety snapshot caches to invalidate")
+        return deleted
+
+    async def get_month_cells(self, month: date) -> Optional[bytes]:
+        """Retrieve a month's cells as a packed CELL_RECORD blob.
+
+        Args:
+            month: First day of the month
+
+        Returns:
+            Packed cells or None on a miss
+        """
+        redis_client = await self._get_binary_redis_client()
+
+        if redis_client:
+            try:
+                return await redis_client.get(f"cells:{month.isoformat()}")
+            except Exception as e:
+                logger.warning("Redis get error: %s", e)
+
+        return None
+
+    async def set_month_cells(self, month: date, blob: bytes) -> bool:
+        """Cache a month's cells as a packed CELL_RECORD blob.
+
+        Args:
+            month: First day of the month
+            blob: Output of pack_cells
+
+        Returns:
+            True if cached successfully, False otherwise
+        """
+        redis_client = await self._get_binary_redis_client()
+
+        if redis_client:
+            try:
+                await redis_client.set(f"cells:{month.isoformat()}", blob, ex=self.cells_ttl)
+                return True
+            except Exception as e:
+                logger.warning("Redis set error: %s", e)
+
+        return False
+
+    async def invalidate_all_month_cells(self) -> int:
+        """Invalidate all cached month cell blobs.
+
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            deleted = await self._unlink_matching("cells:*")
+        except Exception as e:
+            logger.warning("Redis invalidate month cells error: %s", e)
+            return 0
+
+        if deleted:
+            logger.info("Invalidated %d month cell caches", deleted)
+        return deleted
+
+    def route_score_key(
+        self,
+        coordinates: List[List[float]],
+        lookback_months: int,
+        time_of_day: Optional[str],
+        buffer_meters: int,
+        current_month: date,
+    ) -> str:
+        """Generate the cache key for a route's safety score.
+
+        A score depends only on these inputs and the cell data, and the current
+        month fixes which months of cells are read and how they are weighted.
+        """
+        digest = hashlib.blake2b(orjson.dumps(coordinates), digest_size=16).hexdigest()
+        return (
+            f"safety:route:{digest}:{lookback_months}:{time_of_day or 'none'}:"
+            f"{buffer_meters}:{current_month.isoformat()}"
+        )
+
+    async def get_route_score(self, cache_key: str) -> Optional[Dict[str, Any]]:
+        """Retrieve a cached route score.
+
+        Args:
+            cache_key: Key from route_score_key
+
+        Returns:
+            Cached score or None
+        """
+        redis_client = await self._get_binary_redis_client()
 
         if redis_client:
             try:
-                # Find all safety snapshot keys
-                pattern = "safety:snapshot:*"
-                keys = []
+                cached = await redis_client.get(cache_key)
+                if cached:
+                    return orjson.loads(cached)
+            except Exception as e:
+                logger.warning("Redis get error: %s", e)
 
-                async for key in redis_client.scan_iter(match=pattern, count=100):
-                    keys.append(key)
+        return None
 
-                if keys:
-                    deleted = await redis_client.delete(*keys)
-                    logger.info(f"Invalidated {deleted} safety snapshot caches")
-                    return deleted
-                else:
-                    logger.info("No safety snapshot caches to invalidate")
-                    return 0
+    async def set_route_score(self, cache_key: str, score: Dict[str, Any]) -> bool:
+        """Cache a route score.
 
+        Args:
+            cache_key: Key from route_score_key
+            score: Result of RouteSafetyService.score_route
+
+        Returns:
+            True if cached successfully, False otherwise
+        """
+        redis_client = await self._get_binary_redis_client()
+
+        if redis_client:
+            try:
+                await redis_client.set(cache_key, orjson.dumps(score), ex=self.route_score_ttl)
+                return True
             except Exception as e:
-                logger.warning(f"Redis invalidate all error: {str(e)}")
+                logger.warning("Redis set error: %s", e)
+
+        return False
+
+    async def invalidate_all_route_scores(self) -> int:
+        """Invalidate all cached route scores.
+
+        Returns:
+            Number of keys deleted
+        """
+        try:
+            deleted = await self._unlink_matching("safety:route:*")
+        except Exception as e:
+            logger.warning("Redis invalidate route scores error: %s", e)
+            return 0
 
-        return 0
+        if deleted:
+            logger.info("Invalidated %d route score caches", deleted)
+        return deleted
 
     async def close(self):
-        """Close Redis connection."""
-        if self._redis_client:
-            await self._redis_client.close()
-            self._redis_client = None
+        """Kept for callers; the shared clients are closed on application shutdown."""
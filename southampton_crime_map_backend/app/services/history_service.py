@@ -1,9 +1,11 @@
 """Route history service."""
 
 import uuid
-from datetime import date
-from typing import List, Optional, Tuple
+from datetime import date, datetime
+from typing import List, Optional, Tuple, Union
 
+from shapely.geometry.base import BaseGeometry
+from sqlalchemy.engine import Row
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import NotFoundError
@@ -30,9 +32,13 @@ class HistoryService:
         distance_m_best: int,
         duration_s_best: int,
         request_meta: dict,
-        route_geom: Optional[str] = None,
+        route_geom: Optional[Union[str, BaseGeometry]] = None,
     ) -> RouteHistory:
-        """Save a route to user's history."""
+        """Save a route to user's history.
+
+        Pass ``route_geom`` as a Shapely geometry where one is at hand; it is
+        stored as WKB rather than formatted to WKT and parsed back.
+        """
         return self.repo.create_history(
             user_id=user_id,
             origin_lat=origin_lat,
@@ -55,8 +61,13 @@ class HistoryService:
         mode: Optional[str] = None,
         from_date: Optional[date] = None,
         to_date: Optional[date] = None,
-    ) -> Tuple[List[RouteHistory], int]:
-        """Get user's route history with filters."""
+        before: Optional[Tuple[datetime, uuid.UUID]] = None,
+    ) -> Tuple[List[Row], int]:
+        """Get user's route history with filters, as rows of the listed columns.
+
+        ``before`` seeks past the previous page by ``(created_at, id)`` (keyset
+        pagination); use it instead of ``offset`` for deep pages.
+        """
         return self.repo.get_user_history(
             user_id=user_id,
             limit=limit,
@@ -64,6 +75,7 @@ class HistoryService:
             mode=mode,
             from_date=from_date,
             to_date=to_date,
+            before=before,
         )
 
     def delete_history_item(self, history_id: uuid.UUID, user_id: uuid.UUID) -> None:
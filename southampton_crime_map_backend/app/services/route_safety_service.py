@@ -4,23 +4,75 @@ Scores routes by analyzing intersections with crime data cells and
 identifying high-risk areas along the path.
 """
 
+import asyncio
 import logging
-from collections import defaultdict
-from datetime import date, timedelta
-from typing import Dict, List, Optional
-
-from shapely import wkt
+from datetime import date
+from typing import Any, Dict, List, Optional, Tuple, cast
+
+import numpy as np
+import shapely
+from cachetools import LRUCache
+from dateutil.relativedelta import relativedelta
+from geoalchemy2 import shape
+from shapely import STRtree, wkt
 from shapely.geometry import LineString
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy.orm import Session
 
 from app.config import CRIME_TIME_WEIGHTS, get_settings
 from app.repositories.crime_repository import CrimeRepository
+from app.services.cache_service import CacheService
+from app.utils.geometry import buffer_wgs84, expand_bounds_wgs84
 from app.utils.scoring import calculate_months_ago, get_recency_weight
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
 
+# Raw cell geometry (WKB bytes or WKT) -> parsed Shapely geometry. A cell's
+# hexagon is stored again for every month, so one route score over 12 months
+# would otherwise parse each hexagon 12 times. Shapely geometries are
+# immutable, so parsed shapes are shared freely across requests.
+_cell_shape_cache: LRUCache = LRUCache(maxsize=65_536)
+
+
+# Average segment risk (weighted crimes per cell) -> normalized risk, interpolated
+# linearly between knots. Uses the same thresholds as hexagon scoring for visual
+# consistency, calibrated for H3 resolution 10 (~73m edge, ~13,781 m²): < 5 very
+# safe, 5-20 safe, 20-50 moderate, 50-100 high, 100-200 very high, and risk
+# reaching 1.0 at 400.
+RISK_KNOTS = np.array([0.0, 5.0, 20.0, 50.0, 100.0, 200.0, 400.0])
+NORMALIZED_RISK_KNOTS = np.array([0.0, 0.2, 0.4, 0.6, 0.8, 0.95, 1.0])
+
+
+def _cell_shape(cell: Any) -> Optional[BaseGeometry]:
+    """A cell's geometry as Shapely, or None if it is missing or unreadable."""
+    try:
+        geom = cell.geom
+        if not geom:
+            return None
+        if isinstance(geom, str):
+            # WKT string
+            key = geom
+            parse = wkt.loads
+        elif hasattr(geom, "desc"):
+            # GeoAlchemy2 WKBElement or WKTElement
+            key = bytes(geom.data) if isinstance(geom.data, memoryview) else geom.data
+            parse = shape.to_shape
+        else:
+            # Already a Shapely geometry
+            return geom
+
+        parsed = _cell_shape_cache.get(key)
+        if parsed is None:
+            parsed = parse(geom)
+            _cell_shape_cache[key] = parsed
+        return parsed
+    except Exception as e:
+        logger.warning(f"Error reading cell geometry: {str(e)}")
+        return None
+
+
 class RouteSafetyService:
     """Calculates safety scores for routes based on crime data."""
 
@@ -46,138 +98,253 @@ class RouteSafetyService:
         Returns:
             Dict with safety_score, risk_class, segments, hotspots, and crime breakdown
         """
+        route_line = self._route_line(route_geometry)
+        if route_line is None:
+            return self._empty_score()
+
         try:
-            # Convert GeoJSON to Shapely LineString
-            coordinates = route_geometry.get("coordinates", [])
-            if not coordinates or len(coordinates) < 2:
-                logger.warning("Invalid route geometry - no coordinates")
-                return self._empty_score()
-
-            # Coordinates are WGS84 (lng, lat)
-            route_line = LineString(coordinates)
-
-            # Get current month for recency calculation
-            current_month = date.today().replace(day=1)
-
-            # Get all safety cells for the lookback period
-            all_cells = []
-            for i in range(lookback_months):
-                month_offset = current_month - timedelta(days=30 * i)
-                month = month_offset.replace(day=1)
-                cells = self.crime_repo.get_cells_by_month(month)
-                all_cells.extend(cells)
-
-            if not all_cells:
-                logger.info("No safety cells found for scoring")
-                return self._empty_score()
-
-            # Find cells that intersect with the route
-            intersecting_cells = self._find_intersecting_cells(route_line, all_cells, buffer_meters)
-
-            if not intersecting_cells:
-                logger.info("No intersecting cells found - route is very safe")
-                return self._empty_score()
-
-            # Calculate segment-by-segment scores
-            segments = self._create_route_segments(route_line)
-            segment_scores = []
-
-            for segment_idx, segment_line in enumerate(segments):
-                segment_cells = self._find_intersecting_cells(
-                    segment_line, intersecting_cells, buffer_meters
-                )
+            return self._score_route(
+                route_line,
+                lookback_months,
+                time_of_day,
+                buffer_meters,
+                date.today().replace(day=1),
+            )
+        except Exception as e:
+            logger.error(f"Error scoring route: {str(e)}", exc_info=True)
+            return self._empty_score()
 
-                segment_risk = self._calculate_segment_risk(
-                    segment_cells, current_month, time_of_day
-                )
+    async def score_route_cached(
+        self,
+        route_geometry: Dict,
+        lookback_months: int = 12,
+        time_of_day: Optional[str] = None,
+        buffer_meters: int = 50,
+    ) -> Dict:
+        """score_route, memoized in Redis. See score_routes_cached."""
+        scores = await self.score_routes_cached(
+            [route_geometry], lookback_months, time_of_day, buffer_meters
+        )
+        return scores[0]
 
-                segment_scores.append(
-                    {
-                        "segment_index": segment_idx,
-                        "start_point": list(segment_line.coords[0]),
-                        "end_point": list(segment_line.coords[-1]),
-                        "risk_score": segment_risk,
-                        "cell_count": len(segment_cells),
-                    }
-                )
+    async def score_routes_cached(
+        self,
+        route_geometries: List[Dict],
+        lookback_months: int = 12,
+        time_of_day: Optional[str] = None,
+        buffer_meters: int = 50,
+    ) -> List[Dict]:
+        """Score several routes, memoized in Redis, in input order.
 
-            # Calculate overall route statistics
-            total_weighted_risk = sum(seg["risk_score"] for seg in segment_scores)
-            max_segment_risk = max((seg["risk_score"] for seg in segment_scores), default=0.0)
-            avg_risk = total_weighted_risk / len(segment_scores) if segment_scores else 0.0
+        A score is fully determined by its inputs and the current month (which
+        fixes the months read and their recency weights), so repeat requests
+        for the same route skip the whole cell fetch and intersection pipeline.
+        Cached scores are dropped when new crime data is ingested. Failed scores
+        are returned but not cached.
 
-            # Identify crime hotspots (segments with high risk)
-            hotspots = self._identify_hotspots(segment_scores, avg_risk)
+        Routes missing from the cache share one cell fetch, made on this
+        session, and are then scored in parallel worker threads. This also keeps
+        the CPU-bound intersection work off the event loop.
+        """
+        current_month = date.today().replace(day=1)
+        cache_service = CacheService()
+
+        lines = [self._route_line(geometry) for geometry in route_geometries]
+        scores: List[Optional[Dict]] = [
+            None if line is not None else self._empty_score() for line in lines
+        ]
+        cache_keys = {
+            idx: cache_service.route_score_key(
+                geometry["coordinates"], lookback_months, time_of_day, buffer_meters, current_month
+            )
+            for idx, (geometry, line) in enumerate(zip(route_geometries, lines))
+            if line is not None
+        }
+        cached = await asyncio.gather(
+            *(cache_service.get_route_score(key) for key in cache_keys.values())
+        )
+
+        misses = []
+        for idx, score in zip(cache_keys, cached):
+            if score is not None:
+                scores[idx] = score
+            else:
+                misses.append(idx)
+        if not misses:
+            return cast(List[Dict], scores)
 
-            # Calculate crime breakdown
-            crime_breakdown = self._calculate_crime_breakdown(
-                intersecting_cells, current_month, time_of_day
+        try:
+            cells, cell_geoms = self._load_cells(lookback_months, current_month)
+            computed = await asyncio.gather(
+                *(
+                    asyncio.to_thread(
+                        self._score_cells,
+                        cells,
+                        cell_geoms,
+                        lines[idx],
+                        time_of_day,
+                        buffer_meters,
+                        current_month,
+                    )
+                    for idx in misses
+                ),
+                return_exceptions=True,
             )
+        except Exception as e:
+            computed = [e] * len(misses)
 
-            # Use the same thresholds as hexagon scoring for visual consistency
-            # Calibrated for H3 resolution 10 (~73m edge, ~13,781 m²)
-            # Segments average across multiple intersecting cells
-            RISK_THRESHOLDS = {
-                "very_low": 5.0,  # < 5 weighted crimes avg (very safe)
-                "low": 20.0,  # 5-20 weighted crimes avg (safe)
-                "moderate": 50.0,  # 20-50 weighted crimes avg (moderate risk)
-                "high": 100.0,  # 50-100 weighted crimes avg (high risk)
-                "very_high": 200.0,  # 100-200 weighted crimes avg (very high risk)
-            }
-
-            # Logarithmic scoring for better visual distribution
-            if avg_risk == 0:
-                normalized_risk = 0.0
-            elif avg_risk < RISK_THRESHOLDS["very_low"]:
-                normalized_risk = 0.2 * avg_risk / RISK_THRESHOLDS["very_low"]
-            elif avg_risk < RISK_THRESHOLDS["low"]:
-                normalized_risk = 0.2 + 0.2 * (avg_risk - RISK_THRESHOLDS["very_low"]) / (
-                    RISK_THRESHOLDS["low"] - RISK_THRESHOLDS["very_low"]
-                )
-            elif avg_risk < RISK_THRESHOLDS["moderate"]:
-                normalized_risk = 0.4 + 0.2 * (avg_risk - RISK_THRESHOLDS["low"]) / (
-                    RISK_THRESHOLDS["moderate"] - RISK_THRESHOLDS["low"]
-                )
-            elif avg_risk < RISK_THRESHOLDS["high"]:
-                normalized_risk = 0.6 + 0.2 * (avg_risk - RISK_THRESHOLDS["moderate"]) / (
-                    RISK_THRESHOLDS["high"] - RISK_THRESHOLDS["moderate"]
-                )
-            elif avg_risk < RISK_THRESHOLDS["very_high"]:
-                normalized_risk = 0.8 + 0.15 * (avg_risk - RISK_THRESHOLDS["high"]) / (
-                    RISK_THRESHOLDS["very_high"] - RISK_THRESHOLDS["high"]
-                )
+        for idx, score in zip(misses, computed):
+            if isinstance(score, BaseException):
+                logger.error(f"Error scoring route: {str(score)}", exc_info=score)
+                scores[idx] = self._empty_score()
             else:
-                excess = min(avg_risk - RISK_THRESHOLDS["very_high"], 200.0)
-                normalized_risk = 0.95 + 0.05 * (excess / 200.0)
+                scores[idx] = score
+                await cache_service.set_route_score(cache_keys[idx], score)
+        return cast(List[Dict], scores)
+
+    @staticmethod
+    def _route_line(route_geometry: Dict) -> Optional[LineString]:
+        """The route as a WGS84 LineString, or None if it has under two points."""
+        coordinates = route_geometry.get("coordinates", [])
+        if not coordinates or len(coordinates) < 2:
+            logger.warning("Invalid route geometry - no coordinates")
+            return None
+        return LineString(coordinates)
+
+    def _score_route(
+        self,
+        route_line: LineString,
+        lookback_months: int,
+        time_of_day: Optional[str],
+        buffer_meters: int,
+        current_month: date,
+    ) -> Dict:
+        """Body of score_route; raises instead of returning an empty score."""
+        cells, cell_geoms = self._load_cells(lookback_months, current_month)
+        return self._score_cells(
+            cells, cell_geoms, route_line, time_of_day, buffer_meters, current_month
+        )
 
-            normalized_risk = max(0.0, min(1.0, normalized_risk))
-            safety_score = round((1.0 - normalized_risk) * 100, 1)
+    def _load_cells(self, lookback_months: int, current_month: date) -> Tuple[List, np.ndarray]:
+        """Fetch the lookback period's cells and parse their geometries.
 
-            # Determine risk class
-            if safety_score >= 80:
-                risk_class = "low"
-            elif safety_score >= 60:
-                risk_class = "medium"
-            else:
-                risk_class = "high"
-
-            return {
-                "safety_score": safety_score,
-                "risk_class": risk_class,
-                "total_weighted_risk": round(total_weighted_risk, 3),
-                "max_segment_risk": round(max_segment_risk, 3),
-                "avg_segment_risk": round(avg_risk, 3),
-                "segment_count": len(segment_scores),
-                "segments": segment_scores,
-                "hotspots": hotspots,
-                "crime_breakdown": crime_breakdown,
-                "cells_analyzed": len(intersecting_cells),
-            }
+        Returns:
+            Tuple of (cells, geometries), aligned by position, as from _index_cells
+        """
+        # Get all safety cells for the lookback period
+        all_cells = self.crime_repo.get_cells_between(
+            current_month - relativedelta(months=lookback_months - 1),
+            current_month + relativedelta(months=1),
+        )
+        return self._index_cells(all_cells)
+
+    def _score_cells(
+        self,
+        all_cells: List,
+        cell_geoms: np.ndarray,
+        route_line: LineString,
+        time_of_day: Optional[str],
+        buffer_meters: int,
+        current_month: date,
+    ) -> Dict:
+        """Score a route against already loaded cells.
 
-        except Exception as e:
-            logger.error(f"Error scoring route: {str(e)}", exc_info=True)
+        Reads only its arguments, without touching the session, so routes can be
+        scored in parallel threads against one shared set of cells.
+        """
+        if not all_cells:
+            logger.info("No safety cells found for scoring")
             return self._empty_score()
 
+        # Only cells whose bounding box overlaps the buffered route get an exact
+        # intersection test
+        hits = self._query_cells(cell_geoms, route_line, buffer_meters)
+        intersecting_cells = [all_cells[i] for i in hits]
+
+        if not intersecting_cells:
+            logger.info("No intersecting cells found - route is very safe")
+            return self._empty_score()
+
+        # Segments only ever touch cells near the route, so index just those
+        segment_tree = STRtree(cell_geoms[hits])
+
+        # Calculate segment-by-segment scores
+        segments = self._create_route_segments(route_line)
+        segment_scores = []
+
+        segment_hits = self._query_segments(segment_tree, segments, buffer_meters)
+
+        # Weight every cell once; segments then just average their cells' risks
+        cell_risks, crime_totals = self._cell_risks(intersecting_cells, current_month, time_of_day)
+
+        # Sum each segment's cell risks in one bincount over all (segment, cell) hits
+        cell_counts = np.array([len(hit) for hit in segment_hits])
+        risk_sums = np.bincount(
+            np.repeat(np.arange(len(segments)), cell_counts),
+            weights=cell_risks[np.concatenate(segment_hits)],
+            minlength=len(segments),
+        )
+        segment_risks = np.divide(
+            risk_sums, cell_counts, out=np.zeros(len(segments)), where=cell_counts > 0
+        )
+
+        for segment_idx, segment_line in enumerate(segments):
+            segment_scores.append(
+                {
+                    "segment_index": segment_idx,
+                    "start_point": list(segment_line.coords[0]),
+                    "end_point": list(segment_line.coords[-1]),
+                    "risk_score": float(segment_risks[segment_idx]),
+                    "cell_count": int(cell_counts[segment_idx]),
+                }
+            )
+
+        # Calculate overall route statistics
+        total_weighted_risk = sum(seg["risk_score"] for seg in segment_scores)
+        max_segment_risk = max((seg["risk_score"] for seg in segment_scores), default=0.0)
+        avg_risk = total_weighted_risk / len(segment_scores) if segment_scores else 0.0
+
+        # Identify crime hotspots (segments with high risk)
+        hotspots = self._identify_hotspots(segment_scores, avg_risk)
+
+        # Calculate crime breakdown
+        crime_breakdown = {category: round(count, 2) for category, count in crime_totals.items()}
+
+        # Logarithmic scoring for better visual distribution
+        normalized_risk = self._normalize_risk(avg_risk)
+        safety_score = round((1.0 - normalized_risk) * 100, 1)
+
+        # Determine risk class
+        if safety_score >= 80:
+            risk_class = "low"
+        elif safety_score >= 60:
+            risk_class = "medium"
+        else:
+            risk_class = "high"
+
+        return {
+            "safety_score": safety_score,
+            "risk_class": risk_class,
+            "total_weighted_risk": round(total_weighted_risk, 3),
+            "max_segment_risk": round(max_segment_risk, 3),
+            "avg_segment_risk": round(avg_risk, 3),
+            "segment_count": len(segment_scores),
+            "segments": segment_scores,
+            "hotspots": hotspots,
+            "crime_breakdown": crime_breakdown,
+            "cells_analyzed": len(intersecting_cells),
+        }
+
+    @staticmethod
+    def _normalize_risk(avg_risk: Any) -> Any:
+        """Map average segment risk (a float or an array of them) onto 0-1.
+
+        Linear between the RISK_KNOTS, clamped to 0 below the first and 1 above
+        the last.
+        """
+        normalized = np.interp(avg_risk, RISK_KNOTS, NORMALIZED_RISK_KNOTS)
+        return float(normalized) if np.ndim(normalized) == 0 else normalized
+
     def _empty_score(self) -> Dict:
         """Default score for routes with no crime data."""
         return {
@@ -193,51 +360,71 @@ class RouteSafetyService:
             "cells_analyzed": 0,
         }
 
-    def _find_intersecting_cells(
-        self, route_line: LineString, cells: List, buffer_meters: int
-    ) -> List:
-        """Find safety cells intersecting the route.
-
-        Args:
-            route_line: Route as Shapely LineString (WGS84)
-            cells: SafetyCell objects to check
-            buffer_meters: Buffer distance
+    def _index_cells(self, cells: List) -> Tuple[List, np.ndarray]:
+        """Parse cell geometries once, dropping cells without a usable geometry.
 
         Returns:
-            Cells that intersect the buffered route
+            Tuple of (cells, geometries), aligned by position
         """
-        # Create buffer around route (approximate: 1 degree ≈ 111km at equator)
-        buffer_degrees = buffer_meters / 111000.0
-        buffered_route = route_line.buffer(buffer_degrees)
-
-        intersecting = []
+        kept = []
+        geoms = []
         for cell in cells:
-            if not cell.geom:
-                continue
-
-            try:
-                # Convert geometry to Shapely
-                if isinstance(cell.geom, str):
-                    # WKT string
-                    cell_geom = wkt.loads(cell.geom)
-                elif hasattr(cell.geom, "desc"):
-                    # GeoAlchemy2 WKBElement or WKTElement - convert to WKT string first
-                    from geoalchemy2 import shape
-
-                    cell_geom = shape.to_shape(cell.geom)
-                else:
-                    # Already a Shapely geometry
-                    cell_geom = cell.geom
-
-                # Check for intersection
-                if buffered_route.intersects(cell_geom):
-                    intersecting.append(cell)
-
-            except Exception as e:
-                logger.warning(f"Error checking cell intersection: {str(e)}")
-                continue
+            geom = _cell_shape(cell)
+            if geom is not None:
+                kept.append(cell)
+                geoms.append(geom)
+        return kept, np.array(geoms, dtype=object)
+
+    @staticmethod
+    def _buffer(geoms: Any, buffer_meters: int) -> Any:
+        """Buffer a geometry, or every geometry in an array, by ``buffer_meters``."""
+        return buffer_wgs84(geoms, buffer_meters)
+
+    def _query_cells(self, geoms: np.ndarray, line: LineString, buffer_meters: int) -> np.ndarray:
+        """Positions, in input order, of the geometries the buffered line intersects.
+
+        For one query an R-tree costs more to build than it saves, so candidates
+        are pruned with a vectorized bounding-box overlap test and GEOS runs the
+        exact intersects test, against the prepared buffer, on the rest.
+        """
+        buffered = self._buffer(line, buffer_meters)
+        min_x, min_y, max_x, max_y = buffered.bounds
+        bounds = shapely.bounds(geoms)
+        candidates = np.flatnonzero(
+            (bounds[:, 0] <= max_x)
+            & (bounds[:, 2] >= min_x)
+            & (bounds[:, 1] <= max_y)
+            & (bounds[:, 3] >= min_y)
+        )
+        shapely.prepare(buffered)
+        return candidates[shapely.intersects(buffered, geoms[candidates])]
+
+    def _query_segments(
+        self, tree: STRtree, segments: List[LineString], buffer_meters: int
+    ) -> List[np.ndarray]:
+        """_query_cells for every segment at once.
+
+        Segments are buffered and queried in one call each, so the loop over
+        segments runs inside GEOS rather than in Python.
 
-        return intersecting
+        Returns:
+            Per segment, the positions of the indexed cells it intersects
+        """
+        segment_array = np.array(segments, dtype=object)
+
+        # Buffering is the costly step, so first find the segments whose padded
+        # bounding box overlaps any cell's box; the rest can't touch a cell and
+        # are neither buffered nor tested
+        boxes = shapely.box(*expand_bounds_wgs84(segment_array, buffer_meters).T)
+        near = np.unique(tree.query(boxes)[0])
+
+        buffers = self._buffer(segment_array[near], buffer_meters)
+        segment_idx, cell_idx = tree.query(buffers, predicate="intersects")
+        segment_idx = near[segment_idx]
+        order = np.lexsort((cell_idx, segment_idx))
+        bounds = np.searchsorted(segment_idx[order], np.arange(len(segments) + 1))
+        cell_idx = cell_idx[order]
+        return [cell_idx[bounds[i] : bounds[i + 1]] for i in range(len(segments))]
 
     def _create_route_segments(
         self, route_line: LineString, max_segment_length_deg: float = 0.001
@@ -251,77 +438,91 @@ class RouteSafetyService:
         Returns:
             List of LineString segments
         """
-        coords = list(route_line.coords)
+        coords = np.asarray(route_line.coords)
         if len(coords) < 2:
             return []
 
-        segments = []
-        current_segment = [coords[0]]
-
-        for i in range(1, len(coords)):
-            current_segment.append(coords[i])
+        # Distance along the route at each vertex. A segment ends at the first
+        # vertex at least max_segment_length_deg past its start, or at the end
+        # of the route, and the next segment starts from that vertex.
+        steps = np.linalg.norm(np.diff(coords[:, :2], axis=0), axis=1)
+        distance = np.concatenate(([0.0], np.cumsum(steps)))
+        last = len(coords) - 1
 
-            # Calculate segment length
-            segment_line = LineString(current_segment)
-            segment_length = segment_line.length
-
-            # If segment is long enough or this is the last point, create segment
-            if segment_length >= max_segment_length_deg or i == len(coords) - 1:
-                segments.append(segment_line)
-                current_segment = [coords[i]]  # Start new segment from this point
-
-        # If we have a remaining segment with just one point, add it to the last segment
-        if len(current_segment) > 1:
-            segments.append(LineString(current_segment))
+        segments = []
+        start = 0
+        while start < last:
+            end = int(np.searchsorted(distance, distance[start] + max_segment_length_deg))
+            end = min(max(end, start + 1), last)
+            segments.append(LineString(coords[start : end + 1]))
+            start = end
 
         return segments if segments else [route_line]
 
-    def _calculate_segment_risk(
+    def _cell_risks(
         self,
         cells: List,
         current_month: date,
         time_of_day: Optional[str] = None,
-    ) -> float:
-        """Calculate segment risk from intersecting cells.
+    ) -> Tuple[np.ndarray, Dict[str, float]]:
+        """Weight each cell's crimes once, for both segment risk and the breakdown.
+
+        A cell's risk is its recency-weighted crime_count_weighted or, when
+        time_of_day is given, its recency- and time-weighted category counts.
+        Cells are read into arrays (one row per cell, one stats column per
+        category) in a single pass and the weighting runs in numpy.
 
         Args:
-            cells: SafetyCell objects intersecting the segment
+            cells: SafetyCell objects
             current_month: Reference month for recency weights
             time_of_day: Time period for weighting (optional)
 
         Returns:
-            Average risk score across cells
+            Tuple of (risk per cell, aligned with cells; unrounded recency- and
+            time-weighted count per crime category across all cells)
         """
-        if not cells:
-            return 0.0
-
-        total_weighted_risk = 0.0
-
-        for cell in cells:
-            # Calculate recency weight
-            months_ago = calculate_months_ago(cell.month, current_month)
-            recency_multiplier = get_recency_weight(months_ago)
-
-            # Get weighted crime count
-            weighted_crime_count = float(cell.crime_count_weighted)
-
-            # Apply time-of-day weighting if specified
-            if time_of_day and cell.stats:
-                weighted_crime_count = 0.0
+        recency_by_month: Dict[date, float] = {}
+        categories: Dict[str, int] = {}
+        recency = np.empty(len(cells))
+        crime_count_weighted = np.empty(len(cells))
+        has_stats = np.zeros(len(cells), dtype=bool)
+        stat_rows: List[int] = []
+        stat_cols: List[int] = []
+        stat_counts: List[float] = []
+
+        for row, cell in enumerate(cells):
+            recency_multiplier = recency_by_month.get(cell.month)
+            if recency_multiplier is None:
+                months_ago = calculate_months_ago(cell.month, current_month)
+                recency_multiplier = get_recency_weight(months_ago)
+                recency_by_month[cell.month] = recency_multiplier
+            recency[row] = recency_multiplier
+            crime_count_weighted[row] = float(cell.crime_count_weighted)
+
+            if cell.stats:
+                has_stats[row] = True
                 for category, count in cell.stats.items():
-                    time_weights = CRIME_TIME_WEIGHTS.get(category, {})
-                    time_multiplier = time_weights.get(time_of_day, 1.0)
-                    weighted_crime_count += count * time_multiplier
-
-            # Apply recency weighting
-            weighted_crime_count *= recency_multiplier
-
-            total_weighted_risk += weighted_crime_count
-
-        # Average risk across cells for this segment
-        avg_risk = total_weighted_risk / len(cells) if cells else 0.0
+                    stat_rows.append(row)
+                    stat_cols.append(categories.setdefault(category, len(categories)))
+                    stat_counts.append(count)
+
+        stats = np.zeros((len(cells), len(categories)))
+        stats[stat_rows, stat_cols] = stat_counts
+        # Apply time-of-day weighting if specified
+        if time_of_day:
+            stats *= np.array(
+                [
+                    CRIME_TIME_WEIGHTS.get(category, {}).get(time_of_day, 1.0)
+                    for category in categories
+                ]
+            )
+            cell_risks = np.where(has_stats, stats.sum(axis=1), crime_count_weighted)
+        else:
+            cell_risks = crime_count_weighted
+        cell_risks *= recency
 
-        return avg_risk
+        crime_totals = dict(zip(categories, (recency @ stats).tolist()))
+        return cell_risks, crime_totals
 
     def _identify_hotspots(
         self, segment_scores: List[Dict], avg_risk: float, threshold_multiplier: float = 1.5
@@ -357,40 +558,3 @@ class RouteSafetyService:
                 )
 
         return hotspots
-
-    def _calculate_crime_breakdown(
-        self,
-        cells: List,
-        current_month: date,
-        time_of_day: Optional[str] = None,
-    ) -> Dict[str, float]:
-        """Break down crime types along the route.
-
-        Args:
-            cells: SafetyCell objects along route
-            current_month: Reference month for recency
-            time_of_day: Time period filter (optional)
-
-        Returns:
-            Crime categories mapped to weighted counts
-        """
-        crime_totals: Dict[str, float] = defaultdict(float)
-
-        for cell in cells:
-            if not cell.stats:
-                continue
-
-            # Calculate recency weight
-            months_ago = calculate_months_ago(cell.month, current_month)
-            recency_multiplier = get_recency_weight(months_ago)
-
-            # Sum up crimes by category with weighting
-            for category, count in cell.stats.items():
-                time_weights = CRIME_TIME_WEIGHTS.get(category, {})
-                time_multiplier = time_weights.get(time_of_day, 1.0) if time_of_day else 1.0
-
-                weighted_count = count * time_multiplier * recency_multiplier
-                crime_totals[category] += weighted_count
-
-        # Round values
-        return {category: round(count, 2) for category, count in crime_totals.items()}
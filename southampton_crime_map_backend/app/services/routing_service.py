@@ -2,19 +2,27 @@
 
 import asyncio
 import hashlib
-import json
 import logging
 from typing import Any, Dict, List, Optional
 
 import httpx
+import orjson
 import redis.asyncio as redis
 
 from app.config import get_settings
 from app.core.exceptions import ExternalServiceError
+from app.core.http_pool import get_http_client
+from app.core.redis_pool import get_redis
+from app.services.cache_service import decode_snapshot_async, encode_snapshot_async
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Cache key -> ORS fetch in progress. Concurrent requests for the same directions
+# all miss the cache; this lets them share one upstream call instead of each
+# calling ORS.
+_inflight: Dict[str, "asyncio.Task[Dict[str, Any]]"] = {}
+
 
 class RoutingService:
     """OpenRouteService routing client with Redis caching."""
@@ -25,29 +33,21 @@ class RoutingService:
         self.timeout = 15.0
         self.max_retries = 2
         self.cache_ttl = 86400  # 24 hours
-        self._redis_client: Optional[redis.Redis] = None
 
     async def _get_redis_client(self) -> Optional[redis.Redis]:
-        """Get or create Redis client."""
-        if self._redis_client is None:
-            try:
-                self._redis_client = redis.from_url(
-                    settings.REDIS_URL, encoding="utf-8", decode_responses=True
-                )
-                # Test connection
-                await self._redis_client.ping()
-                logger.info("Redis connection established for ORS caching")
-            except Exception as e:
-                logger.warning(f"Redis connection failed: {str(e)}. Caching disabled.")
-                self._redis_client = None
-        return self._redis_client
+        """Get the shared Redis client that returns raw bytes.
+
+        Responses are cached as orjson bytes (zstd-compressed when large, as for
+        safety snapshots), so nothing is decoded to str first.
+        """
+        return await get_redis(decode_responses=False)
 
     def _generate_cache_key(
         self, profile: str, coordinates: List[List[float]], alternatives: int
     ) -> str:
         """Generate cache key for ORS request."""
-        data = f"{profile}:{alternatives}:{json.dumps(coordinates)}"
-        return f"ors:{hashlib.md5(data.encode()).hexdigest()}"
+        data = f"{profile}:{alternatives}:".encode() + orjson.dumps(coordinates)
+        return f"ors:{hashlib.blake2b(data, digest_size=16).hexdigest()}"
 
     async def get_directions(
         self,
@@ -77,11 +77,33 @@ class RoutingService:
                 cached = await redis_client.get(cache_key)
                 if cached:
                     logger.info(f"Cache HIT for {cache_key}")
-                    return json.loads(cached)
+                    return await decode_snapshot_async(cached)
                 logger.info(f"Cache MISS for {cache_key}")
             except Exception as e:
                 logger.warning(f"Redis get error: {str(e)}")
 
+        task = _inflight.get(cache_key)
+        if task is None:
+            task = asyncio.ensure_future(
+                self._fetch_directions(cache_key, redis_client, coordinates, profile, alternatives)
+            )
+            _inflight[cache_key] = task
+            task.add_done_callback(lambda _: _inflight.pop(cache_key, None))
+        else:
+            logger.info(f"Joining in-flight ORS request for {cache_key}")
+
+        # Shielded so one caller disconnecting doesn't cancel the fetch for the others
+        return await asyncio.shield(task)
+
+    async def _fetch_directions(
+        self,
+        cache_key: str,
+        redis_client: Optional[redis.Redis],
+        coordinates: List[List[float]],
+        profile: str,
+        alternatives: int,
+    ) -> Dict[str, Any]:
+        """Fetch directions from ORS (with retries) and cache the response."""
         # Fetch from ORS API
         url = f"{self.base_url}/v2/directions/{profile}/geojson"
 
@@ -102,42 +124,42 @@ class RoutingService:
 
         for attempt in range(self.max_retries):
             try:
-                async with httpx.AsyncClient(timeout=self.timeout) as client:
-                    response = await client.post(url, json=body, headers=headers)
-
-                    if response.status_code == 200:
-                        data = response.json()
-                        logger.info(f"Fetched {len(data.get('features', []))} routes from ORS")
-
-                        # Cache the response
-                        if redis_client:
-                            try:
-                                await redis_client.setex(
-                                    cache_key, self.cache_ttl, json.dumps(data)
-                                )
-                                logger.info(f"Cached ORS response for {cache_key}")
-                            except Exception as e:
-                                logger.warning(f"Redis set error: {str(e)}")
-
-                        return data
-
-                    elif response.status_code == 400:
-                        logger.error(f"Invalid ORS request: {response.text}")
-                        raise ExternalServiceError("Invalid routing request")
-
-                    elif response.status_code == 429:
-                        logger.warning("ORS rate limit exceeded")
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(2**attempt)
-                            continue
-                        raise ExternalServiceError("Rate limit exceeded")
-
-                    else:
-                        logger.error(f"ORS error {response.status_code}: {response.text}")
-                        if attempt < self.max_retries - 1:
-                            await asyncio.sleep(2**attempt)
-                            continue
-                        raise ExternalServiceError("Routing service unavailable")
+                response = await get_http_client().post(
+                    url, json=body, headers=headers, timeout=self.timeout
+                )
+
+                if response.status_code == 200:
+                    data = response.json()
+                    logger.info(f"Fetched {len(data.get('features', []))} routes from ORS")
+
+                    # Cache the response
+                    if redis_client:
+                        try:
+                            raw = await encode_snapshot_async(data)
+                            await redis_client.setex(cache_key, self.cache_ttl, raw)
+                            logger.info(f"Cached ORS response for {cache_key}")
+                        except Exception as e:
+                            logger.warning(f"Redis set error: {str(e)}")
+
+                    return data
+
+                elif response.status_code == 400:
+                    logger.error(f"Invalid ORS request: {response.text}")
+                    raise ExternalServiceError("Invalid routing request")
+
+                elif response.status_code == 429:
+                    logger.warning("ORS rate limit exceeded")
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(2**attempt)
+                        continue
+                    raise ExternalServiceError("Rate limit exceeded")
+
+                else:
+                    logger.error(f"ORS error {response.status_code}: {response.text}")
+                    if attempt < self.max_retries - 1:
+                        await asyncio.sleep(2**attempt)
+                        continue
+                    raise ExternalServiceError("Routing service unavailable")
 
             except httpx.TimeoutException:
                 logger.error(f"ORS timeout (attempt {attempt + 1})")
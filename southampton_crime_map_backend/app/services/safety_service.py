@@ -2,15 +2,19 @@
 
 import logging
 from datetime import date, datetime
-from typing import Any, Dict, List, Optional
+from typing import Any, Dict, List, Optional, Tuple
 
-from shapely.geometry import LineString
+import numpy as np
+import shapely
+from dateutil.relativedelta import relativedelta
+from shapely.geometry.base import BaseGeometry
 from sqlalchemy.orm import Session
 
-from app.config import get_settings
+from app.config import CRIME_TIME_WEIGHTS, get_settings
 from app.repositories.crime_repository import CrimeRepository
-from app.utils.geometry import buffer_line, reproject_to_27700
+from app.utils.geometry import buffer_wgs84, h3_cell_polygon
 from app.utils.scoring import (
+    TIME_BUCKETS,
     calculate_months_ago,
     get_recency_weight,
     get_time_bucket,
@@ -42,7 +46,8 @@ class SafetyScoringService:
         """Score and rank multiple routes by safety.
 
         Args:
-            routes_data: Routes with geometry and segments
+            routes_data: Routes with geometry and segments; each gains a
+                ``buffer`` (EPSG:4326) unless it already has one
             lookback_months: Historical crime data period
             departure_time: Departure time for time-of-day weights
             time_sensitive: Apply time-based weighting
@@ -54,21 +59,56 @@ class SafetyScoringService:
         current_month = date.today().replace(day=1)
         user_time_bucket = get_time_bucket(departure_time) if departure_time else None
 
+        # The previous lookback_months months, most recent first
+        months = [current_month - relativedelta(months=i + 1) for i in range(lookback_months)]
+
+        # Stats columns to read, with their weights aligned to them
+        categories: List[str] = []
+        category_weight_vec = None
+        if category_weights:
+            categories = sorted(set(CRIME_TIME_WEIGHTS) | set(category_weights))
+            category_weight_vec = np.array(
+                [category_weights.get(cat_id, 1.0) for cat_id in categories]
+            )
+        time_weight_vec = None
+        if time_sensitive and user_time_bucket:
+            time_weight_vec = np.array(
+                [get_time_weight(bucket, user_time_bucket) for bucket in TIME_BUCKETS]
+            )
+
+        # Buffer every route in one projection pass, kept on route_data for reuse
+        unbuffered = [route_data for route_data in routes_data if "buffer" not in route_data]
+        if unbuffered:
+            buffers = buffer_wgs84(
+                np.array([route_data["geometry"] for route_data in unbuffered], dtype=object),
+                settings.DEFAULT_ROUTE_BUFFER_M,
+            )
+            for route_data, route_buffer in zip(unbuffered, buffers):
+                route_data["buffer"] = route_buffer
+        route_buffers = [route_data["buffer"] for route_data in routes_data]
+
+        # One query serves every route: the cells near any of them
+        cell_stats = self.crime_repo.get_cell_stats_for_months(
+            months,
+            categories=categories,
+            time_buckets=TIME_BUCKETS if time_weight_vec is not None else (),
+            within=shapely.union_all(route_buffers),
+        )
+
         # Calculate risk for each route
         route_risks = []
-        for route_data in routes_data:
-            route_geom = route_data["geometry"]  # Shapely LineString
-            segments = route_data.get("segments", [])
+        for route_data, route_buffer in zip(routes_data, route_buffers):
+            route_stats = cell_stats
+            if len(routes_data) > 1:
+                route_stats = self._cells_within(cell_stats, route_buffer)
 
             # Calculate route risk
             total_risk = self._calculate_route_risk(
-                route_geom=route_geom,
-                segments=segments,
+                cell_stats=route_stats,
+                months=months,
                 current_month=current_month,
-                lookback_months=lookback_months,
-                user_time_bucket=user_time_bucket,
-                time_sensitive=time_sensitive,
-                category_weights=category_weights,
+                category_weights=category_weight_vec,
+                time_weights=time_weight_vec,
             )
 
             route_risks.append(
@@ -123,75 +163,100 @@ class SafetyScoringService:
 
     def _calculate_route_risk(
         self,
-        route_geom: LineString,
-        segments: List[RouteSegment],
+        cell_stats: Dict[date, Tuple[np.ndarray, np.ndarray]],
+        months: List[date],
         current_month: date,
-        lookback_months: int,
-        user_time_bucket: Optional[str],
-        time_sensitive: bool,
-        category_weights: Optional[Dict[str, float]],
+        category_weights: Optional[np.ndarray],
+        time_weights: Optional[np.ndarray],
     ) -> float:
         """Calculate total risk for a route.
 
+        Args:
+            cell_stats: Stats of the cells within the route buffer, by month
+            months: Lookback months to sum over
+            category_weights: Weight per category column, if recomputing risk
+            time_weights: Weight per time bucket column, if time-sensitive
+
         Returns:
             Weighted risk value
         """
-        # Reproject for accurate buffering
-        route_geom_27700 = reproject_to_27700(route_geom)
-
-        # Create buffer (PostGIS spatial query not yet implemented)
-        buffer_m = settings.DEFAULT_ROUTE_BUFFER_M
-        _ = buffer_line(route_geom_27700, buffer_m)
-
-        # Get cells for lookback period (spatial filtering to be added)
-
-        start_month = current_month
-        total_risk = 0.0
-
-        for i in range(lookback_months):
-            # Calculate month
-            month = date(start_month.year, start_month.month, 1)
-            if month.month == 1:
-                month = date(month.year - 1, 12, 1)
-            else:
-                month = date(month.year, month.month - 1, 1)
-
-            # Get cells for this month (simplified - no spatial filter yet)
-            cells = self.crime_repo.get_cells_by_month(month)
-
-            # Apply recency weight
-            months_ago = calculate_months_ago(month, current_month)
-            recency_factor = get_recency_weight(months_ago)
-
-            for cell in cells:
-                # Get weighted crime count
-                if category_weights:
-                    # Recompute from category counts
-                    stats = cell.stats or {}
-                    category_counts = stats.get("category_counts", {})
-                    cell_risk = sum(
-                        count * category_weights.get(cat_id, 1.0)
-                        for cat_id, count in category_counts.items()
-                    )
-                else:
-                    # Use pre-aggregated weighted count
-                    cell_risk = float(cell.crime_count_weighted)
-
-                # Apply time-of-day weighting
-                time_factor = 1.0
-                if time_sensitive and user_time_bucket:
-                    stats = cell.stats or {}
-                    time_buckets = stats.get("time_buckets", {})
-                    # Simplified: apply average time factor
-                    for bucket, count in time_buckets.items():
-                        if count > 0:
-                            time_factor = get_time_weight(bucket, user_time_bucket)
-                            break
-
-                # Add to total risk
-                total_risk += cell_risk * recency_factor * time_factor
-
-        return total_risk
+        # Stack every month's cells so the whole lookback is reduced in one pass,
+        # each row carrying its month's recency weight
+        present = [month for month in months if month in cell_stats]
+        if not present:
+            return 0.0
+        recency_weights = np.array(
+            [get_recency_weight(calculate_months_ago(month, current_month)) for month in present]
+        )
+        values = np.concatenate([cell_stats[month][1] for month in present])
+        cell_weights = np.repeat(recency_weights, [len(cell_stats[month][1]) for month in present])
+        return self._risk_sum(values, category_weights, time_weights, cell_weights)
+
+    @staticmethod
+    def _cells_within(
+        cell_stats: Dict[date, Tuple[np.ndarray, np.ndarray]], area: BaseGeometry
+    ) -> Dict[date, Tuple[np.ndarray, np.ndarray]]:
+        """Keep only the cells whose hexagon intersects ``area`` (EPSG:4326)."""
+        cell_ids = np.unique(np.concatenate([ids for ids, _ in cell_stats.values()] or [[]]))
+        if len(cell_ids) == 0:
+            return cell_stats
+
+        shapely.prepare(area)
+        hits = shapely.intersects(area, [h3_cell_polygon(int(cell_id)) for cell_id in cell_ids])
+        near = cell_ids[hits]
+
+        filtered = {}
+        for month, (ids, values) in cell_stats.items():
+            keep = np.isin(ids, near)
+            filtered[month] = (ids[keep], values[keep])
+        return filtered
+
+    @staticmethod
+    def _risk_sum(
+        values: np.ndarray,
+        category_weights: Optional[np.ndarray],
+        time_weights: Optional[np.ndarray],
+        cell_weights: Optional[np.ndarray] = None,
+    ) -> float:
+        """Sum cell risks, each scaled by its ``cell_weights`` entry (default 1.0).
+
+        ``values`` holds a row per cell as returned by
+        ``CrimeRepository.get_cell_stats_for_months``: the weighted crime count,
+        then one column per ``category_weights`` entry, then one per
+        ``time_weights`` entry (in ``TIME_BUCKETS`` order). A cell's risk is its
+        weighted count, or its category counts dotted with ``category_weights``,
+        times the mean of ``time_weights`` over its crimes' time buckets; cells
+        without time data (or when ``time_weights`` is None) get a factor of 1.0.
+        The factors are folded into one weight vector, so the sum is a single dot
+        product.
+        """
+        if len(values) == 0:
+            return 0.0
+        if cell_weights is None:
+            cell_weights = np.ones(len(values))
+
+        n_categories = 0
+        if category_weights is not None:
+            # Recompute from category counts
+            n_categories = len(category_weights)
+            cell_risks = values[:, 1 : 1 + n_categories] @ category_weights
+        else:
+            # Use pre-aggregated weighted count
+            cell_risks = values[:, 0]
+
+        if time_weights is None:
+            return float(cell_risks @ cell_weights)
+
+        # Apply time-of-day weighting: the count-weighted mean over each cell's buckets
+        bucket_counts = values[:, 1 + n_categories :]
+        bucket_totals = bucket_counts.sum(axis=1)
+        time_factors = np.divide(
+            bucket_counts @ time_weights,
+            bucket_totals,
+            out=np.ones(len(values)),
+            where=bucket_totals > 0,
+        )
+        return float(cell_risks @ (time_factors * cell_weights))
 
     def identify_hotspots(
         self,
@@ -210,44 +275,33 @@ class SafetyScoringService:
         if not segment_risks or len(segment_risks) < 3:
             return []
 
-        # Calculate 75th percentile
-        sorted_risks = sorted(segment_risks)
-        percentile_75_idx = int(len(sorted_risks) * 0.75)
-        threshold = sorted_risks[percentile_75_idx]
-
-        # Find consecutive high-risk segments
-        hotspots = []
-        current_hotspot = None
-
-        for idx, risk in enumerate(segment_risks):
-            if risk > threshold:
-                if current_hotspot is None:
-                    current_hotspot = {
-                        "segment_range": [idx, idx],
-                        "risk_score": risk,
-                        "categories": [],
-                    }
-                else:
-                    current_hotspot["segment_range"][1] = idx
-                    current_hotspot["risk_score"] = max(current_hotspot["risk_score"], risk)
-            else:
-                if current_hotspot is not None:
-                    # Normalize risk score to 0-1
-                    max_risk = max(segment_risks)
-                    current_hotspot["risk_score"] = (
-                        current_hotspot["risk_score"] / max_risk if max_risk > 0 else 0
-                    )
-                    current_hotspot["description"] = "Higher recent crime density"
-                    hotspots.append(current_hotspot)
-                    current_hotspot = None
-
-        # Add final hotspot if exists
-        if current_hotspot is not None:
-            max_risk = max(segment_risks)
-            current_hotspot["risk_score"] = (
-                current_hotspot["risk_score"] / max_risk if max_risk > 0 else 0
-            )
-            current_hotspot["description"] = "Higher recent crime density"
-            hotspots.append(current_hotspot)
+        risks = np.asarray(segment_risks, dtype=float)
+
+        # Calculate 75th percentile (a partial sort is enough for one order statistic)
+        percentile_75_idx = int(len(risks) * 0.75)
+        threshold = np.partition(risks, percentile_75_idx)[percentile_75_idx]
+
+        # Find runs of consecutive high-risk segments from the mask's edges
+        high = risks > threshold
+        edges = np.diff(high.astype(np.int8), prepend=0, append=0)
+        starts = np.flatnonzero(edges == 1)
+        ends = np.flatnonzero(edges == -1) - 1
+        if len(starts) == 0:
+            return []
 
-        return hotspots
+        # Peak risk per run; low segments between runs are masked out of the max
+        peaks = np.maximum.reduceat(np.where(high, risks, -np.inf), starts)
+
+        # Normalize risk score to 0-1
+        max_risk = risks.max()
+        scores = peaks / max_risk if max_risk > 0 else np.zeros(len(peaks))
+
+        return [
+            {
+                "segment_range": [int(start), int(end)],
+                "risk_score": float(score),
+                "categories": [],
+                "description": "Higher recent crime density",
+            }
+            for start, end, score in zip(starts, ends, scores)
+        ]
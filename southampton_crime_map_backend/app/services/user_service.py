@@ -6,8 +6,9 @@ from typing import Any, Dict
 from sqlalchemy.orm import Session
 
 from app.core.exceptions import AuthenticationError, NotFoundError
-from app.core.security import verify_password
+from app.core.security import verify_password_async
 from app.repositories.user_repository import UserRepository
+from app.services.auth_service import invalidate_cached_user
 
 
 class UserService:
@@ -42,9 +43,10 @@ class UserService:
         user = self.user_repo.update_settings(user_id, settings_update)
         if not user:
             raise NotFoundError("User not found")
+        invalidate_cached_user(user_id)
         return user.settings
 
-    def delete_user_account(self, user_id: uuid.UUID, password: str) -> None:
+    async def delete_user_account(self, user_id: uuid.UUID, password: str) -> None:
         """Delete user account (requires password confirmation).
 
         Raises:
@@ -56,7 +58,7 @@ class UserService:
             raise NotFoundError("User not found")
 
         # Verify password
-        if not verify_password(password, user.hashed_password):
+        if not await verify_password_async(password, user.hashed_password):
             raise AuthenticationError("Invalid password")
 
         # Revoke all refresh sessions
@@ -64,3 +66,4 @@ class UserService:
 
         # Hard delete user (CASCADE will delete history and sessions)
         self.user_repo.delete(user_id)
+        invalidate_cached_user(user_id)
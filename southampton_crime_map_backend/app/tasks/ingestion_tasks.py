@@ -9,11 +9,14 @@ This module contains background tasks for:
 All tasks use H3 hexagonal indexing for spatial analysis.
 """
 
+import asyncio
 import logging
 from datetime import date, datetime, timedelta
+from typing import List, Tuple, Union
 
 from celery import Task
 from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
 from sqlalchemy.orm import Session
 
 from app.celery_app import celery_app
@@ -21,11 +24,66 @@ from app.config import get_settings
 from app.db.base import SessionLocal
 from app.ingestion.crime_ingester import CrimeIngester
 from app.ingestion.grid_builder import GridBuilder
-from app.models import RouteHistory
+from app.repositories.route_repository import RouteRepository
 
 logger = logging.getLogger(__name__)
 settings = get_settings()
 
+# Built once at import rather than re-parsed on every task run
+_GRID_STATS_QUERY = text(
+    """
+    SELECT
+        COUNT(DISTINCT cell_id) as unique_cells,
+        COUNT(*) as total_cell_months,
+        SUM(crime_count_total) as total_crimes,
+        AVG(crime_count_total) as avg_crimes_per_cell,
+        MAX(crime_count_total) as max_crimes_per_cell
+    FROM safety_cells
+    WHERE month >= :start_month
+    """
+)
+
+# Every health metric in one round-trip: a row per month with data since
+# :start_month, each carrying the grid-wide and window-wide aggregates (a
+# single row with a NULL month if the window is empty)
+_GRID_HEALTH_QUERY = text(
+    """
+    WITH grid AS (
+        SELECT
+            COUNT(*) as total_cells,
+            COUNT(DISTINCT cell_id) as unique_h3_cells,
+            -- H3 cell indices carry mode 1 in bits 59-62
+            COUNT(CASE WHEN ((cell_id >> 59) & 15) <> 1 THEN 1 END) as invalid_cell_ids
+        FROM safety_cells
+    ),
+    quality AS (
+        SELECT
+            COUNT(*) as total_records,
+            COUNT(CASE WHEN crime_count_total = 0 THEN 1 END) as zero_crime_cells,
+            COUNT(CASE WHEN crime_count_weighted = 0 THEN 1 END) as zero_weighted_cells,
+            COUNT(CASE WHEN stats IS NULL THEN 1 END) as null_stats,
+            AVG(crime_count_total) as avg_crimes,
+            MAX(crime_count_total) as max_crimes
+        FROM safety_cells
+        WHERE month >= :start_month
+    ),
+    coverage AS (
+        SELECT
+            month,
+            COUNT(DISTINCT cell_id) as cells_count,
+            SUM(crime_count_total) as total_crimes
+        FROM safety_cells
+        WHERE month >= :start_month
+        GROUP BY month
+    )
+    SELECT grid.*, quality.*, coverage.month, coverage.cells_count, coverage.total_crimes
+    FROM grid
+    CROSS JOIN quality
+    LEFT JOIN coverage ON 1 = 1
+    ORDER BY coverage.month DESC
+    """
+)
+
 
 class DatabaseTask(Task):
     """Base task with database session management."""
@@ -46,6 +104,51 @@ class DatabaseTask(Task):
             self._db = None
 
 
+async def _ingest_months(months: List[date]) -> List[Union[Tuple[int, str], BaseException]]:
+    """Ingest several months of Southampton crime data concurrently.
+
+    Each month gets its own database session, since one Session must not be
+    shared between interleaved coroutines.
+
+    Returns:
+        list: Per month, in order, the (records_ingested, status) result or the
+        exception it raised
+    """
+
+    async def ingest(month: date) -> Tuple[int, str]:
+        db = SessionLocal()
+        try:
+            ingester = CrimeIngester(db)
+            return await ingester.ingest_month(
+                area_name="southampton-core",
+                month=month,
+                force_id="hampshire",
+            )
+        finally:
+            db.close()
+
+    return await asyncio.gather(*(ingest(month) for month in months), return_exceptions=True)
+
+
+async def _invalidate_caches(month_cells: bool = False) -> int:
+    """Drop cached results derived from crime data after it changes.
+
+    Clears safety snapshots and route scores, plus the per-month cell cache when
+    ``month_cells`` is set, all on one event loop.
+
+    Returns:
+        int: Number of snapshot keys invalidated
+    """
+    from app.services.cache_service import CacheService
+
+    cache_service = CacheService()
+    invalidated = await cache_service.invalidate_all_snapshots()
+    if month_cells:
+        await cache_service.invalidate_all_month_cells()
+    await cache_service.invalidate_all_route_scores()
+    return invalidated
+
+
 @celery_app.task(
     bind=True, base=DatabaseTask, name="app.tasks.ingestion_tasks.ingest_latest_crime_data"
 )
@@ -54,7 +157,7 @@ def ingest_latest_crime_data(self):
 
     This task runs monthly to fetch and process the latest crime data.
     The UK Police API typically has a 1-2 month lag, so we check the
-    previous month and 2 months ago.
+    previous month and 2 months ago, both at once.
 
     Returns:
         dict: Summary of ingestion results
@@ -74,26 +177,18 @@ def ingest_latest_crime_data(self):
         results = []
         total_ingested = 0
 
-        for month in months_to_try:
-            logger.info(f"Attempting to ingest data for {month.strftime('%Y-%m')}")
-
-            ingester = CrimeIngester(self.db)
-
-            # Run ingestion asynchronously
-            import asyncio
-
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
+        # The candidate months are independent API calls, so fetch them concurrently
+        logger.info(
+            f"Attempting to ingest data for {', '.join(m.strftime('%Y-%m') for m in months_to_try)}"
+        )
+        outcomes = asyncio.run(_ingest_months(months_to_try))
 
-            records_ingested, status = loop.run_until_complete(
-                ingester.ingest_month(
-                    area_name="southampton-core",
-                    month=month,
-                    force_id="hampshire",
-                )
-            )
+        for month, outcome in zip(months_to_try, outcomes):
+            if isinstance(outcome, BaseException):
+                logger.error(f"Error ingesting {month.strftime('%Y-%m')}: {str(outcome)}")
+                records_ingested, status = 0, "failed"
+            else:
+                records_ingested, status = outcome
 
             results.append(
                 {
@@ -108,25 +203,14 @@ def ingest_latest_crime_data(self):
                 logger.info(
                     f"Successfully ingested {records_ingested} crimes for {month.strftime('%Y-%m')}"
                 )
-                break  # Stop after first successful month
             elif status == "skipped":
                 logger.info(f"Month {month.strftime('%Y-%m')} already ingested")
-                break
             else:
                 logger.warning(f"Ingestion failed for {month.strftime('%Y-%m')}: {status}")
 
         # Invalidate safety snapshot cache if data was ingested
         if total_ingested > 0:
-            from app.services.cache_service import CacheService
-
-            cache_service = CacheService()
-
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            invalidated = loop.run_until_complete(cache_service.invalidate_all_snapshots())
+            invalidated = asyncio.run(_invalidate_caches())
             logger.info(f"Invalidated {invalidated} safety snapshot caches after ingestion")
 
         summary = {
@@ -179,41 +263,13 @@ def rebuild_safety_grid(self, months: int = 12):
         cells_created = builder.build_safety_cells(months=months)
 
         # Get grid statistics
-        from sqlalchemy import text
-
-        stats_query = text(
-            """
-            SELECT
-                COUNT(DISTINCT cell_id) as unique_cells,
-                COUNT(*) as total_cell_months,
-                SUM(crime_count_total) as total_crimes,
-                AVG(crime_count_total) as avg_crimes_per_cell,
-                MAX(crime_count_total) as max_crimes_per_cell
-            FROM safety_cells
-            WHERE month >= :start_month
-        """
-        )
+        start_month = date.today().replace(day=1) - relativedelta(months=months)
 
-        from datetime import date
-
-        start_month = date.today().replace(day=1) - timedelta(days=30 * months)
-
-        result = self.db.execute(stats_query, {"start_month": start_month}).fetchone()
+        result = self.db.execute(_GRID_STATS_QUERY, {"start_month": start_month}).fetchone()
 
         # Invalidate safety snapshot cache after grid rebuild
         if cells_created > 0:
-            from app.services.cache_service import CacheService
-
-            cache_service = CacheService()
-
-            import asyncio
-
-            loop = asyncio.get_event_loop()
-            if loop.is_closed():
-                loop = asyncio.new_event_loop()
-                asyncio.set_event_loop(loop)
-
-            invalidated = loop.run_until_complete(cache_service.invalidate_all_snapshots())
+            invalidated = asyncio.run(_invalidate_caches(month_cells=True))
             logger.info(f"Invalidated {invalidated} safety snapshot caches after grid rebuild")
 
         summary = {
@@ -267,17 +323,8 @@ def cleanup_old_route_history(self, retention_days: int = 90):
         # Calculate cutoff date
         cutoff_date = datetime.utcnow() - timedelta(days=retention_days)
 
-        # Soft-delete old records
-        deleted_count = (
-            self.db.query(RouteHistory)
-            .filter(
-                RouteHistory.created_at < cutoff_date,
-                RouteHistory.deleted_at.is_(None),
-            )
-            .update({"deleted_at": datetime.utcnow()}, synchronize_session=False)
-        )
-
-        self.db.commit()
+        # Soft-delete old records in batches, committing each
+        deleted_count = RouteRepository(self.db).soft_delete_old_records(cutoff_date)
 
         summary = {
             "task": "cleanup_old_route_history",
@@ -318,14 +365,7 @@ def ingest_month_on_demand(self, year: int, month: int):
         ingester = CrimeIngester(self.db)
 
         # Run ingestion asynchronously
-        import asyncio
-
-        loop = asyncio.get_event_loop()
-        if loop.is_closed():
-            loop = asyncio.new_event_loop()
-            asyncio.set_event_loop(loop)
-
-        records_ingested, status = loop.run_until_complete(
+        records_ingested, status = asyncio.run(
             ingester.ingest_month(
                 area_name="southampton-core",
                 month=target_month,
@@ -367,56 +407,12 @@ def validate_h3_grid_health(self):
     logger.info("Starting H3 grid health validation")
 
     try:
-        from sqlalchemy import text
-
-        # Check for valid H3 cell IDs
-        h3_validation_query = text(
-            """
-            SELECT
-                COUNT(*) as total_cells,
-                COUNT(DISTINCT SUBSTRING(cell_id FROM 1 FOR 15)) as unique_h3_cells,
-                COUNT(CASE WHEN LENGTH(cell_id) < 15 THEN 1 END) as invalid_cell_ids
-            FROM safety_cells
-        """
-        )
+        start_month = date.today().replace(day=1) - relativedelta(years=1)
+        rows = self.db.execute(_GRID_HEALTH_QUERY, {"start_month": start_month}).fetchall()
 
-        h3_result = self.db.execute(h3_validation_query).fetchone()
-
-        # Check for monthly coverage
-        coverage_query = text(
-            """
-            SELECT
-                month,
-                COUNT(DISTINCT cell_id) as cells_count,
-                SUM(crime_count_total) as total_crimes
-            FROM safety_cells
-            WHERE month >= :start_month
-            GROUP BY month
-            ORDER BY month DESC
-        """
-        )
-
-        from datetime import date
-
-        start_month = date.today().replace(day=1) - timedelta(days=365)
-        coverage_result = self.db.execute(coverage_query, {"start_month": start_month}).fetchall()
-
-        # Check for data quality issues
-        quality_query = text(
-            """
-            SELECT
-                COUNT(*) as total_records,
-                COUNT(CASE WHEN crime_count_total = 0 THEN 1 END) as zero_crime_cells,
-                COUNT(CASE WHEN crime_count_weighted = 0 THEN 1 END) as zero_weighted_cells,
-                COUNT(CASE WHEN stats IS NULL THEN 1 END) as null_stats,
-                AVG(crime_count_total) as avg_crimes,
-                MAX(crime_count_total) as max_crimes
-            FROM safety_cells
-            WHERE month >= :start_month
-        """
-        )
-
-        quality_result = self.db.execute(quality_query, {"start_month": start_month}).fetchone()
+        # Grid-wide and quality metrics repeat on every row
+        h3_result = quality_result = rows[0]
+        coverage_result = [row for row in rows if row.month is not None]
 
         # Build health report
         monthly_coverage = [
@@ -425,8 +421,6 @@ def validate_h3_grid_health(self):
         ]
 
         # Identify missing months
-        from dateutil.relativedelta import relativedelta
-
         expected_months = []
         current = date.today().replace(day=1)
         for i in range(12):
@@ -11,10 +11,13 @@ Repository: https://github.com/ss2d22/saferoute
 """
 
 import logging
-from typing import cast
+from typing import Any, cast
 
+import h3
+import numpy as np
+import shapely
 from pyproj import Transformer
-from shapely.geometry import LineString
+from shapely.geometry import LineString, Polygon
 from shapely.ops import transform
 
 logger = logging.getLogger(__name__)
@@ -64,18 +67,66 @@ def reproject_to_4326(geom: LineString) -> LineString:
     return cast(LineString, transform(transformer_27700_to_4326.transform, geom))
 
 
-def buffer_line(geom: LineString, buffer_m: float) -> str:
-    """Create a buffer around a line geometry.
+def _coords_to_27700(coords: np.ndarray) -> np.ndarray:
+    return np.column_stack(transformer_4326_to_27700.transform(coords[:, 0], coords[:, 1]))
+
+
+def _coords_to_4326(coords: np.ndarray) -> np.ndarray:
+    return np.column_stack(transformer_27700_to_4326.transform(coords[:, 0], coords[:, 1]))
+
+
+def buffer_wgs84(geoms: Any, buffer_m: float) -> Any:
+    """Buffer EPSG:4326 geometries by a distance in metres.
+
+    The geometries are buffered in EPSG:27700 and the result projected back, so
+    the buffer is the same width in every direction (a degree of longitude is
+    only ~70 km at Southampton's latitude). Accepts one geometry or an array of
+    them; all coordinates are reprojected in one vectorized call each way.
 
     Args:
-        geom: Shapely LineString in EPSG:27700
+        geoms: Shapely geometry, or array of geometries, in EPSG:4326
+        buffer_m: Buffer distance in metres
+
+    Returns:
+        Buffered geometry (or array) in EPSG:4326
+    """
+    projected = shapely.transform(geoms, _coords_to_27700)
+    return shapely.transform(shapely.buffer(projected, buffer_m), _coords_to_4326)
+
+
+def expand_bounds_wgs84(geoms: Any, buffer_m: float) -> np.ndarray:
+    """Bounding boxes of EPSG:4326 geometries grown to cover a metre buffer.
+
+    A cheap stand-in for ``shapely.bounds(buffer_wgs84(geoms, buffer_m))``. Each
+    box is padded by the buffer's width in degrees of longitude at the box's
+    most poleward latitude, which is at least its width in latitude too, plus
+    1% for the British National Grid scale factor. Over Great Britain the box is
+    never smaller than the real buffer's.
+
+    Args:
+        geoms: Shapely geometry, or array of geometries, in EPSG:4326
         buffer_m: Buffer distance in metres
 
     Returns:
-        WKT string of buffered polygon in EPSG:27700
+        Array of (minx, miny, maxx, maxy) boxes, one per geometry
+    """
+    bounds = np.atleast_2d(shapely.bounds(geoms))
+    max_abs_lat = np.maximum(np.abs(bounds[:, 1]), np.abs(bounds[:, 3]))
+    pad = 1.01 * buffer_m / (111_320.0 * np.cos(np.radians(max_abs_lat)))
+    return bounds + pad[:, None] * np.array([-1.0, -1.0, 1.0, 1.0])
+
+
+def h3_cell_polygon(cell_id: int) -> Polygon:
+    """An H3 cell's hexagon, the same shape the grid builder stores.
+
+    Args:
+        cell_id: 64-bit H3 index
+
+    Returns:
+        Shapely Polygon in EPSG:4326
     """
-    buffered = geom.buffer(buffer_m)
-    return buffered.wkt
+    boundary = h3.cell_to_boundary(h3.int_to_str(cell_id))
+    return Polygon([(lng, lat) for lat, lng in boundary])
 
 
 def calculate_length_m(geom: LineString) -> float:
@@ -8,6 +8,9 @@ from datetime import date, datetime
 
 from dateutil.relativedelta import relativedelta
 
+# Daily periods returned by get_time_bucket
+TIME_BUCKETS = ("night", "morning", "day", "evening")
+
 
 def get_recency_weight(months_ago: int) -> float:
     """Returns weight factor based on crime age.
@@ -4,6 +4,7 @@ import os
 from typing import Generator
 
 import pytest
+import redis
 from fastapi.testclient import TestClient
 from sqlalchemy import create_engine, text
 from sqlalchemy.orm import Session, sessionmaker
@@ -13,10 +14,36 @@ os.environ["APP_ENV"] = "test"
 os.environ["DATABASE_URL"] = "sqlite:///./test.db"
 os.environ["JWT_SECRET_KEY"] = "test-secret-key-for-testing-only"
 os.environ["RATE_LIMIT_ENABLED"] = "false"  # Disable rate limiting in tests
+os.environ["ARGON2_TIME_COST"] = "1"  # Cheapest password hashing
 
+from app.config import get_settings
 from app.db.base import Base, get_db
 from app.main import app
 from app.models import CrimeCategory, User
+from app.services.auth_service import _current_user_cache
+from app.services.cache_service import _local_snapshots
+
+
+@pytest.fixture(autouse=True)
+def clear_in_process_caches() -> Generator[None, None, None]:
+    """Keep in-process cached snapshots and users from leaking between tests."""
+    _local_snapshots.clear()
+    _current_user_cache.clear()
+    yield
+
+
+@pytest.fixture(autouse=True)
+def clear_redis_safety_keys() -> Generator[None, None, None]:
+    """Keep snapshots and scores cached in Redis by one test from reaching the next."""
+    try:
+        client = redis.Redis.from_url(get_settings().REDIS_URL)
+        keys = list(client.scan_iter("safety:*"))
+        if keys:
+            client.unlink(*keys)
+        client.close()
+    except redis.ConnectionError:
+        pass  # No Redis: caching is disabled, so nothing can leak
+    yield
 
 
 # Test database setup - use in-memory database for better isolation
@@ -48,6 +75,8 @@ def db() -> Generator[Session, None, None]:
         String,
         Table,
         Text,
+        UniqueConstraint,
+        func,
     )
 
     tables_to_remove = ["route_history", "crime_incidents", "safety_cells"]
@@ -61,7 +90,7 @@ def db() -> Generator[Session, None, None]:
         Base.metadata,
         Column("id", String(36), primary_key=True),  # UUID as string for SQLite
         Column("user_id", String(36), ForeignKey("users.id", ondelete="CASCADE"), nullable=False),
-        Column("created_at", DateTime, nullable=False),
+        Column("created_at", DateTime, nullable=False, server_default=func.now()),
         Column("origin_lat", Float, nullable=False),
         Column("origin_lng", Float, nullable=False),
         Column("destination_lat", Float, nullable=False),
@@ -74,7 +103,7 @@ def db() -> Generator[Session, None, None]:
         Column("route_geom", String),  # Store as string in SQLite instead of Geometry
         Column("deleted_at", DateTime),
         Index("ix_route_history_user_id", "user_id"),
-        Index("ix_route_history_user_created", "user_id", "created_at"),
+        Index("ix_route_history_user_created_active", "user_id", "created_at"),
     )
 
     # Create CrimeIncidents table without Geometry
@@ -94,9 +123,11 @@ def db() -> Generator[Session, None, None]:
         Column("force_id", String, nullable=False, index=True),
         Column("location_desc", Text),
         Column("geom", String),  # Store as WKT string in SQLite instead of Geometry
-        Column("created_at", DateTime, nullable=False),
-        Column("ingested_at", DateTime, nullable=False),
+        Column("h3_cell", BigInteger, nullable=False),
+        Column("created_at", DateTime, nullable=False, server_default=func.now()),
+        Column("ingested_at", DateTime, nullable=False, server_default=func.now()),
         Index("ix_crime_incidents_month_category", "month", "category_id"),
+        Index("ix_crime_incidents_month_cell", "month", "h3_cell"),
     )
 
     # Create SafetyCells table without Geometry
@@ -104,13 +135,14 @@ def db() -> Generator[Session, None, None]:
         "safety_cells",
         Base.metadata,
         Column("id", BigInteger, primary_key=True),
-        Column("cell_id", String, unique=True, nullable=False, index=True),
+        Column("cell_id", BigInteger, nullable=False, index=True),
         Column("geom", String),  # Store as WKT string in SQLite instead of Geometry
         Column("month", Date, nullable=False, index=True),
         Column("crime_count_total", Integer, nullable=False),
         Column("crime_count_weighted", Float, nullable=False),
         Column("stats", JSON),
-        Column("updated_at", DateTime, nullable=False),
+        Column("updated_at", DateTime, nullable=False, server_default=func.now()),
+        UniqueConstraint("cell_id", "month"),
     )
 
     # Drop all tables and indexes first to ensure clean state
@@ -243,10 +275,13 @@ def client(db: Session) -> Generator[TestClient, None, None]:
     """Create a test client with database override."""
 
     def override_get_db():
+        # Mirror get_db's commit/rollback, but keep the shared session open
         try:
             yield db
-        finally:
-            pass
+            db.commit()
+        except Exception:
+            db.rollback()
+            raise
 
     app.dependency_overrides[get_db] = override_get_db
 
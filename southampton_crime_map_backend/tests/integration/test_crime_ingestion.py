@@ -94,3 +94,30 @@ def test_ingest_month(db: Session, mock_police_api_response, test_crime_categori
         incidents = repo.get_incidents_by_month(date(2024, 9, 1))
 
         assert len(incidents) > 0
+
+
+@pytest.mark.parametrize("failing_tiles, resets", [(0, True), (1, False)])
+async def test_reingest_replaces_stored_month_only_when_complete(
+    db: Session, mock_police_api_response, failing_tiles, resets
+):
+    """Test a retry that fetches only some tiles keeps the month already stored."""
+    from unittest.mock import Mock
+
+    ingester = CrimeIngester(db)
+    ingester.repo = Mock()
+    ingester.repo.get_latest_ingestion_run.return_value = None
+    ingester.repo.has_incidents.return_value = True
+    tiles = len(ingester._get_southampton_tiles())
+    responses = [mock_police_api_response] * (tiles - failing_tiles)
+    responses += [RuntimeError("timeout")] * failing_tiles
+
+    with patch.object(
+        ingester.api_client, "get_crimes_with_split", new_callable=AsyncMock
+    ) as mock_api:
+        mock_api.side_effect = responses
+        records, status = await ingester.ingest_month("southampton", date(2024, 9, 1))
+
+    assert status == ("success" if resets else "partial")
+    assert ingester.repo.reset_incident_partition.called is resets
+    assert ingester.repo.create_incident.called is resets
+    assert records == (tiles * len(mock_police_api_response) if resets else 0)
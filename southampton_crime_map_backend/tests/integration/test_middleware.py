@@ -0,0 +1,30 @@
+"""Integration tests for request logging and metrics middleware."""
+
+
+def test_request_id_is_echoed(client):
+    """Test a caller-supplied correlation ID is returned with timing headers."""
+    response = client.get("/health", headers={"X-Request-ID": "req-123"})
+
+    assert response.status_code == 200
+    assert response.headers["X-Request-ID"] == "req-123"
+    assert response.headers["X-Response-Time"].endswith("ms")
+
+
+def test_request_id_is_generated(client):
+    """Test a correlation ID is generated when the caller sends none."""
+    response = client.get("/health")
+
+    assert response.headers["X-Request-ID"]
+
+
+def test_metrics_count_requests(client):
+    """Test the metrics endpoint reports requests seen by the middleware."""
+    before = client.get("/metrics").json()
+
+    client.get("/health")
+    client.get("/does-not-exist")
+    metrics = client.get("/metrics").json()
+
+    assert metrics["requests_total"] >= before["requests_total"] + 3
+    assert metrics["requests_by_endpoint"]["GET /health"]["count"] >= 1
+    assert metrics["requests_by_status"]["404"] >= 1
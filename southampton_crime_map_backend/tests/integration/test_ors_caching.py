@@ -133,5 +133,88 @@ async def test_cache_key_generation():
     # Key should start with 'ors:'
     assert key1.startswith("ors:")
 
-    # Key should be an MD5 hash (32 chars) + prefix
+    # Key should be a 128-bit BLAKE2b hash (32 hex chars) + prefix
     assert len(key1) == 36  # "ors:" (4) + 32 char hash
+
+
+@pytest.mark.asyncio
+async def test_ors_requests_share_http_client():
+    """Test that ORS calls reuse one pooled HTTP client instead of opening one each."""
+    from app.core.http_pool import close_http_client, get_http_client
+
+    client = get_http_client()
+    assert get_http_client() is client
+
+    await close_http_client()
+    assert client.is_closed
+    assert get_http_client() is not client
+    await close_http_client()
+
+
+@pytest.mark.asyncio
+async def test_concurrent_identical_requests_share_one_ors_call():
+    """Test that concurrent requests for the same directions make one ORS call."""
+    import asyncio
+    from unittest.mock import Mock
+
+    service = RoutingService()
+    coordinates = [[-1.4044, 50.9097], [-1.4500, 50.9300]]
+    mock_response = {"type": "FeatureCollection", "features": []}
+
+    redis_client = await service._get_redis_client()
+    if redis_client:
+        await redis_client.delete(service._generate_cache_key("foot-walking", coordinates, 3))
+
+    async def slow_post(*args, **kwargs):
+        await asyncio.sleep(0.05)
+        resp = Mock()
+        resp.status_code = 200
+        resp.json = Mock(return_value=mock_response)
+        return resp
+
+    with patch("httpx.AsyncClient.post", side_effect=slow_post) as mock_post:
+        results = await asyncio.gather(
+            *(service.get_directions(coordinates, "foot-walking") for _ in range(3))
+        )
+
+    assert results == [mock_response] * 3
+    assert mock_post.call_count == 1
+
+    if redis_client:
+        await redis_client.delete(service._generate_cache_key("foot-walking", coordinates, 3))
+
+
+@pytest.mark.asyncio
+async def test_large_ors_response_cached_compressed():
+    """Test that large ORS responses are stored zstd-compressed and read back intact."""
+    from unittest.mock import Mock
+
+    service = RoutingService()
+    redis_client = await service._get_redis_client()
+    if not redis_client:
+        pytest.skip("Requires Redis")
+
+    coordinates = [[-1.4044, 50.9097], [-1.4600, 50.9400]]
+    cache_key = service._generate_cache_key("foot-walking", coordinates, 3)
+    await redis_client.delete(cache_key)
+
+    line = [[-1.4044 + i * 1e-5, 50.9097 + i * 1e-5] for i in range(500)]
+    mock_response = {
+        "type": "FeatureCollection",
+        "features": [{"type": "Feature", "geometry": {"type": "LineString", "coordinates": line}}],
+    }
+
+    with patch("httpx.AsyncClient.post", new_callable=AsyncMock) as mock_post:
+        mock_resp = AsyncMock()
+        mock_resp.status_code = 200
+        mock_resp.json = Mock(return_value=mock_response)
+        mock_post.return_value = mock_resp
+
+        await service.get_directions(coordinates, "foot-walking")
+        cached = await service.get_directions(coordinates, "foot-walking")
+
+    raw = await redis_client.get(cache_key)
+    assert raw[:4] == b"\x28\xb5\x2f\xfd"  # zstd frame magic
+    assert cached == mock_response
+
+    await redis_client.delete(cache_key)
@@ -2,6 +2,7 @@
 
 from datetime import date
 
+import h3
 import pytest
 from dateutil.relativedelta import relativedelta
 from sqlalchemy.orm import Session
@@ -9,6 +10,15 @@ from sqlalchemy.orm import Session
 from app.utils.scoring import calculate_months_ago, get_recency_weight
 
 
+def _cell(months_back: int) -> str:
+    """Distinct resolution-10 H3 cell for each fixture month."""
+    return h3.latlng_to_cell(50.9 + 0.002 * months_back, -1.395, 10)
+
+
+RECENT_CELL = h3.latlng_to_cell(50.905, -1.395, 10)
+OLD_CELL = h3.latlng_to_cell(50.905, -1.385, 10)
+
+
 def test_recency_weight_structure():
     """Test that recency weights follow expected decay pattern."""
     # Very recent (0-3 months): full weight
@@ -115,7 +125,7 @@ def sample_cells_multiple_months(db: Session):
             ),
             {
                 "id": months_back + 1,
-                "cell_id": f"test_cell_month_{months_back}",
+                "cell_id": h3.str_to_int(_cell(months_back)),
                 "geom": "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))",
                 "month": month,
                 "crime_count_total": 100,
@@ -150,37 +160,37 @@ def test_safety_snapshot_applies_recency_weights(client, sample_cells_multiple_m
     assert len(cells) == 6
 
     # Month 0 (current): 100 crimes * 2.0 weight * 1.0 recency = 200
-    month_0_cell = cells.get("test_cell_month_0")
+    month_0_cell = cells.get(_cell(0))
     assert month_0_cell is not None
     expected_weight_0 = 200.0 * 1.0
     assert abs(month_0_cell["crime_count_weighted"] - expected_weight_0) < 0.1
 
     # Month 1: 100 crimes * 2.0 weight * 1.0 recency = 200
-    month_1_cell = cells.get("test_cell_month_1")
+    month_1_cell = cells.get(_cell(1))
     assert month_1_cell is not None
     expected_weight_1 = 200.0 * 1.0
     assert abs(month_1_cell["crime_count_weighted"] - expected_weight_1) < 0.1
 
     # Month 3: 100 crimes * 2.0 weight * 1.0 recency = 200
-    month_3_cell = cells.get("test_cell_month_3")
+    month_3_cell = cells.get(_cell(3))
     assert month_3_cell is not None
     expected_weight_3 = 200.0 * 1.0
     assert abs(month_3_cell["crime_count_weighted"] - expected_weight_3) < 0.1
 
     # Month 5: 100 crimes * 2.0 weight * 0.75 recency = 150
-    month_5_cell = cells.get("test_cell_month_5")
+    month_5_cell = cells.get(_cell(5))
     assert month_5_cell is not None
     expected_weight_5 = 200.0 * 0.75
     assert abs(month_5_cell["crime_count_weighted"] - expected_weight_5) < 0.1
 
     # Month 9: 100 crimes * 2.0 weight * 0.5 recency = 100
-    month_9_cell = cells.get("test_cell_month_9")
+    month_9_cell = cells.get(_cell(9))
     assert month_9_cell is not None
     expected_weight_9 = 200.0 * 0.5
     assert abs(month_9_cell["crime_count_weighted"] - expected_weight_9) < 0.1
 
     # Month 15: 100 crimes * 2.0 weight * 0.25 recency = 50
-    month_15_cell = cells.get("test_cell_month_15")
+    month_15_cell = cells.get(_cell(15))
     assert month_15_cell is not None
     expected_weight_15 = 200.0 * 0.25
     assert abs(month_15_cell["crime_count_weighted"] - expected_weight_15) < 0.1
@@ -202,8 +212,8 @@ def test_recent_crimes_have_higher_impact(client, sample_cells_multiple_months):
     cells = {cell["id"]: cell for cell in data["cells"]}
 
     # Recent crime (month 0) should have higher weighted count than old crime (month 15)
-    recent_cell = cells["test_cell_month_0"]
-    old_cell = cells["test_cell_month_15"]
+    recent_cell = cells[_cell(0)]
+    old_cell = cells[_cell(15)]
 
     # Both have same raw crime count
     assert recent_cell["crime_count"] == old_cell["crime_count"] == 100
@@ -260,7 +270,7 @@ def sample_cells_combined_weighting(db: Session):
         ),
         {
             "id": 100,
-            "cell_id": "test_cell_recent",
+            "cell_id": h3.str_to_int(RECENT_CELL),
             "geom": "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))",
             "month": current_month,
             "crime_count_total": 50,
@@ -282,7 +292,7 @@ def sample_cells_combined_weighting(db: Session):
         ),
         {
             "id": 101,
-            "cell_id": "test_cell_old",
+            "cell_id": h3.str_to_int(OLD_CELL),
             "geom": "POLYGON((-1.39 50.9, -1.38 50.9, -1.38 50.91, -1.39 50.91, -1.39 50.9))",
             "month": old_month,
             "crime_count_total": 50,
@@ -312,8 +322,8 @@ def test_combined_time_and_recency_weighting(client, sample_cells_combined_weigh
 
     cells = {cell["id"]: cell for cell in data["cells"]}
 
-    recent_cell = cells["test_cell_recent"]
-    old_cell = cells["test_cell_old"]
+    recent_cell = cells[RECENT_CELL]
+    old_cell = cells[OLD_CELL]
 
     # Recent cell: 50 crimes * 1.8 (night) * 1.0 (recency) = 90
     expected_recent = 50 * 1.8 * 1.0
@@ -366,8 +376,8 @@ def test_recency_weighting_with_short_lookback(client, sample_cells_multiple_mon
     assert len(data["cells"]) == 3
 
     cell_ids = {cell["id"] for cell in data["cells"]}
-    assert "test_cell_month_0" in cell_ids
-    assert "test_cell_month_1" in cell_ids
-    assert "test_cell_month_3" in cell_ids
-    assert "test_cell_month_5" not in cell_ids
-    assert "test_cell_month_9" not in cell_ids
+    assert _cell(0) in cell_ids
+    assert _cell(1) in cell_ids
+    assert _cell(3) in cell_ids
+    assert _cell(5) not in cell_ids
+    assert _cell(9) not in cell_ids
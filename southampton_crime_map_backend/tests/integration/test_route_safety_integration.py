@@ -6,6 +6,7 @@ Run with: pytest tests/integration/test_route_safety_integration.py --postgresql
 
 from datetime import date
 
+import h3
 import pytest
 from sqlalchemy.orm import Session
 
@@ -46,7 +47,7 @@ class TestRouteSafetyIntegration:
                 (50.87, -1.40),
             ]
         ):
-            cell_id = f"test_route_cell_{lat}_{lng}_{month.strftime('%Y%m')}"
+            cell_id = h3.str_to_int(h3.latlng_to_cell(lat, lng, 10))
             geom_wkt = f"POLYGON(({lng} {lat}, {lng+0.01} {lat}, {lng+0.01} {lat+0.01}, {lng} {lat+0.01}, {lng} {lat}))"
 
             cell = crime_repo.create_or_update_cell(
@@ -322,7 +323,7 @@ class TestRouteSafetyIntegration:
 
         # Old cell
         old_cell = crime_repo.create_or_update_cell(
-            cell_id=f"old_cell_{old_month.strftime('%Y%m')}",
+            cell_id=h3.str_to_int(h3.latlng_to_cell(50.855, -1.415, 10)),
             geom_wkt="POLYGON((-1.42 50.85,-1.41 50.85,-1.41 50.86,-1.42 50.86,-1.42 50.85))",
             month=old_month,
             crime_count_total=10,
@@ -332,7 +333,7 @@ class TestRouteSafetyIntegration:
 
         # Recent cell (same location, same crime count)
         recent_cell = crime_repo.create_or_update_cell(
-            cell_id=f"recent_cell_{recent_month.strftime('%Y%m')}",
+            cell_id=h3.str_to_int(h3.latlng_to_cell(50.855, -1.415, 10)),
             geom_wkt="POLYGON((-1.42 50.85,-1.41 50.85,-1.41 50.86,-1.42 50.86,-1.42 50.85))",
             month=recent_month,
             crime_count_total=10,
@@ -3,11 +3,18 @@
 import json
 from datetime import date, datetime
 
+import h3
 import pytest
 from sqlalchemy import text
 from sqlalchemy.orm import Session
 
-from app.services.cache_service import CacheService
+from app.services.cache_service import (
+    CELL_RECORD,
+    CacheService,
+    decode_snapshot,
+    encode_snapshot,
+    pack_cells,
+)
 
 
 @pytest.fixture
@@ -53,7 +60,7 @@ def sample_safety_data(db: Session):
         ),
         {
             "id": 1,
-            "cell_id": "test_cache_cell",
+            "cell_id": h3.str_to_int(h3.latlng_to_cell(50.905, -1.395, 10)),
             "geom": "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))",
             "month": month,
             "crime_count_total": 50,
@@ -71,10 +78,10 @@ async def test_cache_key_generation():
     """Test that cache keys are generated correctly."""
     service = CacheService()
 
-    key1 = service._generate_cache_key("-1.5,50.85,-1.3,51.0", 12, None)
-    key2 = service._generate_cache_key("-1.5,50.85,-1.3,51.0", 12, None)
-    key3 = service._generate_cache_key("-1.5,50.85,-1.3,51.0", 6, None)
-    key4 = service._generate_cache_key("-1.5,50.85,-1.3,51.0", 12, "night")
+    key1 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
+    key2 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
+    key3 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 6, None)
+    key4 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, "night")
 
     # Same parameters should generate same key
     assert key1 == key2
@@ -98,23 +105,15 @@ async def test_cache_set_and_get():
         "meta": {"lookback_months": 12},
     }
 
+    key = service.snapshot_key(bbox="-1.5,50.85,-1.3,51.0", lookback_months=12, time_of_day=None)
+
     # Set cache
-    success = await service.set_snapshot(
-        bbox="-1.5,50.85,-1.3,51.0",
-        lookback_months=12,
-        time_of_day=None,
-        data=test_data,
-        ttl=60,  # 60 seconds for test
-    )
+    success = await service.set_snapshot(key, data=test_data, ttl=60)  # 60 seconds for test
 
     assert success is True
 
     # Get from cache
-    cached = await service.get_snapshot(
-        bbox="-1.5,50.85,-1.3,51.0",
-        lookback_months=12,
-        time_of_day=None,
-    )
+    cached = await service.get_snapshot(key)
 
     assert cached is not None
     assert cached == test_data
@@ -127,11 +126,7 @@ async def test_cache_miss():
     service = CacheService()
 
     # Try to get non-existent cache
-    cached = await service.get_snapshot(
-        bbox="-999,-999,-998,-998",
-        lookback_months=12,
-        time_of_day=None,
-    )
+    cached = await service.get_snapshot(service.snapshot_key("-999,-999,-998,-998", 12, None))
 
     assert cached is None
 
@@ -144,13 +139,16 @@ async def test_cache_different_parameters():
     data1 = {"cells": [{"id": "data1"}]}
     data2 = {"cells": [{"id": "data2"}]}
 
+    key1 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
+    key2 = service.snapshot_key("-1.5,50.85,-1.3,51.0", 6, None)
+
     # Cache with different lookback_months
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, None, data1, ttl=60)
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 6, None, data2, ttl=60)
+    await service.set_snapshot(key1, data1, ttl=60)
+    await service.set_snapshot(key2, data2, ttl=60)
 
     # Retrieve both
-    cached1 = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
-    cached2 = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 6, None)
+    cached1 = await service.get_snapshot(key1)
+    cached2 = await service.get_snapshot(key2)
 
     # Should get different data
     assert cached1["cells"][0]["id"] == "data1"
@@ -165,13 +163,16 @@ async def test_cache_with_time_of_day():
     data_night = {"cells": [{"id": "night_data"}]}
     data_day = {"cells": [{"id": "day_data"}]}
 
+    key_night = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, "night")
+    key_day = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, "day")
+
     # Cache with different time_of_day
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, "night", data_night, ttl=60)
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, "day", data_day, ttl=60)
+    await service.set_snapshot(key_night, data_night, ttl=60)
+    await service.set_snapshot(key_day, data_day, ttl=60)
 
     # Retrieve both
-    cached_night = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, "night")
-    cached_day = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, "day")
+    cached_night = await service.get_snapshot(key_night)
+    cached_day = await service.get_snapshot(key_day)
 
     # Should get different data
     assert cached_night["cells"][0]["id"] == "night_data"
@@ -184,20 +185,21 @@ async def test_cache_invalidation():
     service = CacheService()
 
     test_data = {"cells": [{"id": "cell1"}]}
+    key = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
 
     # Set cache
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, None, test_data, ttl=60)
+    await service.set_snapshot(key, test_data, ttl=60)
 
     # Verify it's cached
-    cached = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
+    cached = await service.get_snapshot(key)
     assert cached is not None
 
     # Invalidate
-    success = await service.invalidate_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
+    success = await service.invalidate_snapshot(key)
     assert success is True
 
     # Should no longer be cached
-    cached_after = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
+    cached_after = await service.get_snapshot(key)
     assert cached_after is None
 
 
@@ -209,9 +211,7 @@ async def test_invalidate_all_snapshots():
     # Create multiple cache entries
     for i in range(3):
         await service.set_snapshot(
-            f"-1.{i},50.85,-1.{i+1},51.0",
-            12,
-            None,
+            service.snapshot_key(f"-1.{i},50.85,-1.{i+1},51.0", 12, None),
             {"cells": [{"id": f"cell{i}"}]},
             ttl=60,
         )
@@ -224,10 +224,31 @@ async def test_invalidate_all_snapshots():
 
     # Verify all are gone
     for i in range(3):
-        cached = await service.get_snapshot(f"-1.{i},50.85,-1.{i+1},51.0", 12, None)
+        key = service.snapshot_key(f"-1.{i},50.85,-1.{i+1},51.0", 12, None)
+        cached = await service.get_snapshot(key)
         assert cached is None
 
 
+@pytest.mark.asyncio
+async def test_snapshot_fill_claimed_once():
+    """Test only one caller may build a missing snapshot until it is stored."""
+    service = CacheService()
+    key = service.snapshot_key("-1.45,50.85,-1.3,51.0", 12, None)
+    await service.release_snapshot_fill(key)
+
+    assert await service.claim_snapshot_fill(key) is True
+    assert await service.claim_snapshot_fill(key) is False
+
+    await service.set_snapshot(key, {"cells": []}, ttl=60)
+    assert await service.wait_for_snapshot(key, timeout=1) == {"cells": []}
+    assert await service.claim_snapshot_fill(key) is True
+
+    # A released claim stops waiters straight away
+    await service.release_snapshot_fill(key)
+    await service.invalidate_snapshot(key)
+    assert await service.wait_for_snapshot(key, timeout=5) is None
+
+
 @pytest.mark.asyncio
 async def test_safety_snapshot_caching_integration(client, sample_safety_data):
     """Test that safety snapshot endpoint uses caching."""
@@ -271,13 +292,14 @@ async def test_cache_graceful_degradation():
 
     service = CacheService()
 
-    # Mock Redis to raise an exception
-    with patch.object(service, "_get_redis_client", return_value=None):
+    # Mock Redis as unreachable
+    with patch("app.services.cache_service.get_redis", return_value=None):
         # These should not raise errors
-        cached = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
+        key = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
+        cached = await service.get_snapshot(key)
         assert cached is None
 
-        success = await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, None, {}, ttl=60)
+        success = await service.set_snapshot(key, {}, ttl=60)
         assert success is False
 
 
@@ -291,8 +313,93 @@ async def test_cache_ttl():
 
     # Custom TTL should work
     test_data = {"cells": []}
-    await service.set_snapshot("-1.5,50.85,-1.3,51.0", 12, None, test_data, ttl=30)
+    key = service.snapshot_key("-1.5,50.85,-1.3,51.0", 12, None)
+    await service.set_snapshot(key, test_data, ttl=30)
 
     # Should be cached
-    cached = await service.get_snapshot("-1.5,50.85,-1.3,51.0", 12, None)
+    cached = await service.get_snapshot(key)
     assert cached is not None
+
+
+def test_pack_cells_round_trip():
+    """Test packed month cells decode back to the original records."""
+    rows = [(h3.str_to_int(h3.latlng_to_cell(50.905, -1.395, 10)), 50, 100.0), (1, 2, 3.5)]
+
+    blob = pack_cells(rows)
+
+    assert len(blob) == CELL_RECORD.size * len(rows)
+    assert list(CELL_RECORD.iter_unpack(blob)) == rows
+
+
+def test_snapshot_encoding_round_trip():
+    """Test large snapshots are compressed and small ones stored as plain JSON."""
+    small = {"cells": [], "summary": {"total_cells": 0}}
+    large = {"cells": [{"cell_id": str(i), "risk_score": 0.5} for i in range(200)]}
+
+    small_raw = encode_snapshot(small)
+    large_raw = encode_snapshot(large)
+
+    assert small_raw == json.dumps(small, separators=(",", ":")).encode()
+    assert len(large_raw) < len(json.dumps(large))
+    assert decode_snapshot(small_raw) == small
+    assert decode_snapshot(large_raw) == large
+
+
+def test_month_cells_endpoint_returns_packed_blob(client, sample_safety_data):
+    """Test the month cells endpoint serves packed records as octet-stream."""
+    month = date.today().replace(day=1)
+
+    response = client.get(f"/api/v1/safety/cells/{month.strftime('%Y-%m')}")
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/octet-stream"
+    assert list(CELL_RECORD.iter_unpack(response.content)) == [
+        (h3.str_to_int(h3.latlng_to_cell(50.905, -1.395, 10)), 50, 100.0)
+    ]
+
+
+def test_month_cells_endpoint_invalid_month(client):
+    """Test the month cells endpoint rejects malformed months."""
+    response = client.get("/api/v1/safety/cells/2024-13")
+
+    assert response.status_code == 400
+
+
+def test_snapshot_stream_returns_ndjson(client, sample_safety_data):
+    """Test the streamed snapshot yields one line per cell plus a summary line."""
+    response = client.get("/api/v1/safety/snapshot/stream", params={"bbox": "-1.5,50.85,-1.3,51.0"})
+
+    assert response.status_code == 200
+    assert response.headers["content-type"] == "application/x-ndjson"
+    lines = [json.loads(line) for line in response.text.splitlines()]
+    assert len(lines) == 2
+    assert lines[0]["id"] == h3.latlng_to_cell(50.905, -1.395, 10)
+    assert lines[-1]["summary"]["total_cells"] == 1
+    assert "meta" in lines[-1]
+
+
+@pytest.mark.asyncio
+async def test_failed_build_keeps_another_requests_fill_marker():
+    """Test a request that never won the fill claim does not release the marker."""
+    from unittest.mock import AsyncMock, Mock, patch
+
+    from fastapi import HTTPException
+
+    from app.api.v1.safety import _load_snapshot
+
+    with (
+        patch("app.api.v1.safety.CacheService") as mock_cache_cls,
+        patch("app.api.v1.safety.CrimeRepository", side_effect=RuntimeError("db down")),
+    ):
+        cache = mock_cache_cls.return_value
+        cache.snapshot_key.return_value = "snapshot-key"
+        cache.get_snapshot = AsyncMock(return_value=None)
+        cache.claim_snapshot_fill = AsyncMock(return_value=False)
+        cache.wait_for_snapshot = AsyncMock(return_value=None)
+        cache.release_snapshot_fill = AsyncMock()
+
+        with pytest.raises(HTTPException):
+            await _load_snapshot("-1.45,50.85,-1.3,51.0", 12, None, Mock())
+
+    assert cache.claim_snapshot_fill.await_count == 2
+    cache.release_snapshot_fill.assert_not_awaited()
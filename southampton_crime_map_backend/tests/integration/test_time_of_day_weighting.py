@@ -1,11 +1,17 @@
 """Integration tests for time-of-day weighting in safety scoring."""
 
+import h3
 import pytest
 from sqlalchemy.orm import Session
 
 from app.config import CRIME_TIME_WEIGHTS
 from app.repositories.crime_repository import CrimeRepository
 
+# Resolution-10 H3 cells at the centre of each fixture polygon
+VIOLENT_CELL = h3.latlng_to_cell(50.905, -1.395, 10)
+SHOPLIFTING_CELL = h3.latlng_to_cell(50.905, -1.385, 10)
+MIXED_CELL = h3.latlng_to_cell(50.905, -1.375, 10)
+
 
 @pytest.fixture
 def crime_repo(db: Session):
@@ -93,7 +99,7 @@ def sample_safety_cells(db: Session):
 
     cells = [
         {
-            "cell_id": "test_cell_violent",
+            "cell_id": h3.str_to_int(VIOLENT_CELL),
             "geom": "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))",
             "month": month,
             "crime_count_total": 100,
@@ -102,7 +108,7 @@ def sample_safety_cells(db: Session):
             "updated_at": now,
         },
         {
-            "cell_id": "test_cell_shoplifting",
+            "cell_id": h3.str_to_int(SHOPLIFTING_CELL),
             "geom": "POLYGON((-1.39 50.9, -1.38 50.9, -1.38 50.91, -1.39 50.91, -1.39 50.9))",
             "month": month,
             "crime_count_total": 100,
@@ -111,7 +117,7 @@ def sample_safety_cells(db: Session):
             "updated_at": now,
         },
         {
-            "cell_id": "test_cell_mixed",
+            "cell_id": h3.str_to_int(MIXED_CELL),
             "geom": "POLYGON((-1.38 50.9, -1.37 50.9, -1.37 50.91, -1.38 50.91, -1.38 50.9))",
             "month": month,
             "crime_count_total": 60,
@@ -144,7 +150,7 @@ def sample_safety_cells(db: Session):
         )
 
     db.commit()
-    return ["test_cell_violent", "test_cell_shoplifting", "test_cell_mixed"]
+    return [VIOLENT_CELL, SHOPLIFTING_CELL, MIXED_CELL]
 
 
 def test_time_of_day_weights_structure():
@@ -225,8 +231,8 @@ def test_safety_snapshot_without_time_filter(client, sample_safety_cells):
     assert len(data["cells"]) == 3
 
     # Find our test cells
-    violent_cell = next((c for c in data["cells"] if c["id"] == "test_cell_violent"), None)
-    shoplifting_cell = next((c for c in data["cells"] if c["id"] == "test_cell_shoplifting"), None)
+    violent_cell = next((c for c in data["cells"] if c["id"] == VIOLENT_CELL), None)
+    shoplifting_cell = next((c for c in data["cells"] if c["id"] == SHOPLIFTING_CELL), None)
 
     assert violent_cell is not None
     assert shoplifting_cell is not None
@@ -256,8 +262,8 @@ def test_safety_snapshot_night_filter(client, sample_safety_cells):
     assert data["meta"]["time_filter"] == "night"
 
     # Find our test cells
-    violent_cell = next((c for c in data["cells"] if c["id"] == "test_cell_violent"), None)
-    shoplifting_cell = next((c for c in data["cells"] if c["id"] == "test_cell_shoplifting"), None)
+    violent_cell = next((c for c in data["cells"] if c["id"] == VIOLENT_CELL), None)
+    shoplifting_cell = next((c for c in data["cells"] if c["id"] == SHOPLIFTING_CELL), None)
 
     assert violent_cell is not None
     assert shoplifting_cell is not None
@@ -303,8 +309,8 @@ def test_safety_snapshot_day_filter(client, sample_safety_cells):
     assert data["meta"]["time_filter"] == "day"
 
     # Find our test cells
-    violent_cell = next((c for c in data["cells"] if c["id"] == "test_cell_violent"), None)
-    shoplifting_cell = next((c for c in data["cells"] if c["id"] == "test_cell_shoplifting"), None)
+    violent_cell = next((c for c in data["cells"] if c["id"] == VIOLENT_CELL), None)
+    shoplifting_cell = next((c for c in data["cells"] if c["id"] == SHOPLIFTING_CELL), None)
 
     assert violent_cell is not None
     assert shoplifting_cell is not None
@@ -393,3 +399,13 @@ def test_crime_categories_have_consistent_weights():
         # Total weight should be between 3 and 6 (average of 1.0 per time period)
         # This ensures no category is globally over/under-weighted
         assert 3.0 <= total_weight <= 7.0, f"{category} has unusual total weight: {total_weight}"
+
+
+def test_safety_snapshot_returns_hex_cell_ids(client, sample_safety_cells):
+    """Test stored 64-bit H3 cell IDs are returned as hex strings."""
+    response = client.get("/api/v1/safety/snapshot", params={"bbox": "-1.5,50.85,-1.3,51.0"})
+
+    assert response.status_code == 200
+    cell_ids = {cell["id"] for cell in response.json()["cells"]}
+    assert cell_ids == {VIOLENT_CELL, SHOPLIFTING_CELL, MIXED_CELL}
+    assert all(h3.is_valid_cell(cell_id) for cell_id in cell_ids)
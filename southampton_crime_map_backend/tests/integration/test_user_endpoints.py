@@ -1,8 +1,13 @@
 """Integration tests for user endpoints."""
 
+import uuid
+from datetime import datetime, timezone
+
 from fastapi.testclient import TestClient
+from sqlalchemy import update
 from sqlalchemy.orm import Session
 
+from app.models.route import RouteHistory
 from app.models.user import User
 
 
@@ -112,6 +117,75 @@ def test_get_history_pagination(
     assert len(data["items"]) == 10
     assert data["total"] == 25
 
+    # Past the last page the total is still reported
+    response = client.get("/api/v1/users/me/history?limit=10&offset=30", headers=auth_headers)
+    assert response.status_code == 200
+    data = response.json()
+    assert data["items"] == []
+    assert data["total"] == 25
+
+
+def test_get_history_keyset_pagination(
+    client: TestClient, auth_headers: dict, test_user: User, db: Session
+):
+    """Test paging through history with the next_cursor keyset."""
+    from app.repositories.route_repository import RouteRepository
+
+    repo = RouteRepository(db)
+
+    for i in range(25):
+        repo.create_history(
+            user_id=test_user.id,
+            origin_lat=50.9097,
+            origin_lng=-1.4044,
+            destination_lat=50.9130,
+            destination_lng=-1.4300,
+            mode="foot-walking",
+            safety_score_best=85.0,
+            distance_m_best=2300,
+            duration_s_best=1800,
+            request_meta={},
+        )
+    # Rows created in the same instant are told apart by id
+    db.execute(update(RouteHistory).values(created_at=datetime(2025, 1, 1, tzinfo=timezone.utc)))
+    db.commit()
+
+    seen = []
+    params = {"limit": 10}
+    while True:
+        response = client.get("/api/v1/users/me/history", params=params, headers=auth_headers)
+        assert response.status_code == 200
+        data = response.json()
+        seen.extend(item["id"] for item in data["items"])
+        if data["next_cursor"] is None:
+            break
+        params["before"] = data["next_cursor"]
+
+    assert len(seen) == 25
+    assert len(set(seen)) == 25
+
+
+def test_get_history_rejects_bad_cursor(client: TestClient, auth_headers: dict):
+    """Test that a cursor cannot be combined with offset or malformed."""
+    cursor = f"2025-01-01T00:00:00+00:00_{uuid.uuid4()}"
+
+    response = client.get(
+        "/api/v1/users/me/history",
+        params={"before": cursor, "offset": 0},
+        headers=auth_headers,
+    )
+    assert response.status_code == 400
+
+    response = client.get(
+        "/api/v1/users/me/history", params={"before": "not-a-cursor"}, headers=auth_headers
+    )
+    assert response.status_code == 400
+
+    response = client.get(
+        "/api/v1/users/me/history", params={"before": cursor}, headers=auth_headers
+    )
+    assert response.status_code == 200
+
 
 def test_delete_single_history_item(
     client: TestClient, auth_headers: dict, test_user: User, db: Session
@@ -21,45 +21,65 @@ def auth_service(mock_db):
     return AuthService(mock_db)
 
 
-def test_register_validates_password(auth_service):
+async def test_register_validates_password(auth_service):
     """Test that registration validates password strength."""
     # Mock user_repo to return None (no existing user)
     auth_service.user_repo.get_by_email = Mock(return_value=None)
 
     # Test weak password
     with pytest.raises(ValidationError, match="10 characters"):
-        auth_service.register("test@example.com", "weak")
+        await auth_service.register("test@example.com", "weak")
 
     with pytest.raises(ValidationError, match="uppercase"):
-        auth_service.register("test@example.com", "lowercase123")
+        await auth_service.register("test@example.com", "lowercase123")
 
     with pytest.raises(ValidationError, match="lowercase"):
-        auth_service.register("test@example.com", "UPPERCASE123")
+        await auth_service.register("test@example.com", "UPPERCASE123")
 
     with pytest.raises(ValidationError, match="digit"):
-        auth_service.register("test@example.com", "NoDigitsHere")
+        await auth_service.register("test@example.com", "NoDigitsHere")
 
 
-def test_register_checks_duplicate_email(auth_service):
+async def test_register_checks_duplicate_email(auth_service):
     """Test that registration checks for duplicate emails."""
     # Mock existing user
     existing_user = User(email="existing@example.com", hashed_password="hashed", is_active=True)
     auth_service.user_repo.get_by_email = Mock(return_value=existing_user)
 
     with pytest.raises(ConflictError, match="already registered"):
-        auth_service.register("existing@example.com", "ValidPass123")
+        await auth_service.register("existing@example.com", "ValidPass123")
 
 
-def test_login_with_invalid_credentials(auth_service):
+async def test_login_with_invalid_credentials(auth_service):
     """Test login with invalid credentials."""
     # Mock no user found
     auth_service.user_repo.get_by_email = Mock(return_value=None)
 
     with pytest.raises(AuthenticationError, match="Invalid email"):
-        auth_service.login("nonexistent@example.com", "password")
+        await auth_service.login("nonexistent@example.com", "password")
 
 
-def test_login_with_inactive_user(auth_service):
+async def test_login_rehashes_outdated_password_hash(auth_service):
+    """Test a successful login upgrades a hash made with older Argon2 parameters."""
+    from argon2 import PasswordHasher
+
+    from app.core.security import verify_password
+
+    legacy_hash = PasswordHasher(time_cost=1, memory_cost=512, parallelism=2).hash("Password123")
+    user = User(email="user@example.com", hashed_password=legacy_hash, is_active=True)
+    auth_service.user_repo.get_by_email = Mock(return_value=user)
+    auth_service.user_repo.update_password = Mock()
+    auth_service.user_repo.update_last_login = Mock()
+    auth_service.user_repo.create_refresh_session = Mock()
+
+    await auth_service.login("user@example.com", "Password123")
+
+    user_id, new_hash = auth_service.user_repo.update_password.call_args.args
+    assert new_hash != legacy_hash
+    assert verify_password("Password123", new_hash)
+
+
+async def test_login_with_inactive_user(auth_service):
     """Test login with inactive user."""
     from app.core.security import hash_password
 
@@ -69,4 +89,52 @@ def test_login_with_inactive_user(auth_service):
     auth_service.user_repo.get_by_email = Mock(return_value=inactive_user)
 
     with pytest.raises(AuthenticationError, match="inactive"):
-        auth_service.login("inactive@example.com", "Password123")
+        await auth_service.login("inactive@example.com", "Password123")
+
+
+def test_get_current_user_caches_lookup_per_token(auth_service):
+    """Test a repeat request with the same token skips the user lookup."""
+    import uuid
+
+    from app.core.security import create_access_token
+    from app.services.auth_service import invalidate_cached_user
+
+    user = User(id=uuid.uuid4(), email="user@example.com", hashed_password="x", is_active=True)
+    auth_service.user_repo.get_by_id = Mock(return_value=user)
+    token = create_access_token(subject=str(user.id))
+
+    first = auth_service.get_current_user(token)
+    second = auth_service.get_current_user(token)
+
+    assert first is user
+    assert second.id == user.id and second.email == user.email
+    assert auth_service.user_repo.get_by_id.call_count == 1
+
+    invalidate_cached_user(user.id)
+    auth_service.get_current_user(token)
+    assert auth_service.user_repo.get_by_id.call_count == 2
+
+
+def test_get_current_user_cache_is_thread_safe(auth_service):
+    """Test concurrent lookups and invalidations from threadpool workers don't race."""
+    import uuid
+    from concurrent.futures import ThreadPoolExecutor
+
+    from app.core.security import create_access_token
+    from app.services.auth_service import invalidate_cached_user
+
+    users = [
+        User(id=uuid.uuid4(), email=f"user{i}@example.com", hashed_password="x", is_active=True)
+        for i in range(8)
+    ]
+    by_id = {user.id: user for user in users}
+    auth_service.user_repo.get_by_id = Mock(side_effect=by_id.get)
+    tokens = [create_access_token(subject=str(user.id)) for user in users]
+
+    def worker(i):
+        for _ in range(1000):
+            assert auth_service.get_current_user(tokens[i]).id == users[i].id
+            invalidate_cached_user(users[(i + 1) % len(users)].id)
+
+    with ThreadPoolExecutor(max_workers=len(users)) as pool:
+        list(pool.map(worker, range(len(users))))
@@ -145,3 +145,57 @@ def test_database_task_cleanup():
 
     # Verify _db is reset to None
     assert task._db is None
+
+
+@patch("app.tasks.ingestion_tasks.CrimeIngester")
+@patch("app.tasks.ingestion_tasks.SessionLocal")
+def test_ingest_month_on_demand_runs_repeatedly(mock_session, mock_ingester_class):
+    """Test each run gets a fresh event loop, so back-to-back runs both succeed."""
+    mock_session.return_value = MagicMock()
+
+    async def mock_ingest_month(*args, **kwargs):
+        return 100, "success"
+
+    mock_ingester_class.return_value.ingest_month = mock_ingest_month
+
+    for _ in range(2):
+        summary = ingest_month_on_demand(2024, 9)
+
+        assert summary["records_ingested"] == 100
+        assert summary["status"] == "success"
+
+
+@patch("app.tasks.ingestion_tasks._invalidate_caches")
+@patch("app.tasks.ingestion_tasks.CrimeIngester")
+@patch("app.tasks.ingestion_tasks.SessionLocal")
+def test_ingest_latest_crime_data_tries_months_concurrently(
+    mock_session, mock_ingester_class, mock_invalidate
+):
+    """Test both candidate months are ingested on separate sessions and reported in order."""
+    import asyncio
+
+    started = []
+    in_flight = []
+
+    async def mock_ingest_month(area_name, month, force_id):
+        started.append(month)
+        await asyncio.sleep(0)
+        in_flight.append(len(started))
+        if month == max(started):
+            raise RuntimeError("API unavailable")
+        return 100, "success"
+
+    async def mock_invalidate_caches(month_cells=False):
+        return 0
+
+    mock_ingester_class.return_value.ingest_month = mock_ingest_month
+    mock_invalidate.side_effect = mock_invalidate_caches
+
+    summary = ingest_latest_crime_data()
+
+    # Both months had started before either finished
+    assert in_flight == [2, 2]
+    assert mock_session.call_count == 2
+    assert [r["status"] for r in summary["results"]] == ["failed", "success"]
+    assert summary["total_records"] == 100
+    mock_invalidate.assert_called_once()
@@ -4,7 +4,9 @@ import pytest
 from shapely.geometry import LineString
 
 from app.utils.geometry import (
+    buffer_wgs84,
     calculate_length_m,
+    expand_bounds_wgs84,
     geojson_to_shapely,
     reproject_to_4326,
     reproject_to_27700,
@@ -87,3 +89,41 @@ def test_simplify_geometry_already_simple():
 
     simplified = simplify_geometry(line, max_points=100)
     assert len(simplified.coords) == 3
+
+
+def test_buffer_wgs84_uses_metres():
+    """Test buffering a WGS84 line by metres, alone and as an array."""
+    import numpy as np
+
+    line_4326 = LineString([(-1.4044, 50.9097), (-1.4300, 50.9130)])
+
+    buffered = buffer_wgs84(line_4326, 50)
+    assert buffered.contains(line_4326)
+    # Buffer area in metres: a 100 m wide band plus two 50 m half-circle caps
+    expected = reproject_to_27700(line_4326).length * 100 + 3.1416 * 50**2
+    assert reproject_to_27700(buffered).area == pytest.approx(expected, rel=0.01)
+
+    both = buffer_wgs84(np.array([line_4326, line_4326], dtype=object), 50)
+    assert len(both) == 2
+    assert both[0].equals(buffered)
+
+
+def test_expand_bounds_wgs84_covers_buffer():
+    """Test the padded bounding boxes contain the real metre buffers' boxes."""
+    import numpy as np
+    import shapely
+
+    lines = np.array(
+        [
+            LineString([(-1.4044, 50.9097), (-1.4300, 50.9130)]),
+            LineString([(-1.3900, 50.9300), (-1.3899, 50.9301)]),
+        ],
+        dtype=object,
+    )
+
+    boxes = expand_bounds_wgs84(lines, 50)
+    real = shapely.bounds(buffer_wgs84(lines, 50))
+
+    assert boxes.shape == (2, 4)
+    assert np.all(boxes[:, :2] <= real[:, :2])
+    assert np.all(boxes[:, 2:] >= real[:, 2:])
@@ -0,0 +1,85 @@
+"""Unit tests for H3 safety grid building."""
+
+from datetime import date, datetime
+from unittest.mock import Mock
+
+import h3
+from dateutil.relativedelta import relativedelta
+from sqlalchemy import text
+
+from app.ingestion.grid_builder import GridBuilder
+
+CELL_A = h3.latlng_to_cell(50.9097, -1.4044, 10)
+CELL_B = h3.latlng_to_cell(50.9200, -1.3900, 10)
+
+
+def _insert_incident(db, incident_id, month, category_id, cell):
+    """Insert a crime incident row directly (ORM inserts need PostGIS for geom)."""
+    now = datetime.utcnow()
+    db.execute(
+        text(
+            """
+            INSERT INTO crime_incidents
+            (id, month, category_id, crime_type, force_id, location_desc, geom,
+             h3_cell, created_at, ingested_at)
+            VALUES (:id, :month, :category_id, 'Crime', 'hampshire', 'On High Street',
+                    'SRID=4326;POINT(-1.4044 50.9097)', :cell_id, :now, :now)
+            """
+        ),
+        {
+            "id": incident_id,
+            "month": month,
+            "category_id": category_id,
+            "cell_id": h3.str_to_int(cell),
+            "now": now,
+        },
+    )
+
+
+def test_build_cells_groups_incidents_by_stored_cell(db, test_crime_categories):
+    """Test incidents are aggregated per H3 cell with harm-weighted counts."""
+    month = date(2024, 9, 1)
+    _insert_incident(db, 1, month, "violent-crime", CELL_A)
+    _insert_incident(db, 2, month, "violent-crime", CELL_A)
+    _insert_incident(db, 3, month, "burglary", CELL_A)
+    _insert_incident(db, 4, month, "burglary", CELL_B)
+    _insert_incident(db, 5, date(2024, 8, 1), "burglary", CELL_B)
+    db.commit()
+
+    builder = GridBuilder(db)
+    # Safety cell inserts need PostGIS for geom; capture what would be written
+    builder.repo.create_or_update_cell = Mock()
+
+    cells_created = builder._build_cells_simple(month)
+
+    assert cells_created == 2
+    cells = {
+        call.kwargs["cell_id"]: call.kwargs
+        for call in builder.repo.create_or_update_cell.call_args_list
+    }
+    cell_a = cells[h3.str_to_int(CELL_A)]
+    assert cell_a["month"] == month
+    assert cell_a["crime_count_total"] == 3
+    assert cell_a["crime_count_weighted"] == 2 * 3.5 + 2.0
+    assert cell_a["stats"] == {"violent-crime": 2, "burglary": 1}
+    cell_b = cells[h3.str_to_int(CELL_B)]
+    assert cell_b["crime_count_total"] == 1
+    assert cell_b["stats"] == {"burglary": 1}
+
+
+def test_build_cells_empty_month(db, test_crime_categories):
+    """Test a month without incidents creates no cells."""
+    assert GridBuilder(db)._build_cells_simple(date(2024, 9, 1)) == 0
+
+
+def test_build_safety_cells_walks_calendar_months(db):
+    """Test the build covers the first of each month back to ``months`` ago."""
+    builder = GridBuilder(db)
+    builder._build_cells_simple = Mock(return_value=3)
+
+    cells_created = builder.build_safety_cells(months=12)
+
+    current_month = date.today().replace(day=1)
+    built = [call.args[0] for call in builder._build_cells_simple.call_args_list]
+    assert built == [current_month - relativedelta(months=i) for i in range(12, -1, -1)]
+    assert cells_created == 3 * 13
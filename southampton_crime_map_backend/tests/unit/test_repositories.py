@@ -1,9 +1,11 @@
 """Unit tests for repositories."""
 
-from datetime import date, datetime
+from datetime import date, datetime, timedelta
 
+import h3
 import pytest
 
+from app.models.user import USER_SETTINGS_DEFAULTS
 from app.repositories.crime_repository import CrimeRepository
 from app.repositories.user_repository import UserRepository
 
@@ -17,6 +19,54 @@ def test_user_repository_create(db):
     assert user.id is not None
     assert user.email == "test@example.com"
     assert user.is_active is True
+    assert user.settings == dict(USER_SETTINGS_DEFAULTS)
+
+
+def test_user_repository_create_returns_server_defaults(db):
+    """Test server defaults come back on the INSERT, with no follow-up SELECT."""
+    from sqlalchemy import event
+
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        user = UserRepository(db).create(email="new@example.com", hashed_password="hashed")
+        created_at = user.created_at
+        settings = user.settings
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert created_at is not None
+    assert settings == dict(USER_SETTINGS_DEFAULTS)
+    assert len(statements) == 1
+    assert "RETURNING" in statements[0]
+
+
+def test_user_repository_update_last_login_reuses_loaded_user(db):
+    """Test updating a user loaded earlier in the session needs no SELECT."""
+    from sqlalchemy import event
+
+    repo = UserRepository(db)
+    user = repo.create(email="login@example.com", hashed_password="hashed")
+    statements = []
+
+    def record(conn, cursor, statement, *args):
+        statements.append(statement)
+
+    engine = db.get_bind()
+    event.listen(engine, "before_cursor_execute", record)
+    try:
+        repo.update_last_login(user.id)
+    finally:
+        event.remove(engine, "before_cursor_execute", record)
+
+    assert user.last_login_at is not None
+    assert len(statements) == 1
+    assert statements[0].lstrip().startswith("UPDATE users")
 
 
 def test_user_repository_get_by_email(db):
@@ -33,6 +83,16 @@ def test_user_repository_get_by_email(db):
     assert found_user.id == created_user.id
 
 
+def test_user_repository_email_is_case_insensitive(db):
+    """Test emails are stored lowercased and looked up ignoring case."""
+    repo = UserRepository(db)
+
+    created_user = repo.create("MixedCase@Example.com", "hashed")
+
+    assert created_user.email == "mixedcase@example.com"
+    assert repo.get_by_email("MIXEDCASE@example.COM").id == created_user.id
+
+
 def test_user_repository_get_by_id(db):
     """Test getting user by ID."""
     repo = UserRepository(db)
@@ -78,6 +138,47 @@ def test_user_repository_refresh_session_creation(db):
     assert session.revoked_at is None
 
 
+def test_user_repository_revoke_refresh_session_by_token(db):
+    """Test revoking by token hash, alone and with all of the owner's sessions."""
+    repo = UserRepository(db)
+    user = repo.create("test@example.com", "hashed")
+    expires_at = datetime.utcnow() + timedelta(days=1)
+    for token_hash in ("hash-a", "hash-b", "hash-c"):
+        repo.create_refresh_session(user_id=user.id, token_hash=token_hash, expires_at=expires_at)
+
+    assert repo.revoke_refresh_session_by_token("hash-a") is True
+    assert repo.revoke_refresh_session_by_token("hash-a") is False
+    assert repo.revoke_refresh_session_by_token("unknown", revoke_all=True) is False
+    assert repo.get_refresh_session("hash-b") is not None
+
+    assert repo.revoke_refresh_session_by_token("hash-b", revoke_all=True) is True
+    assert repo.get_refresh_session("hash-b") is None
+    assert repo.get_refresh_session("hash-c") is None
+
+
+def test_user_repository_rotate_refresh_session(db):
+    """Test a refresh session can be rotated exactly once."""
+    repo = UserRepository(db)
+    user = repo.create("test@example.com", "hashed")
+    repo.create_refresh_session(
+        user_id=user.id,
+        token_hash="hash-a",
+        expires_at=datetime.utcnow() + timedelta(days=1),
+        ip_address="127.0.0.1",
+        user_agent="TestAgent",
+    )
+
+    row = repo.rotate_refresh_session("hash-a")
+
+    assert row is not None
+    assert row.user_id == user.id
+    assert row.ip_address == "127.0.0.1"
+    assert row.user_agent == "TestAgent"
+    assert row.user_is_active
+    assert repo.get_refresh_session("hash-a") is None
+    assert repo.rotate_refresh_session("hash-a") is None
+
+
 def test_crime_repository_create_category(db):
     """Test creating crime category."""
     repo = CrimeRepository(db)
@@ -124,3 +225,314 @@ def test_crime_repository_create_incident(db, test_crime_categories):
     assert incident.category_id == "violent-crime"
     assert incident.force_id == "hampshire"
     assert incident.geom is not None
+    assert incident.h3_cell == h3.str_to_int(h3.latlng_to_cell(50.9097, -1.4044, 10))
+
+
+def _insert_safety_cell(db, cell_id, month, stats, row_id=1):
+    """Insert a safety cell row directly (ORM inserts need PostGIS for geom)."""
+    import json
+
+    from sqlalchemy import text
+
+    db.execute(
+        text(
+            """
+            INSERT INTO safety_cells
+            (id, cell_id, geom, month, crime_count_total, crime_count_weighted, stats, updated_at)
+            VALUES (:id, :cell_id, :geom, :month, 1, 1.0, :stats, :updated_at)
+            """
+        ),
+        {
+            "id": row_id,
+            "cell_id": cell_id,
+            "geom": "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))",
+            "month": month,
+            "stats": json.dumps(stats),
+            "updated_at": datetime.utcnow(),
+        },
+    )
+    db.commit()
+
+
+def test_crime_repository_update_cell_merges_stats_delta(db):
+    """Test stats_delta is merged into the stored stats rather than replacing them."""
+    repo = CrimeRepository(db)
+    month = date(2024, 9, 1)
+    cell_id = 0x8A195DA49A5FFFF
+    _insert_safety_cell(db, cell_id, month, {"burglary": 2, "violent-crime": 1})
+
+    cell = repo.create_or_update_cell(
+        cell_id=cell_id,
+        geom_wkt="",
+        month=month,
+        crime_count_total=4,
+        crime_count_weighted=6.5,
+        stats_delta={"violent-crime": 3, "shoplifting": 1},
+    )
+
+    assert cell.crime_count_total == 4
+    assert cell.stats == {"burglary": 2, "violent-crime": 3, "shoplifting": 1}
+
+
+def test_crime_repository_get_cell_counts_by_month(db):
+    """Test the column-only cell query returns plain tuples ordered by cell ID."""
+    repo = CrimeRepository(db)
+    month = date(2024, 9, 1)
+    _insert_safety_cell(db, 0x8A195DA49A5FFFF, month, {})
+    _insert_safety_cell(db, 0x8A195DA49A47FFF, month, {}, row_id=2)
+
+    rows = repo.get_cell_counts_by_month(month)
+
+    assert [row[0] for row in rows] == [0x8A195DA49A47FFF, 0x8A195DA49A5FFFF]
+    assert all(isinstance(row, tuple) and len(row) == 3 for row in rows)
+    assert repo.get_cell_counts_by_month(date(2024, 8, 1)) == []
+
+
+def test_crime_repository_get_cells_between(db):
+    """Test the range query returns every month in [start, end) and nothing else."""
+    repo = CrimeRepository(db)
+    _insert_safety_cell(db, 0x8A195DA49A5FFFF, date(2024, 7, 1), {})
+    _insert_safety_cell(db, 0x8A195DA49A5FFFF, date(2024, 8, 1), {}, row_id=2)
+    _insert_safety_cell(db, 0x8A195DA49A5FFFF, date(2024, 9, 1), {}, row_id=3)
+
+    cells = repo.get_cells_between(date(2024, 8, 1), date(2024, 10, 1))
+
+    assert sorted(cell.month for cell in cells) == [date(2024, 8, 1), date(2024, 9, 1)]
+
+
+def test_crime_repository_get_cell_stats_for_months_within(db):
+    """Test the spatial filter keeps only cells intersecting the area."""
+    import h3
+    from shapely.geometry import box
+
+    southampton = h3.str_to_int(h3.latlng_to_cell(50.9097, -1.4044, 10))
+    london = h3.str_to_int(h3.latlng_to_cell(51.5043, -0.1285, 10))
+    repo = CrimeRepository(db)
+    _insert_safety_cell(db, southampton, date(2024, 8, 1), {})
+    _insert_safety_cell(db, london, date(2024, 8, 1), {}, row_id=2)
+
+    cell_stats = repo.get_cell_stats_for_months(
+        [date(2024, 8, 1)], within=box(-1.41, 50.905, -1.40, 50.915)
+    )
+
+    assert cell_stats[date(2024, 8, 1)][0].tolist() == [southampton]
+
+
+def test_crime_repository_get_cell_stats_for_months(db):
+    """Test stats are read out of the JSON document into aligned columns."""
+    repo = CrimeRepository(db)
+    stats = {
+        "category_counts": {"burglary": 2, "anti-social-behaviour": 3},
+        "time_buckets": {"night": 1},
+    }
+    _insert_safety_cell(db, 0x8A195DA49A5FFFF, date(2024, 8, 1), stats)
+
+    cell_stats = repo.get_cell_stats_for_months(
+        [date(2024, 8, 1), date(2024, 9, 1)],
+        categories=["anti-social-behaviour", "burglary", "drugs"],
+        time_buckets=["day", "night"],
+    )
+
+    cell_ids, values = cell_stats[date(2024, 8, 1)]
+    assert cell_ids.tolist() == [0x8A195DA49A5FFFF]
+    assert values.tolist() == [[1.0, 3.0, 2.0, 0.0, 0.0, 1.0]]
+    assert cell_stats[date(2024, 9, 1)][1].shape == (0, 6)
+
+
+def test_crime_repository_get_cell_stats_for_months_across_batches(db, monkeypatch):
+    """Test rows streamed over several fetch batches are grouped by month in order."""
+    monkeypatch.setattr("app.repositories.crime_repository._STATS_BATCH_SIZE", 2)
+    repo = CrimeRepository(db)
+    months = [date(2024, 9, 1), date(2024, 8, 1), date(2024, 7, 1)]
+    cell_ids = [0x8A195DA49A5FFFF, 0x8A195DA49A7FFFF]
+    row_id = 1
+    for month in (date(2024, 8, 1), date(2024, 7, 1)):
+        for cell_id in cell_ids:
+            stats = {"category_counts": {"burglary": month.month}}
+            _insert_safety_cell(db, cell_id, month, stats, row_id=row_id)
+            row_id += 1
+
+    cell_stats = repo.get_cell_stats_for_months(months, categories=["burglary"])
+
+    assert list(cell_stats) == months
+    assert cell_stats[date(2024, 9, 1)][1].shape == (0, 2)
+    for month in months[1:]:
+        ids, values = cell_stats[month]
+        assert sorted(ids.tolist()) == cell_ids
+        assert values[:, 1].tolist() == [month.month] * 2
+
+
+def test_crime_repository_update_cell_rejects_stats_and_delta(db):
+    """Test passing both stats and stats_delta is an error."""
+    repo = CrimeRepository(db)
+
+    with pytest.raises(ValueError):
+        repo.create_or_update_cell(
+            cell_id=1,
+            geom_wkt="",
+            month=date(2024, 9, 1),
+            crime_count_total=0,
+            crime_count_weighted=0.0,
+            stats={},
+            stats_delta={},
+        )
+
+
+def test_crime_repository_reset_incident_partition(db, test_crime_categories):
+    """Test resetting a month only clears that force's incidents for that month."""
+    from sqlalchemy import text
+
+    from app.models.crime import CrimeIncident
+
+    now = datetime.utcnow()
+    rows = [
+        (1, date(2024, 9, 1), "hampshire"),
+        (2, date(2024, 9, 1), "hampshire"),
+        (3, date(2024, 9, 1), "dorset"),
+        (4, date(2024, 8, 1), "hampshire"),
+    ]
+    for incident_id, month, force_id in rows:
+        db.execute(
+            text(
+                """
+                INSERT INTO crime_incidents
+                (id, month, category_id, crime_type, force_id, location_desc, geom,
+                 h3_cell, created_at, ingested_at)
+                VALUES (:id, :month, 'burglary', 'Burglary', :force_id, 'On High Street',
+                        'SRID=4326;POINT(-1.4044 50.9097)', 1, :now, :now)
+                """
+            ),
+            {"id": incident_id, "month": month, "force_id": force_id, "now": now},
+        )
+    db.commit()
+
+    repo = CrimeRepository(db)
+    assert repo.has_incidents(date(2024, 9, 1), "hampshire")
+
+    repo.reset_incident_partition(date(2024, 9, 15), "hampshire")
+
+    remaining = {row.id for row in db.query(CrimeIncident.id).all()}
+    assert remaining == {3, 4}
+    assert not repo.has_incidents(date(2024, 9, 1), "hampshire")
+    assert repo.has_incidents(date(2024, 9, 1), "dorset")
+
+
+def test_route_repository_hard_delete_old_records_in_batches(db, test_user):
+    """Test old and long-deleted history is purged across several batches."""
+    from datetime import timedelta
+
+    from sqlalchemy import text
+
+    from app.repositories.route_repository import RouteRepository
+
+    now = datetime.utcnow()
+    old = now - timedelta(days=400)
+    rows = [(old, None)] * 5 + [(now, old)] * 2 + [(now, None), (old, now)]
+    for i, (created_at, deleted_at) in enumerate(rows):
+        db.execute(
+            text(
+                """
+                INSERT INTO route_history (
+                    id, user_id, created_at, origin_lat, origin_lng, destination_lat,
+                    destination_lng, mode, request_meta, deleted_at
+                ) VALUES (
+                    :id, :user_id, :created_at, 50.9, -1.4, 50.91, -1.39, 'foot-walking',
+                    '{}', :deleted_at
+                )
+                """
+            ),
+            {
+                "id": f"{i:032x}",
+                "user_id": test_user.id.hex,
+                "created_at": created_at,
+                "deleted_at": deleted_at,
+            },
+        )
+    db.commit()
+
+    deleted = RouteRepository(db).hard_delete_old_records(days=365, batch_size=2)
+
+    assert deleted == 7
+    remaining = db.execute(text("SELECT COUNT(*) FROM route_history")).scalar()
+    assert remaining == 2
+
+
+def test_route_repository_soft_delete_old_records_in_batches(db, test_user):
+    """Test live history older than the cutoff is soft deleted across several batches."""
+    from datetime import timedelta
+
+    from sqlalchemy import text
+
+    from app.repositories.route_repository import RouteRepository
+
+    now = datetime.utcnow()
+    old = now - timedelta(days=100)
+    rows = [(old, None)] * 5 + [(old, old), (now, None)]
+    for i, (created_at, deleted_at) in enumerate(rows):
+        db.execute(
+            text(
+                """
+                INSERT INTO route_history (
+                    id, user_id, created_at, origin_lat, origin_lng, destination_lat,
+                    destination_lng, mode, request_meta, deleted_at
+                ) VALUES (
+                    :id, :user_id, :created_at, 50.9, -1.4, 50.91, -1.39, 'foot-walking',
+                    '{}', :deleted_at
+                )
+                """
+            ),
+            {
+                "id": f"{i:032x}",
+                "user_id": test_user.id.hex,
+                "created_at": created_at,
+                "deleted_at": deleted_at,
+            },
+        )
+    db.commit()
+
+    deleted = RouteRepository(db).soft_delete_old_records(now - timedelta(days=90), batch_size=2)
+
+    assert deleted == 5
+    live = db.execute(text("SELECT COUNT(*) FROM route_history WHERE deleted_at IS NULL")).scalar()
+    assert live == 1
+
+
+def test_route_repository_delete_all_user_history_in_batches(db, test_user):
+    """Test a user's whole history is soft deleted across several batches."""
+    from app.repositories.route_repository import RouteRepository
+
+    repo = RouteRepository(db)
+    for _ in range(5):
+        repo.create_history(
+            user_id=test_user.id,
+            origin_lat=50.9097,
+            origin_lng=-1.4044,
+            destination_lat=50.9130,
+            destination_lng=-1.4300,
+            mode="foot-walking",
+            safety_score_best=85.0,
+            distance_m_best=2300,
+            duration_s_best=1800,
+            request_meta={},
+        )
+
+    assert repo.delete_all_user_history(test_user.id, batch_size=2) == 5
+    assert repo.get_user_history(test_user.id) == ([], 0)
+
+
+def test_route_repository_binds_shapely_route_geom_as_wkb():
+    """Test Shapely route geometries are bound as WKB and WKT text as WKT."""
+    from geoalchemy2 import WKBElement, WKTElement
+    from shapely.geometry import LineString
+
+    from app.repositories.route_repository import _to_geom_element
+
+    line = LineString([(-1.4044, 50.9097), (-1.43, 50.913)])
+
+    element = _to_geom_element(line)
+    assert isinstance(element, WKBElement)
+    assert element.srid == 4326
+
+    element = _to_geom_element("SRID=27700;" + line.wkt)
+    assert isinstance(element, WKTElement)
+    assert element.srid == 27700
@@ -1,8 +1,9 @@
 """Unit tests for RouteSafetyService."""
 
 from datetime import date
-from unittest.mock import Mock
+from unittest.mock import AsyncMock, Mock, patch
 
+import numpy as np
 import pytest
 from shapely import wkt as wkt_module
 from shapely.geometry import LineString
@@ -112,7 +113,12 @@ class TestRouteSafetyService:
 
         assert len(segments) >= 1
 
-    def test_find_intersecting_cells_with_wkt_strings(self, service):
+    def _intersecting_cells(self, service, route_line, cells, buffer_meters):
+        """Cells the buffered route intersects, via the scoring path's index and query."""
+        cells, geoms = service._index_cells(cells)
+        return [cells[i] for i in service._query_cells(geoms, route_line, buffer_meters)]
+
+    def test_query_cells_with_wkt_strings(self, service):
         """Test finding intersecting cells when geom is WKT string."""
         route_line = LineString([(-1.415, 50.855), (-1.410, 50.858)])
 
@@ -122,12 +128,12 @@ class TestRouteSafetyService:
         cell.geom = "POLYGON((-1.42 50.85,-1.41 50.85,-1.41 50.86,-1.42 50.86,-1.42 50.85))"
         cells.append(cell)
 
-        result = service._find_intersecting_cells(route_line, cells, buffer_meters=50)
+        result = self._intersecting_cells(service, route_line, cells, buffer_meters=50)
 
         # Should intersect
         assert len(result) == 1
 
-    def test_find_intersecting_cells_no_intersection(self, service):
+    def test_query_cells_no_intersection(self, service):
         """Test finding intersecting cells with no intersection."""
         route_line = LineString([(-1.0, 50.0), (-0.9, 50.1)])
 
@@ -137,12 +143,12 @@ class TestRouteSafetyService:
         cell.geom = "POLYGON((-2.0 51.0,-1.9 51.0,-1.9 51.1,-2.0 51.1,-2.0 51.0))"
         cells.append(cell)
 
-        result = service._find_intersecting_cells(route_line, cells, buffer_meters=50)
+        result = self._intersecting_cells(service, route_line, cells, buffer_meters=50)
 
         # Should not intersect
         assert len(result) == 0
 
-    def test_find_intersecting_cells_with_invalid_geometry(self, service):
+    def test_query_cells_with_invalid_geometry(self, service):
         """Test handling of invalid geometries."""
         route_line = LineString([(-1.415, 50.855), (-1.410, 50.858)])
 
@@ -157,39 +163,161 @@ class TestRouteSafetyService:
         cells.append(cell2)
 
         # Should handle gracefully and return empty list
-        result = service._find_intersecting_cells(route_line, cells, buffer_meters=50)
+        result = self._intersecting_cells(service, route_line, cells, buffer_meters=50)
         assert len(result) == 0
 
-    def test_calculate_segment_risk_no_cells(self, service):
+    def test_score_route_with_cells(self, service, sample_route_geometry, sample_safety_cells):
+        """Test scoring only counts the cells the route passes through."""
+        service.crime_repo.get_cells_between = Mock(return_value=sample_safety_cells)
+
+        result = service.score_route(route_geometry=sample_route_geometry, lookback_months=1)
+
+        # Only the first cell lies under the route
+        assert result["cells_analyzed"] == 1
+        assert result["segment_count"] > 0
+        assert all(seg["cell_count"] == 1 for seg in result["segments"])
+        assert result["safety_score"] < 100.0
+
+    async def test_score_route_cached_hit_skips_scoring(self, service, sample_route_geometry):
+        """Test a cached score is returned without reading any cells."""
+        cached = {"safety_score": 42.0, "segments": []}
+        service.crime_repo.get_cells_between = Mock()
+
+        with patch("app.services.route_safety_service.CacheService") as mock_cache_cls:
+            cache = mock_cache_cls.return_value
+            cache.route_score_key.return_value = "safety:route:key"
+            cache.get_route_score = AsyncMock(return_value=cached)
+            cache.set_route_score = AsyncMock()
+
+            result = await service.score_route_cached(sample_route_geometry, lookback_months=1)
+
+        assert result == cached
+        service.crime_repo.get_cells_between.assert_not_called()
+        cache.set_route_score.assert_not_called()
+
+    async def test_score_route_cached_miss_stores_score(
+        self, service, sample_route_geometry, sample_safety_cells
+    ):
+        """Test a cache miss scores the route and stores the result."""
+        service.crime_repo.get_cells_between = Mock(return_value=sample_safety_cells)
+
+        with patch("app.services.route_safety_service.CacheService") as mock_cache_cls:
+            cache = mock_cache_cls.return_value
+            cache.route_score_key.return_value = "safety:route:key"
+            cache.get_route_score = AsyncMock(return_value=None)
+            cache.set_route_score = AsyncMock()
+
+            result = await service.score_route_cached(sample_route_geometry, lookback_months=1)
+
+        assert result["cells_analyzed"] == 1
+        cache.set_route_score.assert_awaited_once_with("safety:route:key", result)
+
+    async def test_score_routes_cached_shares_one_fetch(
+        self, service, sample_route_geometry, sample_safety_cells
+    ):
+        """Test cache misses share one cell fetch and results keep input order."""
+        cached = {"safety_score": 42.0, "segments": []}
+        far_route = {"type": "LineString", "coordinates": [[-1.0, 50.0], [-0.99, 50.01]]}
+        service.crime_repo.get_cells_between = Mock(return_value=sample_safety_cells)
+
+        with patch("app.services.route_safety_service.CacheService") as mock_cache_cls:
+            cache = mock_cache_cls.return_value
+            cache.route_score_key.side_effect = lambda coords, *args: str(coords)
+            cache.get_route_score = AsyncMock(side_effect=[None, cached, None])
+            cache.set_route_score = AsyncMock()
+
+            results = await service.score_routes_cached(
+                [sample_route_geometry, sample_route_geometry, far_route, {"coordinates": []}],
+                lookback_months=1,
+            )
+
+        service.crime_repo.get_cells_between.assert_called_once()
+        assert results[0]["cells_analyzed"] == 1
+        assert results[1] == cached
+        assert results[2]["cells_analyzed"] == 0
+        assert results[3] == service._empty_score()
+        assert cache.set_route_score.await_count == 2
+
+    def test_index_cells_parses_repeated_geometry_once(self, service):
+        """Test the same hexagon stored for several months is parsed only once."""
+        wkt_str = "POLYGON((-1.4 50.9, -1.39 50.9, -1.39 50.91, -1.4 50.91, -1.4 50.9))"
+        cells = [Mock(geom=wkt_str, month=date(2025, m, 1)) for m in (7, 8, 9)]
+
+        kept, geoms = service._index_cells(cells)
+
+        assert len(kept) == 3
+        assert geoms[0] is geoms[1] is geoms[2]
+
+    def test_query_segments_groups_cells_per_segment(self, service):
+        """Test the bulk segment query returns each segment's cells in order."""
+        from shapely import STRtree
+        from shapely.geometry import box
+
+        tree = STRtree(
+            np.array(
+                [box(-1.42, 50.85, -1.41, 50.86), box(-1.41, 50.85, -1.40, 50.86)], dtype=object
+            )
+        )
+        segments = [
+            LineString([(-1.415, 50.855), (-1.405, 50.855)]),
+            LineString([(-1.0, 50.0), (-0.9, 50.1)]),
+            LineString([(-1.405, 50.855), (-1.404, 50.856)]),
+        ]
+
+        hits = service._query_segments(tree, segments, buffer_meters=10)
+
+        assert [list(h) for h in hits] == [[0, 1], [], [1]]
+
+    def test_create_route_segments_splits_at_length(self, service):
+        """Test each segment ends at the first vertex past the length limit."""
+        route_line = LineString([(0, 0), (0.0004, 0), (0.0008, 0), (0.0012, 0), (0.0013, 0)])
+
+        segments = service._create_route_segments(route_line, max_segment_length_deg=0.001)
+
+        assert [list(seg.coords) for seg in segments] == [
+            [(0, 0), (0.0004, 0), (0.0008, 0), (0.0012, 0)],
+            [(0.0012, 0), (0.0013, 0)],
+        ]
+
+    def test_normalize_risk_interpolates_between_thresholds(self, service):
+        """Test risk normalization is linear between thresholds and clamped at the ends."""
+        assert service._normalize_risk(0.0) == 0.0
+        assert service._normalize_risk(5.0) == pytest.approx(0.2)
+        assert service._normalize_risk(12.5) == pytest.approx(0.3)
+        assert service._normalize_risk(150.0) == pytest.approx(0.875)
+        assert service._normalize_risk(300.0) == pytest.approx(0.975)
+        assert service._normalize_risk(1000.0) == 1.0
+
+        batch = service._normalize_risk(np.array([0.0, 35.0, 400.0]))
+        assert batch.tolist() == pytest.approx([0.0, 0.5, 1.0])
+
+    def test_cell_risks_no_cells(self, service):
         """Test risk calculation with no cells."""
         current_month = date(2025, 11, 1)
-        risk = service._calculate_segment_risk([], current_month)
+        cell_risks, crime_totals = service._cell_risks([], current_month)
 
-        assert risk == 0.0
+        assert len(cell_risks) == 0
+        assert crime_totals == {}
 
-    def test_calculate_segment_risk_with_cells(self, service, sample_safety_cells):
+    def test_cell_risks_with_cells(self, service, sample_safety_cells):
         """Test risk calculation with cells."""
         current_month = date(2025, 11, 1)
-        risk = service._calculate_segment_risk(sample_safety_cells, current_month, time_of_day=None)
+        cell_risks, _ = service._cell_risks(sample_safety_cells, current_month, time_of_day=None)
 
-        # Should calculate some risk
-        assert risk > 0.0
+        # Every cell carries some risk
+        assert len(cell_risks) == len(sample_safety_cells)
+        assert (cell_risks > 0.0).all()
 
-    def test_calculate_segment_risk_with_time_of_day(self, service, sample_safety_cells):
+    def test_cell_risks_with_time_of_day(self, service, sample_safety_cells):
         """Test risk calculation with time-of-day weighting."""
         current_month = date(2025, 11, 1)
 
-        risk_night = service._calculate_segment_risk(
-            sample_safety_cells, current_month, time_of_day="night"
-        )
-
-        risk_day = service._calculate_segment_risk(
-            sample_safety_cells, current_month, time_of_day="day"
-        )
+        risk_night, _ = service._cell_risks(sample_safety_cells, current_month, time_of_day="night")
+        risk_day, _ = service._cell_risks(sample_safety_cells, current_month, time_of_day="day")
 
         # Risks should be calculated (values depend on config)
-        assert risk_night >= 0.0
-        assert risk_day >= 0.0
+        assert (risk_night >= 0.0).all()
+        assert (risk_day >= 0.0).all()
 
     def test_identify_hotspots_no_risk(self, service):
         """Test hotspot identification with no risk."""
@@ -234,52 +362,42 @@ class TestRouteSafetyService:
         risk_levels = [h["risk_level"] for h in hotspots]
         assert "critical" in risk_levels or "high" in risk_levels
 
-    def test_calculate_crime_breakdown_no_cells(self, service):
-        """Test crime breakdown with no cells."""
-        current_month = date(2025, 11, 1)
-        breakdown = service._calculate_crime_breakdown([], current_month)
-
-        assert breakdown == {}
-
-    def test_calculate_crime_breakdown_with_cells(self, service, sample_safety_cells):
-        """Test crime breakdown with cells."""
+    def test_crime_totals_with_cells(self, service, sample_safety_cells):
+        """Test the crime breakdown totals with cells."""
         current_month = date(2025, 11, 1)
-        breakdown = service._calculate_crime_breakdown(sample_safety_cells, current_month)
+        _, crime_totals = service._cell_risks(sample_safety_cells, current_month)
 
         # Should have crime categories
-        assert len(breakdown) > 0
-        assert "burglary" in breakdown or "violent-crime" in breakdown
-        assert all(isinstance(count, float) for count in breakdown.values())
+        assert len(crime_totals) > 0
+        assert "burglary" in crime_totals or "violent-crime" in crime_totals
+        assert all(isinstance(count, float) for count in crime_totals.values())
 
-    def test_calculate_crime_breakdown_with_time_of_day(self, service, sample_safety_cells):
-        """Test crime breakdown with time-of-day weighting."""
+    def test_crime_totals_with_time_of_day(self, service, sample_safety_cells):
+        """Test the crime breakdown totals with time-of-day weighting."""
         current_month = date(2025, 11, 1)
 
-        breakdown_night = service._calculate_crime_breakdown(
+        _, totals_night = service._cell_risks(
             sample_safety_cells, current_month, time_of_day="night"
         )
-
-        breakdown_day = service._calculate_crime_breakdown(
-            sample_safety_cells, current_month, time_of_day="day"
-        )
+        _, totals_day = service._cell_risks(sample_safety_cells, current_month, time_of_day="day")
 
         # Both should have data
-        assert len(breakdown_night) > 0
-        assert len(breakdown_day) > 0
+        assert len(totals_night) > 0
+        assert len(totals_day) > 0
 
     def test_buffer_calculation(self, service):
-        """Test buffer calculation converts meters to degrees."""
-        route_line = LineString([(-1.415, 50.855), (-1.410, 50.858)])
+        """Test the route buffer is measured in metres, not degrees."""
+        from app.utils.geometry import reproject_to_27700
 
-        # 50 meters should be approximately 0.00045 degrees
-        buffer_meters = 50
-        buffer_degrees = buffer_meters / 111000.0
+        route_line = LineString([(-1.415, 50.855), (-1.410, 50.858)])
 
-        buffered = route_line.buffer(buffer_degrees)
+        buffered = service._buffer(route_line, 50)
 
         # Buffered geometry should be larger than original
-        assert buffered.area > 0
         assert buffered.contains(route_line)
+        # 50 m either side of the line plus round caps, measured in EPSG:27700
+        expected = reproject_to_27700(route_line).length * 100 + 3.1416 * 50**2
+        assert reproject_to_27700(buffered).area == pytest.approx(expected, rel=0.01)
 
     def test_safety_score_calculation(self, service):
         """Test safety score normalization."""
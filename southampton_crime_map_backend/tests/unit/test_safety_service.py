@@ -1,11 +1,15 @@
 """Unit tests for safety scoring service."""
 
+from datetime import date
 from unittest.mock import Mock
 
+import numpy as np
 import pytest
+from dateutil.relativedelta import relativedelta
 from shapely.geometry import LineString
 
 from app.services.safety_service import SafetyScoringService
+from app.utils.scoring import TIME_BUCKETS
 from app.utils.segmentation import RouteSegment
 
 
@@ -32,10 +36,12 @@ def test_score_routes_single_route(safety_service):
     ]
 
     # Mock crime repo to return no cells
-    safety_service.crime_repo.get_cells_by_month = Mock(return_value=[])
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(return_value={})
 
     scored_routes = safety_service.score_routes(routes_data, lookback_months=12)
 
+    # The whole lookback window is fetched in one query
+    safety_service.crime_repo.get_cell_stats_for_months.assert_called_once()
     assert len(scored_routes) == 1
     assert "safety_score" in scored_routes[0]
     assert scored_routes[0]["rank"] == 1
@@ -57,10 +63,12 @@ def test_score_routes_multiple_routes(safety_service):
         },
     ]
 
-    safety_service.crime_repo.get_cells_by_month = Mock(return_value=[])
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(return_value={})
 
     scored_routes = safety_service.score_routes(routes_data, lookback_months=12)
 
+    # Both routes share one fetch
+    safety_service.crime_repo.get_cell_stats_for_months.assert_called_once()
     assert len(scored_routes) == 2
     assert scored_routes[0]["rank"] == 1
     assert scored_routes[1]["rank"] == 2
@@ -68,6 +76,92 @@ def test_score_routes_multiple_routes(safety_service):
     assert scored_routes[1]["is_recommended"] is False
 
 
+def test_score_routes_counts_only_cells_near_each_route(safety_service):
+    """Test that a shared fetch still only charges each route for its own cells."""
+    import h3
+
+    near_route = h3.str_to_int(h3.latlng_to_cell(50.9097, -1.4044, 10))
+    routes_data = [
+        {
+            "geometry": LineString([(-1.4044, 50.9097), (-1.4300, 50.9130)]),
+            "segments": [],
+            "distance_m": 2300,
+        },
+        {
+            "geometry": LineString([(-1.3000, 50.9500), (-1.3100, 50.9500)]),
+            "segments": [],
+            "distance_m": 700,
+        },
+    ]
+
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(
+        side_effect=lambda months, **kwargs: {
+            month: (np.array([near_route]), np.array([[5.0]])) for month in months
+        }
+    )
+
+    scored_routes = safety_service.score_routes(routes_data, lookback_months=1)
+
+    risks = {item["route"]["distance_m"]: item["risk"] for item in scored_routes}
+    assert risks == {2300: 5.0, 700: 0.0}
+
+
+def test_score_routes_keeps_route_buffers(safety_service):
+    """Test that route buffers are stored on the routes and reused when present."""
+    from shapely.geometry import box
+
+    given = box(-1.41, 50.90, -1.40, 50.91)
+    routes_data = [
+        {
+            "geometry": LineString([(-1.4044, 50.9097), (-1.4300, 50.9130)]),
+            "segments": [],
+            "distance_m": 2300,
+        },
+        {
+            "geometry": LineString([(-1.4044, 50.9097), (-1.4050, 50.9100)]),
+            "buffer": given,
+            "segments": [],
+            "distance_m": 60,
+        },
+    ]
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(return_value={})
+
+    safety_service.score_routes(routes_data, lookback_months=1)
+
+    assert routes_data[0]["buffer"].contains(routes_data[0]["geometry"])
+    assert routes_data[1]["buffer"] is given
+    within = safety_service.crime_repo.get_cell_stats_for_months.call_args.kwargs["within"]
+    assert within.contains(given)
+
+
+def test_score_routes_looks_back_over_distinct_months(safety_service):
+    """Test that each lookback month is fetched once and weighted by its age."""
+    import h3
+
+    cell_id = h3.str_to_int(h3.latlng_to_cell(50.9097, -1.4044, 10))
+    routes_data = [
+        {
+            "geometry": LineString([(-1.4044, 50.9097), (-1.4300, 50.9130)]),
+            "segments": [],
+            "distance_m": 2300,
+        }
+    ]
+
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(
+        side_effect=lambda months, **kwargs: {
+            month: (np.array([cell_id]), np.array([[1.0]])) for month in months
+        }
+    )
+
+    scored_routes = safety_service.score_routes(routes_data, lookback_months=12)
+
+    months = safety_service.crime_repo.get_cell_stats_for_months.call_args.args[0]
+    assert len(set(months)) == 12
+    assert months[0] == date.today().replace(day=1) - relativedelta(months=1)
+    # Recency weights: months 1-3 x1.0, 4-6 x0.75, 7-12 x0.5
+    assert scored_routes[0]["risk"] == pytest.approx(3 * 1.0 + 3 * 0.75 + 6 * 0.5)
+
+
 def test_score_routes_assigns_risk_classes(safety_service):
     """Test that risk classes are assigned correctly."""
     routes_data = [
@@ -78,7 +172,7 @@ def test_score_routes_assigns_risk_classes(safety_service):
         }
     ]
 
-    safety_service.crime_repo.get_cells_by_month = Mock(return_value=[])
+    safety_service.crime_repo.get_cell_stats_for_months = Mock(return_value={})
 
     scored_routes = safety_service.score_routes(routes_data, lookback_months=12)
 
@@ -90,6 +184,39 @@ def test_score_routes_assigns_risk_classes(safety_service):
         assert scored_routes[0]["risk_class"] == "low"
 
 
+def test_risk_sum_matches_per_cell_sum():
+    """Test that the risk sum adds each cell's weighted risk, time factor and weight."""
+    # Columns: weighted count, burglary, violent-crime, then TIME_BUCKETS
+    assert TIME_BUCKETS == ("night", "morning", "day", "evening")
+    values = np.array(
+        [
+            [4.0, 2, 1, 1, 0, 0, 3],
+            [1.5, 1, 0, 1, 0, 0, 0],
+            [2.0, 0, 0, 0, 0, 0, 0],
+        ]
+    )
+    time_weights = np.array([1.5, 0.8, 0.8, 0.8])
+
+    # Mean over buckets: (1 x1.5 + 3 x0.8) / 4, then night x1.5, no buckets x1.0
+    mixed = (1.5 + 3 * 0.8) / 4
+    assert SafetyScoringService._risk_sum(values[:, [0, 3, 4, 5, 6]], None, time_weights) == (
+        pytest.approx(4.0 * mixed + 1.5 * 1.5 + 2.0)
+    )
+    assert SafetyScoringService._risk_sum(values[:, :1], None, None) == pytest.approx(7.5)
+
+    weights = np.array([2.0, 1.0])
+    assert SafetyScoringService._risk_sum(values, weights, time_weights) == pytest.approx(
+        (2 * 2.0 + 1 * 1.0) * mixed + (1 * 2.0) * 1.5
+    )
+    assert SafetyScoringService._risk_sum(np.empty((0, 7)), weights, time_weights) == 0.0
+
+    # Per-cell weights (recency) scale each cell's term
+    cell_weights = np.array([1.0, 0.5, 0.75])
+    assert SafetyScoringService._risk_sum(
+        values[:, [0, 3, 4, 5, 6]], None, time_weights, cell_weights
+    ) == pytest.approx(4.0 * mixed + 1.5 * 1.5 * 0.5 + 2.0 * 0.75)
+
+
 def test_identify_hotspots_no_segments(safety_service):
     """Test hotspot identification with no segments."""
     hotspots = safety_service.identify_hotspots([], [])
@@ -119,3 +246,13 @@ def test_identify_hotspots_finds_high_risk_areas(safety_service):
         assert "segment_range" in hotspots[0]
         assert "risk_score" in hotspots[0]
         assert "description" in hotspots[0]
+
+
+def test_identify_hotspots_splits_runs(safety_service):
+    """Test that separate high-risk runs become separate hotspots."""
+    segment_risks = [1.0, 9.0, 6.0, 1.0, 1.0, 1.0, 1.0, 4.5, 1.0, 1.0, 1.0, 1.0, 1.0]
+
+    hotspots = safety_service.identify_hotspots([], segment_risks)
+
+    assert [h["segment_range"] for h in hotspots] == [[1, 2], [7, 7]]
+    assert [h["risk_score"] for h in hotspots] == pytest.approx([1.0, 0.5])
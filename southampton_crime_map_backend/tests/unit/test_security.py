@@ -1,11 +1,14 @@
 """Unit tests for security functions."""
 
+import hashlib
+
 from app.core.security import (
     create_access_token,
     create_refresh_token,
     decode_token,
     hash_password,
     hash_refresh_token,
+    password_needs_rehash,
     validate_password_strength,
     verify_password,
 )
@@ -25,6 +28,30 @@ def test_verify_password():
     hashed = hash_password(password)
     assert verify_password(password, hashed) is True
     assert verify_password("WrongPassword", hashed) is False
+    assert verify_password(password, "not-a-hash") is False
+
+
+def test_password_needs_rehash():
+    """Test hashes made with other Argon2 parameters are flagged for upgrade."""
+    from argon2 import PasswordHasher
+
+    legacy = PasswordHasher(time_cost=2, memory_cost=512, parallelism=2).hash("TestPassword123")
+
+    assert verify_password("TestPassword123", legacy) is True
+    assert password_needs_rehash(legacy) is True
+    assert password_needs_rehash(hash_password("TestPassword123")) is False
+
+
+def test_calibrate_password_hasher(monkeypatch):
+    """Test calibration keeps the configured floor and the upper bound."""
+    from app.core import security
+
+    monkeypatch.setattr(security, "password_hasher", security.password_hasher)
+
+    assert security.calibrate_password_hasher(0) == security.password_hasher.time_cost
+    assert security.calibrate_password_hasher(1) == security.settings.ARGON2_TIME_COST
+    assert security.calibrate_password_hasher(10**6) == security._MAX_ARGON2_TIME_COST
+    assert security.password_hasher.time_cost == security._MAX_ARGON2_TIME_COST
 
 
 def test_create_access_token():
@@ -54,6 +81,9 @@ def test_hash_refresh_token():
     assert isinstance(hashed, str)
     assert len(hashed) == 64  # SHA256 produces 64-character hex string
     assert hashed != token
+    assert hashed == hash_refresh_token(token)
+    # Keyed: not the bare SHA256 of the token
+    assert hashed != hashlib.sha256(token.encode()).hexdigest()
 
 
 def test_validate_password_strength():